@@ -42,27 +42,197 @@ QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 # Vector Config
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 EMBEDDING_DIM = 384
+EMBEDDING_MMAP_WEIGHTS = os.getenv("EMBEDDING_MMAP_WEIGHTS", "true").lower() == "true"  # share weight pages across workers
+EMBED_MICRO_BATCHING = os.getenv("EMBED_MICRO_BATCHING", "true").lower() == "true"  # coalesce concurrent embed calls
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", 32))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", 2))  # 0 = only batch what queued during the last pass
 
 # Collections
 MATCH_DETAILS_COLLECTION = "match_details"
 MATCH_STATS_COLLECTION   = "match_stats"
 
-# Index fields per collection
-COLLECTION_INDEX_FIELDS = {
-    MATCH_DETAILS_COLLECTION: [
-        "match_id", "away_team_id", "away_team", "away_team_name",
-        "home_team", "home_team_id", "home_team_name", "league_id",
-        "league_name", "ground_name", "match_format", "venue_id",
-        "player_id", "full_name", "position",
-    ],
-    MATCH_STATS_COLLECTION: [
-        "match_id", "away_team_id", "away_team", "away_team_name",
-        "home_team", "home_team_id", "home_team_name", "league_id",
-        "league_name", "ground_name", "match_format", "venue_id",
-    ],
+# Qdrant layout (libraries/collection_layout.py):
+#   "split" = the two collections above, each with its own vectors, payload and indexes
+#   "named" = one MATCHES_COLLECTION whose points hold a named vector per source and the shared payload
+#             once (scripts/migrate_named_vectors.py copies the split collections into it)
+# Both layouts keep MATCH_DETAILS_COLLECTION / MATCH_STATS_COLLECTION as the names of the sources in results.
+QDRANT_LAYOUT = os.getenv("QDRANT_LAYOUT", "split")
+MATCHES_COLLECTION = "matches"
+NAMED_VECTORS = {MATCH_DETAILS_COLLECTION: "details", MATCH_STATS_COLLECTION: "stats"}
+
+# Payload indexes per collection: field -> schema type.
+# Single source of truth for QdrantMatchPusher, scripts/create_qdrant_collections_and_indices.py
+# and scripts/audit_payload_indexes.py. Only payload fields that queries filter on are indexed
+# (names and the `text` summary are not filtered on, so they are not indexed).
+# IDs are stored as strings in the payload (e.g. match_id: "88311"), hence KEYWORD.
+_MATCH_PAYLOAD_INDEXES = {
+    "match_id": "KEYWORD",
+    "league_id": "KEYWORD",
+    "home_team_id": "KEYWORD",
+    "away_team_id": "KEYWORD",
+    "venue_id": "KEYWORD",
+    "home_team": "KEYWORD",
+    "away_team": "KEYWORD",
+    "match_format": "KEYWORD",
+    "match_scheduled_date": "DATETIME",  # range filter for retention pruning
+    "section": "KEYWORD",  # summary section of the point (libraries/section_summaries.py)
+    "faq": "BOOL",  # precomputed FAQ answer points (libraries/faq.py), excluded from question search
+}
+
+# Tenant partitioning (Qdrant >= 1.11, libraries/collection_layout.py):
+#   QDRANT_TENANT_FIELD   "match_id" or "league_id": its keyword index is created with is_tenant, so
+#                         Qdrant stores each tenant's points together; "" = a plain keyword index
+#   QDRANT_TENANT_GRAPHS  new collections get HNSW m=0 + payload_m: one graph per tenant instead of a
+#                         global one. Searches without a tenant filter (cross-match fallback) then scan.
+#   QDRANT_SHARD_BY_LEAGUE new collections use custom sharding with one shard key per league_id
+# Existing collections keep their HNSW/sharding config (scripts/create_qdrant_collections_and_indices.py
+# updates the HNSW config; sharding needs a new collection, e.g. scripts/reindex_collections.py).
+QDRANT_TENANT_FIELD = os.getenv("QDRANT_TENANT_FIELD", "")
+QDRANT_TENANT_GRAPHS = os.getenv("QDRANT_TENANT_GRAPHS", "false").lower() == "true"
+QDRANT_PAYLOAD_M = 16
+QDRANT_SHARD_BY_LEAGUE = os.getenv("QDRANT_SHARD_BY_LEAGUE", "false").lower() == "true"
+QDRANT_SHARDS_PER_KEY = int(os.getenv("QDRANT_SHARDS_PER_KEY", 1))
+QDRANT_DEFAULT_SHARD_KEY = "unknown"  # points without a league_id
+if QDRANT_TENANT_FIELD in _MATCH_PAYLOAD_INDEXES:
+    _MATCH_PAYLOAD_INDEXES[QDRANT_TENANT_FIELD] = "KEYWORD_TENANT"
+# Collections of the configured layout only; the named layout needs a single set for both sources
+PAYLOAD_INDEX_SCHEMA = {MATCHES_COLLECTION: dict(_MATCH_PAYLOAD_INDEXES)} if QDRANT_LAYOUT == "named" else {
+    MATCH_DETAILS_COLLECTION: dict(_MATCH_PAYLOAD_INDEXES),
+    MATCH_STATS_COLLECTION: dict(_MATCH_PAYLOAD_INDEXES),
 }
 
-# IMPORTANT: choose how your IDs are stored in payload:
+# Index fields per collection (derived, kept for existing imports)
+COLLECTION_INDEX_FIELDS = {name: list(fields) for name, fields in PAYLOAD_INDEX_SCHEMA.items()}
+
+# How IDs are stored in payload, must agree with PAYLOAD_INDEX_SCHEMA["match_id"]:
 #   - If payload has numbers (e.g., match_id: 88311 without quotes) → use "INTEGER"
 #   - If payload has strings (e.g., match_id: "88311") → use "KEYWORD"
-ID_INDEX_TYPE = "INTEGER"  # or "KEYWORD"
\ No newline at end of file
+ID_INDEX_TYPE = _MATCH_PAYLOAD_INDEXES["match_id"]
+
+# Hybrid (dense + sparse) retrieval
+# Sparse BM25 vectors are stored next to the dense MiniLM vector under this name.
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+SPARSE_VECTOR_NAME = "text_bm25"
+HYBRID_PREFETCH_LIMIT = 20  # candidates pulled from each of dense/sparse before RRF fusion
+
+# Active matches (entity index, caches): fixtures scheduled after now - this window
+ACTIVE_MATCH_WINDOW_HOURS = int(os.getenv("ACTIVE_MATCH_WINDOW_HOURS", 24))
+ENTITY_INDEX_TTL = int(os.getenv("ENTITY_INDEX_TTL", 5 * 60))  # reload from Mongo after this (squads upserted by another process)
+
+# Cached match_stats documents for the intent fast path (seconds)
+MATCH_STATS_CACHE_TTL = int(os.getenv("MATCH_STATS_CACHE_TTL", 300))
+
+# Upper bound on (match_id, question) pairs per /user/handle_user_questions_batch call
+MAX_BATCH_QUESTIONS = 200
+
+# Payload of question search hits (libraries/payload_projection.py); requests can override all three
+SEARCH_PAYLOAD_INCLUDE = [f for f in os.getenv("SEARCH_PAYLOAD_INCLUDE", "").split(",") if f]  # empty = all fields
+SEARCH_PAYLOAD_EXCLUDE = [f for f in os.getenv("SEARCH_PAYLOAD_EXCLUDE", "").split(",") if f]
+SEARCH_SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", 0))  # "text" cut around the best-matching sentence; 0 = full text (clients opt in per request)
+
+# gzip for response bodies of at least this many bytes (clients sending Accept-Encoding: gzip)
+RESPONSE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", 1024))
+RESPONSE_GZIP_LEVEL = 5  # 9 (Starlette's default) costs several times the CPU for a few % smaller bodies
+
+# Answer mode of the question routes (libraries/answer_synthesizer.py)
+ANSWER_MODEL = os.getenv("ANSWER_MODEL", "gpt-4o-mini")
+ANSWER_CONTEXT_TOKENS = int(os.getenv("ANSWER_CONTEXT_TOKENS", 1500))  # budget of the retrieved context in the prompt
+ANSWER_MAX_TOKENS = 300
+ANSWER_CACHE_SIZE = 4096
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", 6 * 60 * 60))  # keys carry the summary version; this only bounds memory
+
+# Semantic question cache (libraries/semantic_cache.py): earlier results reused for paraphrased questions
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.9))  # cosine similarity of the question embeddings
+SEMANTIC_CACHE_MAX_PER_MATCH = 256
+SEMANTIC_CACHE_MAX_MATCHES = 512
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 30 * 60))  # entries are also dropped when the match's points_version changes
+POINTS_VERSION_CACHE_TTL = float(os.getenv("POINTS_VERSION_CACHE_TTL", 5))  # how long a process trusts its copy of a match's points_version
+
+# Precomputed FAQ answers (libraries/faq.py): generated per match after its sections are embedded,
+# stored in Mongo and as `faq` points, and served before any retrieval when a question matches
+FAQ_ENABLED = os.getenv("FAQ_ENABLED", "true").lower() == "true"
+FAQ_QUESTIONS = {
+    "winner": "Who will win the match?",
+    "pitch": "What is the pitch report for the match?",
+    "weather": "What is the weather forecast for the match?",
+    "predicted_scores": "What are the predicted scores for the match?",
+    "key_players": "Who are the key players to watch in the match?",
+}
+FAQ_COLLECTION = "match_faqs"
+FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", 0.85))  # cosine of the question to the FAQ question
+FAQ_CACHE_TTL = int(os.getenv("FAQ_CACHE_TTL", 10 * 60))  # in-process copy of a match's FAQ answers, also dropped when its points_version changes
+
+# Local mirror of the active fixtures' vectors (libraries/vector_mirror.py) for cross-match questions:
+# float32 matrices memory-mapped (and shared) by every worker, re-synced with Qdrant after each embedding run
+VECTOR_MIRROR_ENABLED = os.getenv("VECTOR_MIRROR_ENABLED", "true").lower() == "true"
+VECTOR_MIRROR_DIR = os.getenv("VECTOR_MIRROR_DIR", "vector_mirror")
+VECTOR_MIRROR_MAX_AGE_SECONDS = int(os.getenv("VECTOR_MIRROR_MAX_AGE_SECONDS", 3 * 60 * 60))  # older mirrors are not served (Qdrant instead)
+CROSS_MATCH_TOP_K = 10
+
+# Blue/green reindex: MATCH_DETAILS_COLLECTION / MATCH_STATS_COLLECTION are aliases that point at
+# versioned physical collections named "<alias>_v<YYYYmmddHHMMSS>" (see scripts/reindex_collections.py)
+REINDEX_KEEP_VERSIONS = 2  # previous versions kept for rollback
+
+# Retention of finished matches (Mongo + Qdrant), driven by match_scheduled_date
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", 7))
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "archive")
+RETENTION_BATCH_SIZE = 256
+RETENTION_MONGO_COLLECTIONS = ["match_details", "match_stats", "match_faqs"]
+
+
+# Distributed cron workers: fixtures are leased one at a time through this Mongo collection
+FIXTURE_LEASE_COLLECTION = "fixture_leases"
+LEASE_TTL_SECONDS = int(os.getenv("LEASE_TTL_SECONDS", 120))  # lease expires (and can be taken over) after this
+LEASE_HEARTBEAT_SECONDS = int(os.getenv("LEASE_HEARTBEAT_SECONDS", 30))  # held leases are extended this often
+CRON_CYCLE_SECONDS = int(os.getenv("CRON_CYCLE_SECONDS", 3600))  # a fixture is processed once per cycle
+WORKER_ID = os.getenv("WORKER_ID")  # defaults to "<hostname>-<pid>"
+
+# Refresh scheduler: full re-enrichment interval by hours to match_scheduled_date
+# (first tier whose bound is >= hours to start; None = any further out)
+REFRESH_TIERS = [
+    (1, 15 * 60),
+    (6, 60 * 60),
+    (24, 3 * 60 * 60),
+    (72, 12 * 60 * 60),
+    (None, 24 * 60 * 60),
+]
+SQUAD_POLL_WINDOW_HOURS = 3  # only poll SOURCE_URL_4 (squads) this close to the start
+SQUAD_POLL_INTERVAL_SECONDS = 5 * 60
+REFRESH_SCHEDULE_COLLECTION = "refresh_schedule"
+REFRESH_SCHEDULER_ENABLED = os.getenv("REFRESH_SCHEDULER_ENABLED", "false").lower() == "true"
+REFRESH_TICK_SECONDS = int(os.getenv("REFRESH_TICK_SECONDS", 60))
+
+# Cron run ledger: per-fixture stage checkpoints so an interrupted run resumes where it stopped
+CRON_RUNS_COLLECTION = "cron_runs"
+CRON_RUN_FIXTURES_COLLECTION = "cron_run_fixtures"
+LEDGER_MAX_ATTEMPTS = 5  # per fixture and run, then the fixture is given up until the next run
+LEDGER_BACKOFF_BASE_SECONDS = 30  # retry after base * 2^(attempt-1), capped
+LEDGER_BACKOFF_MAX_SECONDS = 30 * 60
+
+# Circuit breakers per dependency (libraries/circuit_breaker.py); names: source_url, source_url_1..4, openai, qdrant
+BREAKER_DEFAULTS = {
+    "window": 20,  # last N calls considered
+    "min_calls": 5,  # before the breaker may open
+    "failure_rate": 0.5,
+    "slow_call_ms": 10000,
+    "slow_rate": 0.8,
+    "reset_timeout": 30,  # seconds open before half-open probing
+    "half_open_calls": 1,
+}
+BREAKER_OVERRIDES = {
+    "openai": {"slow_call_ms": 45000, "reset_timeout": 60},
+    "qdrant": {"slow_call_ms": 3000},
+}
+UPSTREAM_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", 10))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", 60))
+
+# Cassettes of raw upstream/OpenAI responses (libraries/cassette.py, scripts/replay_cassette.py)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")  # off | record | replay
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "cassettes")
+CASSETTE_NAME = os.getenv("CASSETTE_NAME")  # default: today's date when recording
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", 1.0))  # replay: 1 = recorded latency, 0.1 = 10x faster, 0 = none
+
+# Production serving (gunicorn.conf.py)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))  # worker processes
+TORCH_THREADS_PER_WORKER = int(os.getenv("TORCH_THREADS_PER_WORKER", 0))  # 0 = cores / workers
@@ -1,14 +1,22 @@
 # === controllers/admin_controller.py ===
-from config.settings import SOURCE_URL, SOURCE_URL_1, SOURCE_URL_2, SOURCE_URL_3, SOURCE_URL_4
+from config.settings import SOURCE_URL, SOURCE_URL_1, SOURCE_URL_2, SOURCE_URL_3, SOURCE_URL_4, MATCH_DETAILS_COLLECTION, MATCH_STATS_COLLECTION
 from utils.logger import get_logger
 import requests
 from datetime import datetime
 from models.admin_model import AdminModel
+from controllers.user_controller import get_answer_stats, get_question_path_stats
+from libraries.circuit_breaker import breaker_snapshot
+from libraries.vector_mirror import vector_mirror
+from utils.metrics import metrics
 
 admin_model = AdminModel()
 
 logger = get_logger(__name__)
 
+def reset_clients():
+    """Called in each gunicorn worker after fork."""
+    admin_model.connect()
+
 def add_update_match_description(description_type: str = None, description_data: dict = {}):
     try:
         if not description_type or str(description_type).strip() == "":
@@ -20,4 +28,25 @@ def add_update_match_description(description_type: str = None, description_data:
         return master_description_detail
     except Exception as e:
         logger.error(f"Error in master_trigger: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def get_metrics():
+    try:
+        return {
+            "responseCode": "200",
+            "responseMessage" : "Metrics fetched successfully.",
+            "responseData" : {
+                "question_path": get_question_path_stats(),
+                "answers": get_answer_stats(),
+                "vector_mirror": vector_mirror.stats([MATCH_DETAILS_COLLECTION, MATCH_STATS_COLLECTION]),
+                "breakers": breaker_snapshot(),
+                **metrics.snapshot(),
+            }
+        }
+    except Exception as e:
+        logger.error(f"Error in get_metrics: {e}")
+        return {
+            "responseCode": "500",
+            "responseMessage" : "Failed to fetch metrics.",
+            "responseData" : {}
+        }
@@ -1,25 +1,121 @@
 # === controllers/cron_controller.py ===
-from config.settings import SOURCE_URL, SOURCE_URL_1, SOURCE_URL_2, SOURCE_URL_3, SOURCE_URL_4
+from config.settings import SOURCE_URL, SOURCE_URL_1, SOURCE_URL_2, SOURCE_URL_3, SOURCE_URL_4, MATCH_DETAILS_COLLECTION, MATCH_STATS_COLLECTION
+from config.settings import RETENTION_DAYS, RETENTION_ARCHIVE_DIR, RETENTION_BATCH_SIZE, RETENTION_MONGO_COLLECTIONS
+from config.settings import FIXTURE_LEASE_COLLECTION, LEASE_TTL_SECONDS, LEASE_HEARTBEAT_SECONDS, CRON_CYCLE_SECONDS, WORKER_ID
+from config.settings import REFRESH_TIERS, SQUAD_POLL_WINDOW_HOURS, SQUAD_POLL_INTERVAL_SECONDS, REFRESH_SCHEDULE_COLLECTION
+from config.settings import CRON_RUNS_COLLECTION, CRON_RUN_FIXTURES_COLLECTION, LEDGER_MAX_ATTEMPTS, LEDGER_BACKOFF_BASE_SECONDS, LEDGER_BACKOFF_MAX_SECONDS
+from config.settings import FAQ_ENABLED, VECTOR_MIRROR_ENABLED
 from utils.logger import get_logger
-import requests
 from datetime import datetime
 from models.cron_model import CronModel
-from libraries.api_client import APIClient
+from libraries.api_client import APIClient, UpstreamError
 from libraries.ai_model import AIModel
 from libraries.qdrant_client import QdrantMatchPusher
-from langchain_core.documents import Document
+from libraries.collection_layout import collection_targets
+from libraries.entity_index import match_entity_index
+from libraries.semantic_cache import semantic_question_cache
+from libraries.faq import FaqPrecomputer, faq_lookup
+from libraries.vector_mirror import vector_mirror
+from libraries.retention import RetentionManager
+from libraries.fixture_leases import FixtureLeaseManager, MongoLeaseStore, current_cycle, run_leased
+from libraries.refresh_scheduler import RefreshScheduler
+from libraries.section_summaries import SECTIONS, SectionSummarizer, join_sections
+from libraries.run_ledger import RunLedger, STAGES
+from utils.metrics import metrics
+from models.cron_model import match_stats_cache
+from models.match_types import MatchBase, MatchDetails, MatchStats, SquadPlayer, decode
 
 cron_model = CronModel()
 api_client = APIClient()
 ai_model = AIModel()
+section_summarizer = SectionSummarizer(ai_model)
 
 logger = get_logger(__name__)
 
+_lease_manager = None
+
+def get_lease_manager():
+    global _lease_manager
+    if _lease_manager is None:
+        _lease_manager = FixtureLeaseManager(
+            MongoLeaseStore(cron_model.mongo_db[FIXTURE_LEASE_COLLECTION]),
+            worker_id=WORKER_ID,
+            ttl=LEASE_TTL_SECONDS,
+            heartbeat=LEASE_HEARTBEAT_SECONDS,
+        )
+    return _lease_manager
+
+def fetch_fixtures():
+    return api_client.get(SOURCE_URL)
+
+def fetch_squad(fixture):
+    """SOURCE_URL_4 only: the cheap call the scheduler polls near start time."""
+    payload = {"sports_id": "7", "season_game_uid": fixture["season_game_uid"], "league_id": fixture["league_id"]}
+    result = _post_upstream(SOURCE_URL_4, payload)
+    return result.get("data") if result else []
+
+def _post_upstream(url, payload):
+    """api_client.post that raises instead of handing back {"error": ...}, so the fixture is retried."""
+    result = api_client.post(url, payload)
+    if isinstance(result, dict) and "error" in result:
+        raise UpstreamError(f"{url}: {result['error']}")
+    return result
+
+_run_ledger = None
+
+def get_run_ledger():
+    global _run_ledger
+    if _run_ledger is None:
+        _run_ledger = RunLedger(
+            cron_model.mongo_db[CRON_RUNS_COLLECTION],
+            cron_model.mongo_db[CRON_RUN_FIXTURES_COLLECTION],
+            max_attempts=LEDGER_MAX_ATTEMPTS,
+            backoff_base=LEDGER_BACKOFF_BASE_SECONDS,
+            backoff_max=LEDGER_BACKOFF_MAX_SECONDS,
+            leases=get_lease_manager(),
+        )
+    return _run_ledger
+
+_pushers = None
+
+def get_pushers():
+    """(match_details, match_stats) Qdrant pushers, created once per process."""
+    global _pushers
+    if _pushers is None:
+        _pushers = (
+            QdrantMatchPusher(collection_name=MATCH_DETAILS_COLLECTION),
+            QdrantMatchPusher(collection_name=MATCH_STATS_COLLECTION),
+        )
+    return _pushers
+
+_refresh_scheduler = None
+
+def get_refresh_scheduler():
+    global _refresh_scheduler
+    if _refresh_scheduler is None:
+        _refresh_scheduler = RefreshScheduler(
+            cron_model.mongo_db[REFRESH_SCHEDULE_COLLECTION],
+            get_lease_manager(),
+            fetch_fixtures=fetch_fixtures,
+            fetch_squad=fetch_squad,
+            enrich=process_fixture,
+            tiers=REFRESH_TIERS,
+            squad_window_hours=SQUAD_POLL_WINDOW_HOURS,
+            squad_interval=SQUAD_POLL_INTERVAL_SECONDS,
+            after_refresh=lambda: _sync_vector_mirror(get_pushers()),
+        )
+    return _refresh_scheduler
+
+def reset_clients():
+    """Called in each gunicorn worker after fork: no Mongo/Qdrant/OpenAI client or thread crosses the fork."""
+    global _lease_manager, _run_ledger, _pushers, _refresh_scheduler, _faq_precomputer
+    cron_model.connect()
+    ai_model.connect()
+    _lease_manager = _run_ledger = _pushers = _refresh_scheduler = _faq_precomputer = None
+
 def get_upcoming_matches_list():
     try:
-        result = requests.get(SOURCE_URL)
-        result.raise_for_status()
-        fixtures = result.json()
+        fixtures = api_client.get(SOURCE_URL)
         if fixtures:
             matches = [
                 {
@@ -55,257 +151,382 @@ def get_upcoming_matches_list():
             "responseData" : {}
         }
     
+def fetch_fixture(fixture):
+    """Stage 1: SOURCE_URL_1..4 for one fixture → (MatchDetails, MatchStats) without summaries."""
+    payload = {}
+    payload["sports_id"] = "7"
+    payload["season_game_uid"] = fixture["season_game_uid"]
+    payload["league_id"] = fixture["league_id"]
+
+    # any failed or short-circuited call fails the stage: no half-enriched record is summarized or stored
+    result_1 = _post_upstream(SOURCE_URL_1, payload)
+    result_2 = _post_upstream(SOURCE_URL_2, payload)
+    result_3 = _post_upstream(SOURCE_URL_3, payload)
+    result_4 = _post_upstream(SOURCE_URL_4, payload)
+
+    result_1_data = result_1.get("data") if result_1 else None
+    base_fields = MatchBase.base_fields(fixture, result_1_data)
+    match_details = MatchDetails(**base_fields)
+    match_stats = MatchStats(**base_fields)
+
+    if result_4 and result_4.get("data"):
+        squad = [SquadPlayer.from_upstream(player) for player in result_4.get("data")]
+        match_details.home_team_squad = [p for p in squad if p.team_id == match_details.home_team_id]
+        match_details.away_team_squad = [p for p in squad if p.team_id == match_details.away_team_id]
+
+    if result_2 and result_2.get("data"):
+        result_2_data = result_2.get("data")
+
+        toss_trend = result_2_data.get("toss_trend", {})
+        if toss_trend:
+            match_stats.bat_first_win_on_this_venue = toss_trend.get("bat_first_win", "")
+            match_stats.bat_second_win_on_this_venue = toss_trend.get("bat_second_win", "")
+            match_stats.total_matches_played_on_this_venue = toss_trend.get("total_matches", "")
+
+        statement_tip = result_2_data.get("statement_tip", {})
+        if statement_tip:
+            match_stats.pitch_support_type = statement_tip.get("bat_type", "")
+            match_stats.bowling_support_type = statement_tip.get("bow_type", "")
+
+        recent_matches_stats = result_2_data.get("recent_matches_stats", {})
+        if recent_matches_stats:
+            match_stats.avg_first_inning_score = recent_matches_stats.get("avg_first_score", "")
+            match_stats.avg_second_inning_score = recent_matches_stats.get("avg_second_score", "")
+            match_stats.avg_first_inning_wicket = recent_matches_stats.get("avg_first_wicket", "")
+            match_stats.avg_second_inning_wicket = recent_matches_stats.get("avg_second_wicket", "")
+
+        venue_pitch_report = result_2_data.get("venue_pitch_report", {})
+        if venue_pitch_report:
+            match_stats.pitch_support_description = venue_pitch_report.get("pitch_support", "")
+            match_stats.bowling_support_description = venue_pitch_report.get("bowling_support", "")
+            match_stats.weather_report_description = venue_pitch_report.get("weather_report", "")
+
+        weather = result_2_data.get("weather", {})
+        if weather:
+            match_stats.temperature = weather.get("temp", "")
+            match_stats.clouds = weather.get("clouds", "")
+            match_stats.weather = weather.get("weather", "")
+            match_stats.humidity = weather.get("humidity", "")
+            match_stats.visibility = weather.get("visibility", "")
+            match_stats.wind_speed = weather.get("wind_speed", "")
+            match_stats.weather_desc = weather.get("weather_desc", "")
+
+    if result_3 and result_3.get("data"):
+        result_3_data = result_3.get("data")
+
+        score_prediction = result_3_data.get("score_prediction", {})
+        if score_prediction and score_prediction.get(match_details.home_team_id):
+            score_data = score_prediction[match_details.home_team_id]
+            match_stats.home_team_score_prediction = score_data["score"]
+            match_stats.home_team_wicket_prediction = score_data["wickets"]
+        if score_prediction and score_prediction.get(match_details.away_team_id):
+            score_data = score_prediction[match_details.away_team_id]
+            match_stats.away_team_score_prediction = score_data["score"]
+            match_stats.away_team_wicket_prediction = score_data["wickets"]
+
+        win_margin_data = result_3_data.get("win_margin_data", {})
+        if win_margin_data:
+            win_team_id = win_margin_data.get("team_uid", "")
+            if win_team_id in (match_details.home_team_id, match_details.away_team_id):
+                is_home = win_team_id == match_details.home_team_id
+                match_stats.win_team_id = win_team_id
+                match_stats.win_team_name = match_details.home_team_name if is_home else match_details.away_team_name
+                match_stats.win_team_win_probability = win_margin_data.get("win_probability", "")
+                match_stats.win_team_run = win_margin_data.get("run", "")
+                match_stats.win_team_wicket = win_margin_data.get("wicket", "")
+
+    return match_details, match_stats
+
+def summarize_fixture(match_details, match_stats, section_counts=None):
+    """Stage 2: (re)generate the summary sections that changed. `section_counts` accumulates reused vs rebuilt."""
+    # only sections whose input fields changed since the stored version go to the LLM
+    previous_details = cron_model.get_match_details(match_details.match_id)
+    previous_stats = cron_model.get_match_stats(match_details.match_id)
+
+    match_details_desciption = cron_model.get_match_description("match_details")
+    match_details.match_details_sections, details_counts = section_summarizer.summarize(
+        match_details, previous_details.match_details_sections if previous_details else None, match_details_desciption
+    )
+    match_details.match_details_summary = join_sections(match_details.match_details_sections)
+
+    match_stats_desciption = cron_model.get_match_description("match_stats")
+    match_stats.match_stats_sections, stats_counts = section_summarizer.summarize(
+        match_stats, previous_stats.match_stats_sections if previous_stats else None, match_stats_desciption
+    )
+    match_stats.match_stats_summary = join_sections(match_stats.match_stats_sections)
+    if section_counts is not None:
+        for key in ("reused", "rebuilt"):
+            section_counts[key] = section_counts.get(key, 0) + details_counts[key] + stats_counts[key]
+
+def persist_fixture(match_details, match_stats):
+    """Stage 3: upsert both documents to Mongo, refresh the entity index and drop the match's cached answers."""
+    upsert_match_detail_res = cron_model.upsert_match_detail_by_id(match_stats.match_id, match_details)
+    upsert_match_stats_res = cron_model.upsert_match_stats_by_id(match_stats.match_id, match_stats)
+    for res in (upsert_match_detail_res, upsert_match_stats_res):
+        if res.get("status") == "error":
+            raise RuntimeError(f'Mongo upsert failed for {match_stats.match_id}: {res.get("message")}')
+    match_entity_index.upsert_match(match_details.to_dict())
+    match_stats_cache.invalidate(match_stats.match_id)
+    semantic_question_cache.invalidate(match_stats.match_id)
+    faq_lookup.invalidate(match_stats.match_id)
+
+def embed_fixture(match_id, counts):
+    """Stage 4: push the changed sections of both stored documents (re-read: they carry the `embedded` markers)."""
+    details_pusher, stats_pusher = get_pushers()
+    _embed_match(details_pusher, "match_details", cron_model.get_match_details(match_id),
+                 "match_details_summary", "match_details_sections", counts)
+    _embed_match(stats_pusher, "match_stats", cron_model.get_match_stats(match_id),
+                 "match_stats_summary", "match_stats_sections", counts)
+
+def process_fixture(fixture, still_owner=None, section_counts=None, embed_counts=None, faq_counts=None):
+    """
+    Fetch, summarize, upsert, embed and precompute the FAQs of one SOURCE_URL fixture (all
+    ledger stages in one go); returns the MatchDetails, or False. `still_owner` (optional) is
+    checked before the LLM calls and before the writes, so a worker whose lease was taken
+    over stops.
+    """
+    match_details, match_stats = fetch_fixture(fixture)
+
+    if still_owner and not still_owner():
+        logger.warning(f'⚠️ Lease on fixture {fixture["season_game_uid"]} lost before summarization, skipping')
+        return False
+
+    summarize_fixture(match_details, match_stats, section_counts)
+
+    if still_owner and not still_owner():
+        logger.warning(f'⚠️ Lease on fixture {fixture["season_game_uid"]} lost before upsert, skipping')
+        return False
+
+    persist_fixture(match_details, match_stats)
+    embed_fixture(match_details.match_id, embed_counts if embed_counts is not None else {"reused": 0, "rebuilt": 0})
+    _precompute_faqs(match_details.match_id, faq_counts if faq_counts is not None else {})
+    return match_details
+
+def _fixture_stages(section_counts, embed_counts, faq_counts):
+    """Ledger stages of one fixture; state between stages is the two documents as plain dicts."""
+
+    def typed(state):
+        return decode(state["match_details"], MatchDetails), decode(state["match_stats"], MatchStats)
+
+    def as_state(match_details, match_stats):
+        return {"match_details": match_details.to_dict(), "match_stats": match_stats.to_dict()}
+
+    def fetched(fixture, state):
+        return as_state(*fetch_fixture(fixture))
+
+    def summarized(fixture, state):
+        match_details, match_stats = typed(state)
+        summarize_fixture(match_details, match_stats, section_counts)
+        return as_state(match_details, match_stats)
+
+    def persisted(fixture, state):
+        persist_fixture(*typed(state))
+
+    def embedded(fixture, state):
+        embed_fixture(state["match_details"]["match_id"], embed_counts)
+
+    def faqs(fixture, state):
+        _precompute_faqs(state["match_details"]["match_id"], faq_counts)
+
+    return list(zip(STAGES, (fetched, summarized, persisted, embedded, faqs)))
+
 def get_upcoming_matches_cron():
     try:
-        result = requests.get(SOURCE_URL)
-        result.raise_for_status()
-        fixtures = result.json()
+        fixtures = api_client.get(SOURCE_URL)
         if fixtures:
-            for fixture in fixtures:
 
-                # if fixture["season_game_uid"] != "91916":
-                #     continue
-
-                payload = {}
-                payload["sports_id"] = "7"
-                payload["season_game_uid"] = fixture["season_game_uid"]
-                payload["league_id"] = fixture["league_id"]
-
-                result_1 = api_client.post(SOURCE_URL_1, payload)
-                result_2 = api_client.post(SOURCE_URL_2, payload)
-                result_3 = api_client.post(SOURCE_URL_3, payload)
-                result_4 = api_client.post(SOURCE_URL_4, payload)
-
-                match_details = {}
-                match_details["match_id"] = fixture.get("season_game_uid", "")
-                match_details["league_id"] = fixture.get("league_id", "")
-                match_details["league_name"] = fixture.get("league_name", "")
-                match_details["home_team"] = fixture.get("home", "")
-                match_details["away_team"] = fixture.get("away", "")
-                match_details["match_format"] = fixture.get("format", "")
-                match_details["match_scheduled_date"] = fixture.get("season_scheduled_date", "")
-                match_details["lineup_announce"] = fixture.get("playing_announce", "")
-
-                if result_1 and result_1.get("data"):
-                    result_1_data = result_1.get("data")
-                    match_details["ground_name"] = result_1_data.get("ground_name", "")
-                    match_details["venue_id"] = result_1_data.get("venue_id", "")
-                    match_details["match_title"] = result_1_data.get("subtitle", "")
-                    match_details["home_team_id"] = result_1_data.get("home_uid", "")
-                    match_details["away_team_id"] = result_1_data.get("away_uid", "")
-                    match_details["home_team_name"] = result_1_data.get("home_team", "")
-                    match_details["away_team_name"] = result_1_data.get("away_team", "")
-
-                if result_4 and result_4.get("data"):
-                    result_4_data = result_4.get("data")
-
-                    home_squad = [
-                        {
-                            "team_id": player.get("team_uid"),
-                            "player_id": player.get("player_uid"),
-                            "full_name": player.get("full_name"),
-                            "nick_name": player.get("nick_name"),
-                            "position": player.get("position"),
-                            "last_match_played": player.get("last_match_played")
-                        }
-                        for player in result_4_data
-                        if player.get("team_uid") ==  match_details["home_team_id"]
-                    ]
-                    match_details["home_team_squad"] = home_squad
-
-                    away_squad = [
-                        {
-                            "team_id": player.get("team_uid"),
-                            "player_id": player.get("player_uid"),
-                            "full_name": player.get("full_name"),
-                            "nick_name": player.get("nick_name"),
-                            "position": player.get("position"),
-                            "last_match_played": player.get("last_match_played")
-                        }
-                        for player in result_4_data
-                        if player.get("team_uid") ==  match_details["away_team_id"]
-                    ]
-                    match_details["away_team_squad"] = away_squad
-                
-                match_stats = {}
-                match_stats["match_id"] = fixture.get("season_game_uid", "")
-                match_stats["league_id"] = fixture.get("league_id", "")
-                match_stats["league_name"] = fixture.get("league_name", "")
-                match_stats["home_team"] = fixture.get("home", "")
-                match_stats["away_team"] = fixture.get("away", "")
-                match_stats["match_format"] = fixture.get("format", "")
-                match_stats["match_scheduled_date"] = fixture.get("season_scheduled_date", "")
-                match_stats["lineup_announce"] = fixture.get("playing_announce", "")
-
-                if result_1 and result_1.get("data"):
-                    result_1_data = result_1.get("data")
-                    match_stats["ground_name"] = result_1_data.get("ground_name", "")
-                    match_stats["venue_id"] = result_1_data.get("venue_id", "")
-                    match_stats["match_title"] = result_1_data.get("subtitle", "")
-                    match_stats["home_team_id"] = result_1_data.get("home_uid", "")
-                    match_stats["away_team_id"] = result_1_data.get("away_uid", "")
-                    match_stats["home_team_name"] = result_1_data.get("home_team", "")
-                    match_stats["away_team_name"] = result_1_data.get("away_team", "")
-
-                if result_2 and result_2.get("data"):
-                    result_2_data = result_2.get("data")
-
-                    toss_trend = result_2_data.get("toss_trend", {})
-                    if toss_trend:
-                        match_stats["bat_first_win_on_this_venue"] = toss_trend.get("bat_first_win", "")
-                        match_stats["bat_second_win_on_this_venue"] = toss_trend.get("bat_second_win", "")
-                        match_stats["total_matches_played_on_this_venue"] = toss_trend.get("total_matches", "")
-
-                    statement_tip = result_2_data.get("statement_tip", {})
-                    if statement_tip:
-                        match_stats["pitch_support_type"] = statement_tip.get("bat_type", "")
-                        match_stats["bowling_support_type"] = statement_tip.get("bow_type", "")
-
-                    recent_matches_stats = result_2_data.get("recent_matches_stats", {})
-                    if recent_matches_stats:
-                        match_stats["avg_first_inning_score"] = recent_matches_stats.get("avg_first_score", "")
-                        match_stats["avg_second_inning_score"] = recent_matches_stats.get("avg_second_score", "")
-                        match_stats["avg_first_inning_wicket"] = recent_matches_stats.get("avg_first_wicket", "")
-                        match_stats["avg_second_inning_wicket"] = recent_matches_stats.get("avg_second_wicket", "")
-
-                    venue_pitch_report = result_2_data.get("venue_pitch_report", {})
-                    if venue_pitch_report:
-                        match_stats["pitch_support_description"] = venue_pitch_report.get("pitch_support", "")
-                        match_stats["bowling_support_description"] = venue_pitch_report.get("bowling_support", "")
-                        match_stats["weather_report_description"] = venue_pitch_report.get("weather_report", "")
-
-                    weather = result_2_data.get("weather", {})
-                    if weather:
-                        match_stats["temperature"] = weather.get("temp", "")
-                        match_stats["clouds"] = weather.get("clouds", "")
-                        match_stats["weather"] = weather.get("weather", "")
-                        match_stats["humidity"] = weather.get("humidity", "")
-                        match_stats["visibility"] = weather.get("visibility", "")
-                        match_stats["wind_speed"] = weather.get("wind_speed", "")
-                        match_stats["weather_desc"] = weather.get("weather_desc", "")
-                
-                if result_3 and result_3.get("data"):
-                    result_3_data = result_3.get("data")
-
-                    score_prediction = result_3_data.get("score_prediction", {})
-                    if score_prediction and score_prediction[match_details["home_team_id"]]:
-                        score_data = score_prediction[match_details["home_team_id"]]
-                        match_stats["home_team_score_prediction"] = score_data["score"]
-                        match_stats["home_team_wicket_prediction"] = score_data["wickets"]
-                    if score_prediction and score_prediction[match_details["away_team_id"]]:
-                        score_data = score_prediction[match_details["away_team_id"]]
-                        match_stats["away_team_score_prediction"] = score_data["score"]
-                        match_stats["away_team_wicket_prediction"] = score_data["wickets"]
-
-                    win_margin_data = result_3_data.get("win_margin_data", {})
-                    if win_margin_data:
-                        win_team_id = win_margin_data.get("team_uid", "")
-                        if win_team_id == match_details["home_team_id"]:
-                            match_stats["win_team_id"] = match_details["home_team_id"]
-                            match_stats["win_team_name"] = match_details["home_team_name"]
-                            match_stats["win_team_win_probability"] = win_margin_data.get("win_probability", "")
-                            match_stats["win_team_run"] = win_margin_data.get("run", "")
-                            match_stats["win_team_wicket"] = win_margin_data.get("wicket", "")
-                        elif win_team_id == match_details["away_team_id"]:
-                            match_stats["win_team_id"] = match_details["away_team_id"]
-                            match_stats["win_team_name"] = match_details["away_team_name"]
-                            match_stats["win_team_win_probability"] = win_margin_data.get("win_probability", "")
-                            match_stats["win_team_run"] = win_margin_data.get("run", "")
-                            match_stats["win_team_wicket"] = win_margin_data.get("wicket", "")      
-                
-                match_details_desciption = cron_model.get_match_description("match_details")
-                match_details_summary = ai_model.generate_documentation(match_details, match_details_desciption)
-                match_details["match_details_summary"] = match_details_summary
-
-                match_stats_desciption = cron_model.get_match_description("match_stats")
-                match_stats_summary = ai_model.generate_documentation(match_stats, match_stats_desciption)
-                match_stats["match_stats_summary"] = match_stats_summary
-            
-                upsert_match_detail_res = cron_model.upsert_match_detail_by_id(match_stats["match_id"], match_details)
-                upsert_match_stats_res = cron_model.upsert_match_stats_by_id(match_stats["match_id"], match_stats)
-
-            logger.info(f'✅ upsert_match_detail_res and upsert_match_stats_res successfully at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+            # fixtures = [f for f in fixtures if f["season_game_uid"] == "91916"]
+
+            section_counts = {"reused": 0, "rebuilt": 0}
+            embed_counts = {"reused": 0, "rebuilt": 0}
+            faq_counts = {"generated": 0, "reused": 0, "failed": 0}
+            run = get_run_ledger().run(
+                fixtures,
+                _fixture_stages(section_counts, embed_counts, faq_counts),
+                resume_window=CRON_CYCLE_SECONDS,
+            )
+            run["sections"] = section_counts
+            run["embedded_sections"] = embed_counts
+            run["faqs"] = faq_counts
+            run["vector_mirror"] = _sync_vector_mirror(get_pushers())
+
+            logger.info(f'✅ Cron run {run["run_id"]} ({"resumed" if run["resumed"] else "new"}): {run["done"]} fixtures done, {run["retry"] + run["waiting"]} pending retry, {run["busy"] + run["lost"]} held elsewhere, {run["given_up"]} given up, {run["stages_skipped"]} stages skipped; sections {section_counts["rebuilt"]} rebuilt, {section_counts["reused"]} reused')
             return {
                 "responseCode": "200",
                 "responseMessage" : "upsert_match_detail_res and upsert_match_stats_res successfully.",
-                "responseData" : {}
+                "responseData" : run
             }
         else:
-            logger.info(f'❌ upsert_match_detail_res and upsert_match_stats_res {match_stats["match_id"]} error at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+            logger.info(f'❌ upsert_match_detail_res and upsert_match_stats_res error at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
             return {
                 "responseCode": "400",
                 "responseMessage" : "upsert_match_detail_res and upsert_match_stats_res error.",
                 "responseData" : {}
             }
     except Exception as e:
-        logger.info(f'❌ Failed to upsert_match_detail_res and upsert_match_stats_res {match_stats["match_id"]}: {e}')
+        logger.info(f'❌ Failed to upsert_match_detail_res and upsert_match_stats_res: {e}')
         return {
             "responseCode": "500",
             "responseMessage" : "Failed to upsert_match_detail_res and upsert_match_stats_res.",
             "responseData" : {}
         }
     
+def run_cron_worker_cycle(cycle: str = None):
+    """
+    Leased variant of get_upcoming_matches_cron: any number of workers (processes or nodes)
+    can run it concurrently and each fixture is fetched and summarized by exactly one of them
+    per cycle.
+    """
+    try:
+        fixtures = api_client.get(SOURCE_URL) or []
+        cycle = cycle or current_cycle(CRON_CYCLE_SECONDS)
+        section_counts = {"reused": 0, "rebuilt": 0}
+        embed_counts = {"reused": 0, "rebuilt": 0}
+        faq_counts = {"generated": 0, "reused": 0, "failed": 0}
+        stats = run_leased(
+            fixtures, get_lease_manager(), cycle,
+            lambda fixture, still_owner: process_fixture(fixture, still_owner, section_counts, embed_counts, faq_counts),
+        )
+        stats["sections"] = section_counts
+        stats["embedded_sections"] = embed_counts
+        stats["faqs"] = faq_counts
+        if stats["processed"]:
+            stats["vector_mirror"] = _sync_vector_mirror(get_pushers())
+
+        logger.info(f'✅ Worker {stats["worker_id"]} cycle {cycle}: processed {stats["processed"]}, skipped {stats["skipped"]}, lost {stats["lost"]}, failed {stats["failed"]}')
+        return {
+            "responseCode": "200",
+            "responseMessage" : "Cron worker cycle completed.",
+            "responseData" : stats
+        }
+    except Exception as e:
+        logger.info(f'❌ Failed to run cron worker cycle: {e}')
+        return {
+            "responseCode": "500",
+            "responseMessage" : "Failed to run cron worker cycle.",
+            "responseData" : {}
+        }
+
+def run_refresh_tick():
+    """One scheduler pass: refresh only the fixtures that are due (see RefreshScheduler)."""
+    try:
+        stats = get_refresh_scheduler().tick()
+        return {
+            "responseCode": "200",
+            "responseMessage" : "Refresh tick completed.",
+            "responseData" : stats
+        }
+    except Exception as e:
+        logger.info(f'❌ Failed to run refresh tick: {e}')
+        return {
+            "responseCode": "500",
+            "responseMessage" : "Failed to run refresh tick.",
+            "responseData" : {}
+        }
+
+_faq_precomputer = None
+
+def get_faq_precomputer():
+    """FAQ answers use the question path's searcher and answer synthesizer, so they match live answers."""
+    global _faq_precomputer
+    if _faq_precomputer is None:
+        from controllers.user_controller import get_answer_synthesizer, get_searcher
+        _faq_precomputer = FaqPrecomputer(get_searcher(), get_answer_synthesizer(), ai_model, cron_model)
+    return _faq_precomputer
+
+def _precompute_faqs(match_id, counts):
+    """Stage 5: FAQ answers of a match whose sections are in Qdrant. Never fails the fixture: live retrieval still answers."""
+    if not FAQ_ENABLED:
+        return
+    try:
+        record = cron_model.get_match_details(match_id)
+        if record is None:
+            return
+        for key, n in get_faq_precomputer().precompute(record, get_pushers()[0]).items():
+            counts[key] = counts.get(key, 0) + n
+    except Exception as e:
+        counts["failed"] = counts.get("failed", 0) + 1
+        logger.error(f"❌ FAQ precompute of match {match_id} failed: {e}")
+
+def _sync_vector_mirror(pushers):
+    """Re-sync the local vector mirror after an embedding run or a prune; never fails the run (questions fall back to Qdrant)."""
+    if not VECTOR_MIRROR_ENABLED:
+        return {}
+    report = {}
+    for pusher in pushers:
+        try:
+            report[pusher.collection_name] = vector_mirror.sync(pusher.qdrant, pusher.collection_name)
+        except Exception as e:
+            report[pusher.collection_name] = {"status": "error", "message": str(e)}
+            logger.error(f"❌ Vector mirror sync of '{pusher.collection_name}' failed: {e}")
+    return report
+
+def _points_replaced(match_id):
+    """Cached question results quote the replaced points: drop them here and, via points_version, in every other process."""
+    semantic_question_cache.invalidate(match_id)
+    cron_model.bump_points_version(match_id)
+
+def _embed_match(pusher, mongo_collection, record, summary_field, sections_field, counts):
+    """Push only the sections whose fingerprint is not in Qdrant yet (whole summary for records without sections)."""
+    if record is None:
+        return
+    sections = getattr(record, sections_field)
+    if not sections:
+        doc = QdrantMatchPusher.build_document(record, summary_field)
+        pushed = pusher.push_matches([doc]) if doc else []
+        if pushed:
+            _points_replaced(record.match_id)
+        if doc and not pushed:
+            raise RuntimeError(f"Embedding {record.match_id} failed")
+        return
+
+    pending = [name for name, section in sections.items() if section.embedded != section.fingerprint]
+    counts["reused"] += len(sections) - len(pending)
+    if not pending:
+        return
+    docs = QdrantMatchPusher.build_section_documents(record, sections_field, pending)
+    pushed = pusher.push_matches(docs)
+    counts["rebuilt"] += len(pushed)
+    cron_model.mark_sections_embedded(
+        mongo_collection, record.match_id, sections_field,
+        {doc.metadata["section"]: sections[doc.metadata["section"]].fingerprint for doc in pushed},
+    )
+    # the pre-section whole-summary point and sections that no longer apply
+    stale = [pusher.point_id(record.match_id)] + [pusher.point_id(record.match_id, s.name) for s in SECTIONS if s.name not in sections]
+    pusher.delete_points(stale)
+    _points_replaced(record.match_id)
+    if len(pushed) < len(docs):
+        raise RuntimeError(f"Embedded {len(pushed)}/{len(docs)} sections of {record.match_id}")
+
 def get_upcoming_matches_embeding():
     try:
-        result = requests.get(SOURCE_URL)
-        result.raise_for_status()
-        fixtures = result.json()
+        fixtures = api_client.get(SOURCE_URL)
         if fixtures:
 
-            match_details_docs = []
-            match_stats_docs = []
+            details_pusher, stats_pusher = get_pushers()
+            counts = {"reused": 0, "rebuilt": 0, "failed": 0}
+            faq_counts = {"generated": 0, "reused": 0, "failed": 0}
 
             for fixture in fixtures:
+                try:
+                    _embed_match(details_pusher, "match_details", cron_model.get_match_details(fixture["season_game_uid"]),
+                                 "match_details_summary", "match_details_sections", counts)
+                    _embed_match(stats_pusher, "match_stats", cron_model.get_match_stats(fixture["season_game_uid"]),
+                                 "match_stats_summary", "match_stats_sections", counts)
+                except Exception as e:
+                    counts["failed"] += 1  # unmarked sections are picked up by the next run
+                    logger.error(f"❌ Embedding of fixture {fixture['season_game_uid']} failed: {e}")
+                    continue
+                _precompute_faqs(fixture["season_game_uid"], faq_counts)
+            mirror = _sync_vector_mirror((details_pusher, stats_pusher))
 
-                match_detail_res = cron_model.get_match_details_by_id(fixture["season_game_uid"])
-                if match_detail_res and match_detail_res["match_details_summary"]:
-                    match_detail_metadata = {}
-                    match_detail_metadata["match_id"] = match_detail_res["match_id"]
-                    match_detail_metadata["away_team"] = match_detail_res["away_team"]
-                    match_detail_metadata["away_team_id"] = match_detail_res["away_team_id"]
-                    match_detail_metadata["away_team_name"] = match_detail_res["away_team_name"]
-                    match_detail_metadata["ground_name"] = match_detail_res["ground_name"]
-                    match_detail_metadata["home_team"] = match_detail_res["home_team"]
-                    match_detail_metadata["home_team_id"] = match_detail_res["home_team_id"]
-                    match_detail_metadata["home_team_name"] = match_detail_res["home_team_name"]
-                    match_detail_metadata["league_id"] = match_detail_res["league_id"]
-                    match_detail_metadata["league_name"] = match_detail_res["league_name"]
-                    match_detail_metadata["match_format"] = match_detail_res["match_format"]
-                    match_detail_metadata["match_title"] = match_detail_res["match_title"]
-                    match_detail_metadata["match_scheduled_date"] = match_detail_res["match_scheduled_date"]
-                    match_detail_metadata["venue_id"] = match_detail_res["venue_id"]
-                    match_details_docs.append(Document(page_content=match_detail_res["match_details_summary"], metadata=match_detail_metadata))
-                      
-                match_stats_res = cron_model.get_match_stats_by_id(fixture["season_game_uid"])
-                if match_stats_res and match_stats_res["match_stats_summary"]:
-                    match_stats_metadata = {}
-                    match_stats_metadata["match_id"] = match_stats_res["match_id"]
-                    match_stats_metadata["away_team"] = match_stats_res["away_team"]
-                    match_stats_metadata["away_team_id"] = match_stats_res["away_team_id"]
-                    match_stats_metadata["away_team_name"] = match_stats_res["away_team_name"]
-                    match_stats_metadata["ground_name"] = match_stats_res["ground_name"]
-                    match_stats_metadata["home_team"] = match_stats_res["home_team"]
-                    match_stats_metadata["home_team_id"] = match_stats_res["home_team_id"]
-                    match_stats_metadata["home_team_name"] = match_stats_res["home_team_name"]
-                    match_stats_metadata["league_id"] = match_stats_res["league_id"]
-                    match_stats_metadata["league_name"] = match_stats_res["league_name"]
-                    match_stats_metadata["match_format"] = match_stats_res["match_format"]
-                    match_stats_metadata["match_title"] = match_stats_res["match_title"]
-                    match_stats_metadata["match_scheduled_date"] = match_stats_res["match_scheduled_date"]
-                    match_stats_metadata["venue_id"] = match_stats_res["venue_id"]
-                    match_stats_docs.append(Document(page_content=match_stats_res["match_stats_summary"], metadata=match_stats_metadata))
-
-            pusher = QdrantMatchPusher(collection_name="match_details")
-            pusher.push_matches(match_details_docs)
-
-            pusher = QdrantMatchPusher(collection_name="match_stats")
-            pusher.push_matches(match_stats_docs)
-
-            logger.info(f'✅ Upcoming matches embeding successfully at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+            metrics.incr("embedding.sections.reused", counts["reused"])
+            metrics.incr("embedding.sections.rebuilt", counts["rebuilt"])
+            logger.info(f'✅ Upcoming matches embeding successfully at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")} (sections: {counts["rebuilt"]} re-embedded, {counts["reused"]} reused)')
             return {
                 "responseCode": "200",
                 "responseMessage" : "Upcoming matches embeding successfully.",
-                "responseData" : {}
+                "responseData" : {"sections": counts, "faqs": faq_counts, "vector_mirror": mirror}
             }
         else:
             logger.info(f'❌ Upcoming matches embeding error at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
@@ -320,4 +541,52 @@ def get_upcoming_matches_embeding():
             "responseCode": "500",
             "responseMessage" : "Failed to embeding upcoming matches.",
             "responseData" : {}
-        }
\ No newline at end of file
+        }
+
+def prune_finished_matches(days: int = None, archive: bool = True):
+    try:
+        days = RETENTION_DAYS if days is None else days
+        run_at = datetime.now()
+        retention = RetentionManager(
+            cron_model.mongo_db,
+            QdrantMatchPusher.get_qdrant_client(),
+            RETENTION_ARCHIVE_DIR,
+            RETENTION_BATCH_SIZE,
+        )
+        cutoff = retention.cutoff(days, run_at)
+
+        report = {"cutoff": cutoff, "mongo": {}, "qdrant": {}}
+        pruned_ids = set()
+        for collection in RETENTION_MONGO_COLLECTIONS:
+            report["mongo"][collection] = retention.prune_mongo(collection, cutoff, run_at, archive)
+            pruned_ids.update(report["mongo"][collection].pop("match_ids"))
+        # physical collections: the named layout keeps both sources on one point
+        for collection in sorted({t.collection for t in collection_targets().values()}):
+            report["qdrant"][collection] = retention.prune_qdrant(collection, cutoff, run_at, archive)
+            pruned_ids.update(report["qdrant"][collection].pop("match_ids"))
+
+        for match_id in pruned_ids:
+            match_entity_index.remove_match(match_id)
+            match_stats_cache.invalidate(match_id)
+            semantic_question_cache.invalidate(match_id)
+            faq_lookup.invalidate(match_id)
+        if pruned_ids:
+            report["vector_mirror"] = _sync_vector_mirror(get_pushers())
+
+        report["matches"] = len(pruned_ids)
+        report["reclaimed_bytes"] = sum(r["bytes"] for store in ("mongo", "qdrant") for r in report[store].values())
+        cron_model.mongo_db.retention_runs.insert_one({"ran_at": run_at.strftime("%Y-%m-%d %H:%M:%S"), **report})
+
+        logger.info(f'✅ Pruned {len(pruned_ids)} finished matches older than {cutoff}, reclaimed ~{report["reclaimed_bytes"]} bytes')
+        return {
+            "responseCode": "200",
+            "responseMessage" : "Finished matches pruned successfully.",
+            "responseData" : report
+        }
+    except Exception as e:
+        logger.info(f'❌ Failed to prune finished matches: {e}')
+        return {
+            "responseCode": "500",
+            "responseMessage" : "Failed to prune finished matches.",
+            "responseData" : {}
+        }
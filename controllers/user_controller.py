@@ -1,70 +1,603 @@
 # === controllers/user_controller.py ===
+import json
 import logging
-from typing import Any, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from qdrant_client.http.models import Filter as QFilter, FieldCondition, MatchValue
 from libraries.qdrant_searcher import (
     QdrantMultiCollectionSearcher,
     QdrantForbiddenError,
 )
-from config.settings import QDRANT_URL, QDRANT_API_KEY, EMBEDDING_MODEL
+from libraries.entity_index import MatchEntityIndex, match_entity_index
+from libraries import intent_classifier
+from libraries.ai_model import AIModel, AIModelError
+from libraries.answer_synthesizer import AnswerSynthesizer
+from libraries.payload_projection import PayloadProjection
+from libraries.circuit_breaker import CircuitOpenError
+from libraries.semantic_cache import semantic_question_cache
+from libraries.faq import exclude_faqs, faq_lookup
+from libraries.vector_mirror import active_filter, vector_mirror
+from models.cron_model import CronModel
+from utils.metrics import metrics
+from config.settings import (
+    QDRANT_URL,
+    QDRANT_API_KEY,
+    EMBEDDING_MODEL,
+    HYBRID_SEARCH_ENABLED,
+    SPARSE_VECTOR_NAME,
+    HYBRID_PREFETCH_LIMIT,
+    MATCH_DETAILS_COLLECTION,
+    MATCH_STATS_COLLECTION,
+    ACTIVE_MATCH_WINDOW_HOURS,
+    ENTITY_INDEX_TTL,
+    MAX_BATCH_QUESTIONS,
+    SEMANTIC_CACHE_ENABLED,
+    FAQ_ENABLED,
+    VECTOR_MIRROR_ENABLED,
+    CROSS_MATCH_TOP_K,
+)
 
 logger = logging.getLogger(__name__)
 
-def handle_user_question(match_id: str, question: str = None) -> Any:
-    try:
-        # Validate inputs
-        if match_id is None:
-            return {"status": "match_id is required!", "match_id": match_id}
-        if not question or str(question).strip() == "":
-            return {"status": "Question is required!", "question": question}
+cron_model = CronModel()
 
-        # Build strict payload filter: payload.match_id == <match_id>
-        match_id_filter = QFilter(
-            must=[
-                FieldCondition(
-                    key="match_id",
-                    match=MatchValue(value=str(match_id))  # ensure string match if stored as string
-                )
-            ]
-        )
+_searcher = None
+_ai_model = None
+_answer_synthesizer = None
 
+# Collections are searched concurrently for the streaming route
+_stream_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="question-stream")
+
+
+def get_searcher() -> QdrantMultiCollectionSearcher:
+    """Process-wide searcher, so the embedding model is loaded once rather than per request."""
+    global _searcher
+    if _searcher is None:
         # Init searcher (ensure your URL is HTTPS and API key is correct)
-        searcher = QdrantMultiCollectionSearcher(
-            collections=["match_details", "match_stats"],  # make sure these collections exist
+        _searcher = QdrantMultiCollectionSearcher(
+            collections=[MATCH_DETAILS_COLLECTION, MATCH_STATS_COLLECTION],  # collections or reindex aliases
             embedder_model=EMBEDDING_MODEL,
             qdrant_url=QDRANT_URL,
             qdrant_api_key=QDRANT_API_KEY,
             run_self_test=True,
+            hybrid=HYBRID_SEARCH_ENABLED,
+            sparse_vector_name=SPARSE_VECTOR_NAME,
+            prefetch_limit=HYBRID_PREFETCH_LIMIT,
         )
+    return _searcher
+
+
+def reset_clients() -> None:
+    """Called in each gunicorn worker after fork; the shared embedding model is kept, clients are not."""
+    global _searcher, _ai_model, _stream_executor
+    cron_model.connect()
+    _searcher = _ai_model = None
+    _stream_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="question-stream")
+
+
+def get_ai_model() -> AIModel:
+    global _ai_model
+    if _ai_model is None:
+        _ai_model = AIModel()
+    return _ai_model
+
+
+def get_answer_synthesizer() -> AnswerSynthesizer:
+    """Process-wide, so the answer cache is shared by every request of the worker."""
+    global _answer_synthesizer
+    if _answer_synthesizer is None:
+        _answer_synthesizer = AnswerSynthesizer()
+    return _answer_synthesizer
+
+
+_entity_reload_lock = threading.Lock()
+
+
+def get_entity_index() -> MatchEntityIndex:
+    """
+    Entity index over the active matches. The cron upserts keep it current only in the process
+    that ran them, so it is reloaded from Mongo every ENTITY_INDEX_TTL seconds; while one request
+    reloads, the others keep answering from the previous load.
+    """
+    if match_entity_index.is_stale(ENTITY_INDEX_TTL):
+        first = match_entity_index.loaded_at is None
+        if _entity_reload_lock.acquire(blocking=first):
+            try:
+                if match_entity_index.is_stale(ENTITY_INDEX_TTL):
+                    since = (datetime.now() - timedelta(hours=ACTIVE_MATCH_WINDOW_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+                    match_entity_index.load(cron_model.get_active_match_details(since))
+            finally:
+                _entity_reload_lock.release()
+    return match_entity_index
+
+
+def _forbidden_response() -> Dict[str, Any]:
+    return {
+        "status": "forbidden",
+        "message": "Qdrant rejected the request (403). Check API key, HTTPS URL, and permissions/IP allowlist.",
+        "hints": {
+            "QDRANT_URL": "Use the cluster API endpoint with https://",
+            "QDRANT_API_KEY": "Verify it is correct and has read/search permissions",
+            "Collections": "Ensure 'match_details' and 'match_stats' exist",
+            "Network": "If allowlist is enabled, add this server's public IP",
+        },
+    }
+
+
+def _unavailable_response(e: CircuitOpenError) -> Dict[str, Any]:
+    return {
+        "status": "unavailable",
+        "message": f"'{e.name}' is temporarily unavailable, please retry shortly.",
+        "retry_in": round(max(e.retry_in, 0)),
+    }
+
+
+def _normalize_question(question: str) -> str:
+    # MiniLM is uncased, so case/whitespace variants embed identically
+    return " ".join(str(question).lower().split())
+
+
+def _answer_fast_path(match_id: Optional[str], question: str, started: float) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Intent and entity fast paths shared by the single, batch and streaming routes.
+    Returns (response or None, detected entities).
+    """
+    # Entities first: a question naming a player never takes the team-level intent fast path
+    entities = get_entity_index().detect(question, match_id)
+
+    # Intent fast path: questions that map onto a stored match_stats field
+    if match_id is not None:
+        intent = intent_classifier.classify(question, entities)
+        if intent:
+            answer = intent_classifier.answer(intent, cron_model.get_match_stats_cached(match_id))
+            if answer:
+                metrics.incr("question.fast_path.intent")
+                metrics.observe("question.fast_path_ms", (time.perf_counter() - started) * 1000)
+                return {"match_id": str(match_id), "answer": answer, "intent": intent, "source": "match_stats"}, []
+
+    # Entity fast path: squad questions are answered without embedding or search
+    direct = MatchEntityIndex.direct_answer(question, entities, match_id)
+    if direct:
+        metrics.incr("question.fast_path.entity")
+        metrics.observe("question.fast_path_ms", (time.perf_counter() - started) * 1000)
+        logger.info(f"Entity index answered question for match_id={match_id}")
+        return {"match_id": str(match_id) if match_id is not None else None, **direct}, entities
+
+    return None, entities
+
+
+def _build_question_filter(match_id: Optional[str], entities: List[Dict[str, Any]]) -> Optional[QFilter]:
+    if match_id is None:
+        # Filter-first routing: the question itself names the matches/teams/venue
+        qfilter = MatchEntityIndex.to_filter(entities)
+        return exclude_faqs(qfilter) if qfilter is not None else None
+
+    # Build strict payload filter: payload.match_id == <match_id>
+    return exclude_faqs(QFilter(
+        must=[
+            FieldCondition(
+                key="match_id",
+                match=MatchValue(value=str(match_id))  # ensure string match if stored as string
+            )
+        ]
+    ))
+
+
+def handle_user_question(
+    match_id: Optional[str],
+    question: str = None,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    snippet_chars: Optional[int] = None,
+    answer: bool = False,
+) -> Any:
+    """
+    Search both collections for one question. `include` / `exclude` pick the payload fields
+    of each hit and `snippet_chars` cuts its summary text (SEARCH_* settings by default).
+    With `answer`, an LLM answer grounded in the hits is added (cached, see AnswerSynthesizer).
+    """
+    try:
+        # Validate inputs
+        if not question or str(question).strip() == "":
+            return {"status": "Question is required!", "question": question}
+
+        started = time.perf_counter()
+
+        fast, entities = _answer_fast_path(match_id, question, started)
+        if fast:
+            return fast
+
+        match_id_filter = _build_question_filter(match_id, entities)
+        if match_id_filter is None:
+            return {"status": "match_id is required!", "match_id": match_id}
+
+        searcher = get_searcher()
 
         # Apply the same filter to both collections
         filters: Dict[str, QFilter] = {
-            "match_details": match_id_filter,
-            "match_stats": match_id_filter,
+            MATCH_DETAILS_COLLECTION: match_id_filter,
+            MATCH_STATS_COLLECTION: match_id_filter,
         }
 
-        results = searcher.search_question(question, top_k=5, filters=filters)
-        logger.info(f"Search executed successfully for match_id={match_id}")
+        projection = PayloadProjection.from_request(include, exclude, snippet_chars)
+        with_payload = projection.selector(need_text=answer)
+        vector, sparse = searcher.embed_question(question)
+        faq = _faq_answer(searcher, match_id, vector, started)
+        if faq:
+            return faq
 
+        entry, similarity = _semantic_lookup(match_id, vector, with_payload)
+        if entry is None:
+            results = searcher.search_embedded(vector, sparse, top_k=5, filters=filters, with_payload=with_payload)
+            entry = _semantic_store(match_id, vector, with_payload, question, results)
+            metrics.incr("question.vector")
+            metrics.observe("question.vector_ms", (time.perf_counter() - started) * 1000)
+            logger.info(f"Search executed successfully for match_id={match_id}")
+
+        response = {
+            "match_id": str(match_id) if match_id is not None else None,
+            "results": projection.apply_results(entry["results"], question),
+        }
+        if answer:
+            response["answer"] = _entry_answer(entry, match_id, question)
+        if similarity is not None:
+            response["semantic_cache"] = {"similarity": round(similarity, 4), "question": entry["question"]}
+            metrics.observe("question.semantic_cache_ms", (time.perf_counter() - started) * 1000)
+        return response
+
+    except QdrantForbiddenError as e:
+        logger.error(f"Qdrant forbidden: {e}")
+        return _forbidden_response()
+
+    except CircuitOpenError as e:
+        logger.warning(f"⚠️ {e}")
+        return _unavailable_response(e)
+
+    except Exception as e:
+        logger.error(f"Error in handle_user_question: {e}")
+        return []
+
+
+def handle_cross_match_question(
+    question: str = None,
+    top_k: int = CROSS_MATCH_TOP_K,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    snippet_chars: Optional[int] = None,
+) -> Any:
+    """
+    A question over all active matches ("which matches today have rain risk?"). The question
+    vector is scored against the local vector mirror and only the payloads of the best hits
+    are read from Qdrant; without a fresh mirror it is an unfiltered (active window) Qdrant
+    search. Both rank by the dense vector alone, so the answer does not depend on the path.
+    """
+    try:
+        if not question or str(question).strip() == "":
+            return {"status": "Question is required!", "question": question}
+
+        started = time.perf_counter()
+        searcher = get_searcher()
+        projection = PayloadProjection.from_request(include, exclude, snippet_chars)
+        with_payload = projection.selector()
+        vector = searcher.embed_question(question)[0]
+
+        results, source = None, "mirror"
+        if VECTOR_MIRROR_ENABLED:
+            results = {}
+            for collection in searcher.collections:
+                results[collection] = vector_mirror.hits(searcher.qdrant, collection, vector, top_k, with_payload)
+                if results[collection] is None:
+                    results = None
+                    break
+        if results is None:
+            source = "qdrant"
+            qfilter = active_filter()
+            results = searcher.search_embedded(vector, None, top_k=top_k,
+                                               filters={c: qfilter for c in searcher.collections}, with_payload=with_payload)
+        metrics.incr(f"question.cross_match.{source}")
+        metrics.observe(f"question.cross_match_ms.{source}", (time.perf_counter() - started) * 1000)
+
+        best: Dict[str, float] = {}
+        for hits in results.values():
+            for hit in hits:
+                match = str((hit.get("payload") or {}).get("match_id"))
+                best[match] = max(best.get(match, -1.0), hit.get("score") or 0.0)
         return {
-            "match_id": str(match_id),
-            "results": results,
+            "match_id": None,
+            "source": source,
+            "matches": [{"match_id": m, "score": round(score, 4)} for m, score in sorted(best.items(), key=lambda kv: -kv[1])],
+            "results": projection.apply_results(results, question),
         }
 
     except QdrantForbiddenError as e:
         logger.error(f"Qdrant forbidden: {e}")
+        return _forbidden_response()
+
+    except CircuitOpenError as e:
+        logger.warning(f"⚠️ {e}")
+        return _unavailable_response(e)
+
+    except Exception as e:
+        logger.error(f"Error in handle_cross_match_question: {e}")
+        return []
+
+
+def _faq_answer(searcher: QdrantMultiCollectionSearcher, match_id: Optional[str], vector: List[float], started: float) -> Optional[Dict[str, Any]]:
+    """Precomputed FAQ answer of the match when the question is one of the FAQs (libraries/faq.py)."""
+    if not FAQ_ENABLED or match_id is None:
+        return None
+    faq = faq_lookup.answer(searcher.embedder, match_id, vector, cron_model.get_match_faqs,
+                            version=cron_model.get_points_version_cached(match_id))
+    if not faq:
+        return None
+    metrics.incr("question.faq")
+    metrics.observe("question.fast_path_ms", (time.perf_counter() - started) * 1000)
+    return {"match_id": str(match_id), **faq, "source": "faq"}
+
+
+def _semantic_lookup(match_id: Optional[str], vector: List[float], with_payload: Any) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+    """(entry, similarity) of an earlier paraphrase of the question for this match, or (None, None)."""
+    if not SEMANTIC_CACHE_ENABLED or match_id is None:
+        return None, None
+    version = cron_model.get_points_version_cached(match_id)
+    if version is None:  # Mongo unreachable: cannot tell whether the entries are current
+        return None, None
+    found = semantic_question_cache.lookup(match_id, vector, variant=str(with_payload), version=version)
+    if not found:
+        return None, None
+    metrics.incr("question.semantic_cache")
+    return found
+
+
+def _semantic_store(match_id: Optional[str], vector: List[float], with_payload: Any, question: str,
+                    results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    entry = {"question": question, "results": results, "answer": None}
+    if SEMANTIC_CACHE_ENABLED and match_id is not None and any(results.values()):
+        version = cron_model.get_points_version_cached(match_id)
+        if version is not None:
+            semantic_question_cache.store(match_id, vector, entry, variant=str(with_payload), version=version)
+    return entry
+
+
+def _entry_answer(entry: Dict[str, Any], match_id: Optional[str], question: str) -> Dict[str, Any]:
+    """The answer kept on a semantic cache entry, generated (and kept) on first use."""
+    if entry.get("answer"):
+        return {**entry["answer"], "cached": True}
+    answer = _synthesize_answer(match_id, question, entry["results"])
+    if answer.get("answer"):
+        entry["answer"] = answer
+    return answer
+
+
+def _synthesize_answer(match_id: Optional[str], question: str, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """The hits are still worth returning when OpenAI is down or answers with nothing."""
+    try:
+        return get_answer_synthesizer().answer(get_ai_model(), match_id, question, results)
+    except CircuitOpenError as e:
+        logger.warning(f"⚠️ {e}")
+        return {"answer": None, **_unavailable_response(e)}
+    except AIModelError as e:
+        logger.warning(f"⚠️ No answer for match_id={match_id}: {e}")
+        return {"answer": None, "status": "error", "message": str(e)}
+
+
+def handle_user_questions_batch(
+    items: List[Dict[str, Any]],
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    snippet_chars: Optional[int] = None,
+) -> Any:
+    """
+    Many (match_id, question) pairs in one call. Identical pairs are searched once,
+    distinct questions are embedded in one model call and each collection gets a
+    single batch search. Results are keyed by input index; the payload projection
+    applies to every item.
+    """
+    try:
+        if not items:
+            return {"status": "items are required!", "items": items}
+        if len(items) > MAX_BATCH_QUESTIONS:
+            return {"status": f"At most {MAX_BATCH_QUESTIONS} questions per batch!", "count": len(items)}
+
+        started = time.perf_counter()
+        results: Dict[int, Any] = {}
+        pending: Dict[Tuple[Optional[str], str], List[int]] = {}
+        pending_filters: Dict[Tuple[Optional[str], str], QFilter] = {}
+
+        for idx, item in enumerate(items):
+            item = item or {}
+            match_id = item.get("match_id")
+            question = item.get("question")
+            if not question or str(question).strip() == "":
+                results[idx] = {"status": "Question is required!", "question": question}
+                continue
+
+            fast, entities = _answer_fast_path(match_id, question, started)
+            if fast:
+                results[idx] = fast
+                continue
+
+            qfilter = _build_question_filter(match_id, entities)
+            if qfilter is None:
+                results[idx] = {"status": "match_id is required!", "match_id": match_id}
+                continue
+
+            key = (str(match_id) if match_id is not None else None, _normalize_question(question))
+            pending.setdefault(key, []).append(idx)
+            pending_filters[key] = qfilter
+
+        if pending:
+            keys = list(pending)
+            queries = [
+                (key[1], {MATCH_DETAILS_COLLECTION: pending_filters[key], MATCH_STATS_COLLECTION: pending_filters[key]})
+                for key in keys
+            ]
+            projection = PayloadProjection.from_request(include, exclude, snippet_chars)
+            batch_results = get_searcher().search_questions_batch(queries, top_k=5, with_payload=projection.selector())
+            for key, hits in zip(keys, batch_results):
+                hits = projection.apply_results(hits, key[1])
+                for idx in pending[key]:
+                    results[idx] = {"match_id": key[0], "results": hits}
+            metrics.incr("question.vector", sum(len(v) for v in pending.values()))
+
+        metrics.observe("question.batch_ms", (time.perf_counter() - started) * 1000)
+        logger.info(f"Batch of {len(items)} questions served with {len(pending)} distinct searches")
+
         return {
-            "status": "forbidden",
-            "message": "Qdrant rejected the request (403). Check API key, HTTPS URL, and permissions/IP allowlist.",
-            "hints": {
-                "QDRANT_URL": "Use the cluster API endpoint with https://",
-                "QDRANT_API_KEY": "Verify it is correct and has read/search permissions",
-                "Collections": "Ensure 'match_details' and 'match_stats' exist",
-                "Network": "If allowlist is enabled, add this server's public IP",
-            },
+            "count": len(items),
+            "distinct_searches": len(pending),
+            "results": {idx: results[idx] for idx in sorted(results)},
         }
 
+    except QdrantForbiddenError as e:
+        logger.error(f"Qdrant forbidden: {e}")
+        return _forbidden_response()
+
+    except CircuitOpenError as e:
+        logger.warning(f"⚠️ {e}")
+        return _unavailable_response(e)
+
     except Exception as e:
-        logger.error(f"Error in handle_user_question: {e}")
+        logger.error(f"Error in handle_user_questions_batch: {e}")
         return []
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+def stream_user_question(
+    match_id: Optional[str],
+    question: str = None,
+    answer: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    snippet_chars: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Server-sent events for one question: each collection's hits are pushed as soon as
+    that search returns, then (optionally) the generated answer token by token. The
+    answer prompt is built from the full texts, whatever the projection sends.
+    """
+    started = time.perf_counter()
+    try:
+        if not question or str(question).strip() == "":
+            yield _sse("error", {"status": "Question is required!", "question": question})
+            return
+
+        fast, entities = _answer_fast_path(match_id, question, started)
+        if fast:
+            yield _sse("answer", fast)
+            yield _sse("done", {"elapsed_ms": round((time.perf_counter() - started) * 1000, 2)})
+            return
+
+        qfilter = _build_question_filter(match_id, entities)
+        if qfilter is None:
+            yield _sse("error", {"status": "match_id is required!", "match_id": match_id})
+            return
+
+        searcher = get_searcher()
+        projection = PayloadProjection.from_request(include, exclude, snippet_chars)
+        with_payload = projection.selector(need_text=answer)
+        vector, sparse = searcher.embed_question(question)
+        faq = _faq_answer(searcher, match_id, vector, started)
+        if faq:
+            yield _sse("answer", faq)
+            yield _sse("done", {"elapsed_ms": round((time.perf_counter() - started) * 1000, 2)})
+            return
+
+        entry, similarity = _semantic_lookup(match_id, vector, with_payload)
+        if entry is not None:
+            for collection, hits in entry["results"].items():
+                yield _sse(collection, {
+                    "match_id": str(match_id),
+                    "results": projection.apply(hits, question),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "semantic_cache": {"similarity": round(similarity, 4), "question": entry["question"]},
+                })
+        else:
+            futures = {
+                _stream_executor.submit(searcher.search_collection, collection, vector, sparse, 5, qfilter, with_payload): collection
+                for collection in searcher.collections
+            }
+            results: Dict[str, List[Dict[str, Any]]] = {}
+            for future in as_completed(futures):
+                collection = futures[future]
+                results[collection] = future.result()
+                yield _sse(collection, {
+                    "match_id": str(match_id) if match_id is not None else None,
+                    "results": projection.apply(results[collection], question),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                })
+            entry = _semantic_store(match_id, vector, with_payload, question,
+                                    {collection: results[collection] for collection in searcher.collections})
+            metrics.incr("question.vector")
+            metrics.observe("question.vector_ms", (time.perf_counter() - started) * 1000)
+
+        if answer:
+            if entry.get("answer"):
+                yield _sse("answer_token", {"token": entry["answer"]["answer"]})
+            else:
+                tokens = []
+                for token in get_answer_synthesizer().stream(get_ai_model(), match_id, question, entry["results"]):
+                    tokens.append(token)
+                    yield _sse("answer_token", {"token": token})
+                if tokens:
+                    entry["answer"] = {"answer": "".join(tokens)}
+
+        yield _sse("done", {"elapsed_ms": round((time.perf_counter() - started) * 1000, 2)})
+
+    except QdrantForbiddenError as e:
+        logger.error(f"Qdrant forbidden: {e}")
+        yield _sse("error", _forbidden_response())
+
+    except CircuitOpenError as e:
+        logger.warning(f"⚠️ {e}")
+        yield _sse("error", _unavailable_response(e))
+
+    except Exception as e:
+        logger.error(f"Error in stream_user_question: {e}")
+        yield _sse("error", {"status": "error", "message": str(e)})
+
+
+def get_answer_stats() -> Dict[str, Any]:
+    """Answer and semantic cache hit rates, per-answer latency (answer mode of the question routes)."""
+    snapshot = metrics.snapshot()["timings_ms"]
+    return {
+        **get_answer_synthesizer().stats(),
+        "latency_ms": snapshot.get("answer.total_ms", {}),
+        "llm_ms": snapshot.get("answer.llm_ms", {}),
+        "semantic_cache": semantic_question_cache.stats(),
+    }
+
+
+def get_question_path_stats() -> Dict[str, Any]:
+    """
+    Share of questions served by the fast paths (intent / entity), FAQ answers, the semantic cache
+    and vector retrieval; cross-match questions are counted apart, with the share the mirror served.
+    """
+    intent = metrics.counter("question.fast_path.intent")
+    entity = metrics.counter("question.fast_path.entity")
+    faq = metrics.counter("question.faq")
+    semantic = metrics.counter("question.semantic_cache")
+    vector = metrics.counter("question.vector")
+    total = intent + entity + faq + semantic + vector
+    mirror = metrics.counter("question.cross_match.mirror")
+    cross = mirror + metrics.counter("question.cross_match.qdrant")
+    return {
+        "total": total,
+        "fast_path_intent": intent,
+        "fast_path_entity": entity,
+        "faq": faq,
+        "semantic_cache": semantic,
+        "vector": vector,
+        "fast_path_share": round((intent + entity) / total, 4) if total else 0.0,
+        "faq_share": round(faq / total, 4) if total else 0.0,
+        "semantic_cache_share": round(semantic / total, 4) if total else 0.0,
+        "cross_match": cross,
+        "cross_match_mirror_share": round(mirror / cross, 4) if cross else 0.0,
+    }
@@ -0,0 +1,47 @@
+# === gunicorn.conf.py ===
+# Production serving: N uvicorn workers under one gunicorn master.
+#
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# The app and the embedding model are loaded once in the master (preload_app + when_ready)
+# and the workers are forked from it, so the MiniLM weights, memory-mapped from their
+# safetensors files (libraries/embeddings.py), are pages shared by every worker instead of a
+# copy each. Mongo, Qdrant and OpenAI clients are not fork-safe: every worker recreates them
+# in post_fork. `python3 main.py` (single process, reload) stays the development entry point.
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import PORT, TORCH_THREADS_PER_WORKER, WEB_CONCURRENCY
+
+bind = f"0.0.0.0:{PORT}"
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    # runs in the master after the app is imported and before any worker is forked
+    import torch
+    from libraries.embeddings import get_embedder
+
+    torch.set_num_threads(1)  # no OpenMP pool in the master: its threads would not survive fork
+    get_embedder()
+    gc.collect()
+    gc.freeze()  # preloaded objects leave the GC's generations, so collections do not dirty their shared pages
+    server.log.info(f"Embedding model preloaded, forking {workers} workers")
+
+
+def post_fork(server, worker):
+    import torch
+    from controllers import admin_controller, cron_controller, user_controller
+
+    torch.set_num_threads(TORCH_THREADS_PER_WORKER or max(1, (os.cpu_count() or 1) // workers))
+    for controller in (cron_controller, user_controller, admin_controller):
+        controller.reset_clients()
+    server.log.info(f"Worker {worker.pid}: clients recreated, torch threads = {torch.get_num_threads()}")
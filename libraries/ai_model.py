@@ -1,17 +1,31 @@
 # libraries/ai_model.py
-from config.settings import OPENAI_API_KEY
-from openai import OpenAI
-from typing import Dict
-import json
+from config.settings import OPENAI_API_KEY, OPENAI_TIMEOUT_SECONDS
+from openai import OpenAI, BadRequestError
+from libraries.cassette import cassette
+from libraries.circuit_breaker import get_breaker
+from typing import Any, Dict, Iterator
+import time
+from models.match_types import json_encode
 
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY not found in config.settings")
 
 SYSTEM_PROMPT = "You are an expert cricket analyst and documentation assistant."
 
+class AIModelError(Exception):
+    """The model returned nothing usable; callers must not store or embed the result."""
+    pass
+
 class AIModel:
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.connect()
+        # a rejected prompt (400) is our fault, not an OpenAI outage
+        self.breaker = get_breaker("openai", is_failure=lambda exc: not isinstance(exc, BadRequestError))
+
+    def connect(self):
+        """(Re)create the OpenAI client, e.g. in a worker after fork so no HTTP pool is shared."""
+        # one retry at most: the breaker, not the SDK, decides when to stop waiting on OpenAI
+        self.client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT_SECONDS, max_retries=1)
 
     def call_ai_api(
         self,
@@ -22,30 +36,93 @@ class AIModel:
     ) -> str:
         """
         Call OpenAI API (new interface) with dynamic prompt.
-        Optimized for faster response.
+        Raises on failure (CircuitOpenError while OpenAI is degraded, AIModelError on an
+        empty answer) instead of returning error text that would be stored as a summary.
+        """
+        request = {"model": model, "prompt": prompt, "temperature": temperature, "max_tokens": max_tokens}
+        with self.breaker.guard():
+            if cassette.replaying:
+                content = cassette.replay("openai", request, fallback=True)["response"]["content"]
+            else:
+                started = time.perf_counter()
+                try:
+                    response = self.client.chat.completions.create(
+                        model=model,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                except Exception as e:
+                    cassette.record("openai", request, {"error": f"{type(e).__name__}: {e}"}, (time.perf_counter() - started) * 1000)
+                    raise
+                content = response.choices[0].message.content if response.choices else None
+                cassette.record("openai", request, {"content": content}, (time.perf_counter() - started) * 1000)
+        if not content or not content.strip():
+            raise AIModelError(f"Empty completion from {model}")
+        return content
+
+    def stream_ai_api(
+        self,
+        prompt: str,
+        model: str = "gpt-4o-mini",
+        max_tokens: int = 512,
+        temperature: float = 0.3
+    ) -> Iterator[str]:
+        """
+        Same call as call_ai_api with stream=True; yields content deltas as they arrive.
+        The whole stream counts as one call for the breaker.
         """
-        try:
-            response = self.client.chat.completions.create(
+        request = {"model": model, "prompt": prompt, "temperature": temperature, "max_tokens": max_tokens}
+        with self.breaker.guard():
+            if cassette.replaying:
+                yield from self._replay_stream(request)
+                return
+            started = time.perf_counter()
+            first_ms, chunks = None, []
+            stream = self.client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                stream=True
             )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error: {e}"
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    if first_ms is None:
+                        first_ms = (time.perf_counter() - started) * 1000
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            if cassette.recording:
+                cassette.record("openai_stream", request, {"chunks": chunks, "first_ms": first_ms},
+                                (time.perf_counter() - started) * 1000)
 
-    def generate_documentation(self, match_data: Dict, master_description: Dict) -> str:
+    @staticmethod
+    def _replay_stream(request: Dict) -> Iterator[str]:
+        """Recorded chunks, paced like the original: time to first token, then evenly spread."""
+        entry = cassette.replay("openai_stream", request, fallback=True, wait=False)
+        chunks = entry["response"]["chunks"]
+        first_ms = entry["response"].get("first_ms") or 0
+        cassette.sleep(first_ms)
+        per_chunk_ms = (entry["elapsed_ms"] - first_ms) / max(len(chunks), 1)
+        for i, chunk in enumerate(chunks):
+            if i:
+                cassette.sleep(per_chunk_ms)
+            yield chunk
+
+    def generate_documentation(self, match_data: Any, master_description: Dict) -> str:
         """
         Generate detailed documentation for cricket match data.
         Optimized JSON formatting for faster AI processing.
         """
 
-        match_json = json.dumps(match_data, separators=(',', ':'))
-        master_json = json.dumps(master_description, separators=(',', ':'))
+        match_json = json_encode(match_data).decode()  # dict or MatchDetails/MatchStats
+        master_json = json_encode(master_description).decode()
 
         documentation_prompt = (
             f"I have the master description keys for cricket/fantasy match data:\n{master_json}\n\n"
@@ -65,3 +142,21 @@ class AIModel:
         )
 
         return self.call_ai_api(prompt=documentation_prompt)
+
+    def generate_section(self, title: str, instructions: str, section_data: Dict, master_description: Dict) -> str:
+        """
+        Write one section of the match summary (see libraries/section_summaries.py)
+        from only the fields that section depends on.
+        """
+        section_json = json_encode(section_data).decode()
+        master_json = json_encode(master_description).decode()
+
+        section_prompt = (
+            f"Master description of the keys:\n{master_json}\n\n"
+            f"Cricket/fantasy match data:\n{section_json}\n\n"
+            f"Write the '{title}' section of a match summary. {instructions}\n"
+            "Explain each data point in clear paragraph form, ready for fantasy cricket analysis. "
+            "Do not add a heading and do not cover anything outside this section."
+        )
+
+        return self.call_ai_api(prompt=section_prompt, max_tokens=700)
@@ -0,0 +1,165 @@
+import hashlib
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import (
+    ANSWER_MODEL,
+    ANSWER_CONTEXT_TOKENS,
+    ANSWER_MAX_TOKENS,
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_TTL,
+)
+from libraries.payload_projection import TEXT_FIELD, snippet
+from libraries.sparse_encoder import BM25SparseEncoder
+from utils.cache import TTLCache
+from utils.metrics import metrics
+
+CHARS_PER_TOKEN = 4  # rough size of a gpt-4o token in English prose; no tokenizer needed for a budget
+MIN_CHUNK_CHARS = 200  # a chunk cut shorter than this to fit the budget is dropped instead
+
+INSTRUCTIONS = (
+    "Answer the user's cricket question using only the context below. "
+    "Be concise; say so if the context does not contain the answer."
+)
+
+
+class AnswerSynthesizer:
+    """
+    Grounded answers for the question routes: a token-budgeted context from the top hits of
+    every collection, one LLM call, and an answer cache.
+
+    Answers are cached per (match_id, normalized question, summary version). The summary
+    version is a digest of the chunks that made it into the context (their section
+    fingerprints, or their text for points pushed without one), so a re-summarized section
+    changes the key and the stale answer is simply never looked up again.
+    """
+
+    def __init__(
+        self,
+        model: str = ANSWER_MODEL,
+        context_tokens: int = ANSWER_CONTEXT_TOKENS,
+        max_tokens: int = ANSWER_MAX_TOKENS,
+        cache: Optional[TTLCache] = None,
+    ):
+        self.model = model
+        self.context_chars = context_tokens * CHARS_PER_TOKEN
+        self.max_tokens = max_tokens
+        self.cache = cache if cache is not None else TTLCache(maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL)
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        return " ".join(str(question).lower().split())
+
+    def select_context(self, question: str, results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Chunks taken rank by rank across the collections (best score first within a rank)
+        until the character budget is spent. No chunk gets more than its collection's share
+        of the budget, so one long summary cannot crowd out the other collection; longer
+        chunks are cut to a snippet around their best-matching sentence.
+        """
+        terms = set(BM25SparseEncoder.tokenize(question))
+        share = max(MIN_CHUNK_CHARS, self.context_chars // max(1, sum(1 for hits in results.values() if hits)))
+        ranked = []
+        for collection, hits in results.items():
+            for rank, hit in enumerate(hits):
+                ranked.append((rank, -(hit.get("score") or 0.0), collection, hit))
+        ranked.sort(key=lambda r: (r[0], r[1]))
+
+        chunks, seen, left = [], set(), self.context_chars
+        for _, _, collection, hit in ranked:
+            payload = hit.get("payload") or {}
+            text = (payload.get(TEXT_FIELD) or "").strip()
+            if not text or text in seen:
+                continue
+            label = f"[{collection}{' / ' + payload['section'] if payload.get('section') else ''}] "
+            room = min(left - len(label) - 1, share)
+            if len(text) > room and room < MIN_CHUNK_CHARS:
+                break
+            seen.add(text)
+            version = payload.get("fingerprint") or f"{zlib.crc32(text.encode('utf-8')):08x}"
+            chunks.append({
+                "collection": collection,
+                "id": hit.get("id"),
+                "label": label,
+                "text": snippet(text, terms, room) if len(text) > room else text,
+                "version": version,
+            })
+            left -= len(label) + len(chunks[-1]["text"]) + 1
+        return chunks
+
+    @staticmethod
+    def summary_version(chunks: List[Dict[str, Any]]) -> str:
+        parts = sorted(f"{c['collection']}:{c['id']}:{c['version']}" for c in chunks)
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def build_prompt(question: str, chunks: List[Dict[str, Any]]) -> str:
+        context = "\n".join(c["label"] + c["text"] for c in chunks)
+        return f"{INSTRUCTIONS}\n\nContext:\n{context}\n\nQuestion: {question}"
+
+    def _prepare(self, match_id: Any, question: str, results: Dict[str, List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], str, tuple]:
+        chunks = self.select_context(question, results)
+        version = self.summary_version(chunks)
+        key = (str(match_id) if match_id is not None else None, self.normalize_question(question), version)
+        return chunks, version, key
+
+    def answer(self, ai_model, match_id: Any, question: str, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        {"answer", "cached", "summary_version", "context_chunks", "latency_ms"}; no LLM call on a
+        cache hit or when no hit has any text. Raises what AIModel.call_ai_api raises.
+        """
+        started = time.perf_counter()
+        chunks, version, key = self._prepare(match_id, question, results)
+        out = {"answer": None, "cached": False, "summary_version": version, "context_chunks": len(chunks)}
+        if not chunks:
+            out["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return out
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.incr("answer.cache_hit")
+            out.update(answer=cached, cached=True)
+        else:
+            metrics.incr("answer.cache_miss")
+            llm_started = time.perf_counter()
+            text = ai_model.call_ai_api(self.build_prompt(question, chunks), model=self.model,
+                                        max_tokens=self.max_tokens, temperature=0.2)
+            metrics.observe("answer.llm_ms", (time.perf_counter() - llm_started) * 1000)
+            self.cache.set(key, text)
+            out["answer"] = text
+        out["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        metrics.observe("answer.total_ms", out["latency_ms"])
+        return out
+
+    def stream(self, ai_model, match_id: Any, question: str, results: Dict[str, List[Dict[str, Any]]]) -> Iterator[str]:
+        """answer() for the SSE route: a cached answer comes as one piece, a new one token by token."""
+        started = time.perf_counter()
+        chunks, _, key = self._prepare(match_id, question, results)
+        if not chunks:
+            return
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.incr("answer.cache_hit")
+            yield cached
+        else:
+            metrics.incr("answer.cache_miss")
+            tokens = []
+            for token in ai_model.stream_ai_api(self.build_prompt(question, chunks), model=self.model,
+                                                max_tokens=self.max_tokens, temperature=0.2):
+                tokens.append(token)
+                yield token
+            metrics.observe("answer.llm_ms", (time.perf_counter() - started) * 1000)
+            if tokens:
+                self.cache.set(key, "".join(tokens))
+        metrics.observe("answer.total_ms", (time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = metrics.counter("answer.cache_hit")
+        misses = metrics.counter("answer.cache_miss")
+        return {
+            "cache_hits": hits,
+            "cache_misses": misses,
+            "cache_hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "cached_answers": len(self.cache),
+        }
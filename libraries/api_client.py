@@ -1,22 +1,78 @@
 # === libraries/api_client.py ===
 import requests
 import logging
+import time
+from config.settings import SOURCE_URL, SOURCE_URL_1, SOURCE_URL_2, SOURCE_URL_3, SOURCE_URL_4, UPSTREAM_TIMEOUT_SECONDS
+from libraries.cassette import cassette
+from libraries.circuit_breaker import CircuitOpenError, get_breaker
 
 logger = logging.getLogger(__name__)
 
+# One breaker per upstream endpoint, so a slow SOURCE_URL_2 does not cut off the others
+BREAKER_NAMES = {
+    SOURCE_URL: "source_url",
+    SOURCE_URL_1: "source_url_1",
+    SOURCE_URL_2: "source_url_2",
+    SOURCE_URL_3: "source_url_3",
+    SOURCE_URL_4: "source_url_4",
+}
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """Timeouts, connection errors and 5xx count against the upstream; 4xx are our requests' fault."""
+    response = getattr(exc, "response", None)
+    return response is None or response.status_code >= 500
+
+
+class UpstreamError(Exception):
+    """An upstream call failed or was short-circuited; the fixture should be retried later."""
+    pass
+
+
 class APIClient:
     def __init__(self):
         self.headers = {
             "Content-Type": "application/json"
         }
 
+    def _send(self, method: str, url: str, payload: dict = None) -> requests.Response:
+        """One HTTP call; written to / served from the cassette store when CASSETTE_MODE is set."""
+        request = {"method": method, "url": url, "json": payload}
+        if cassette.replaying:
+            return cassette.replay_http(request)
+        started = time.perf_counter()
+        try:
+            response = requests.request(method, url, headers=self.headers, json=payload, timeout=UPSTREAM_TIMEOUT_SECONDS)
+        except requests.exceptions.RequestException as e:
+            cassette.record_http(request, None, e, (time.perf_counter() - started) * 1000)
+            raise
+        cassette.record_http(request, response, None, (time.perf_counter() - started) * 1000)
+        return response
+
+    def get(self, url: str):
+        """GET a JSON document (the SOURCE_URL fixture list); raises UpstreamError on failure."""
+        breaker = get_breaker(BREAKER_NAMES.get(url, "upstream"), is_failure=_is_upstream_failure)
+        try:
+            with breaker.guard():
+                response = self._send("GET", url)
+                response.raise_for_status()
+            return response.json()
+        except (CircuitOpenError, requests.exceptions.RequestException) as e:
+            logger.error(f"❌ GET {url} failed: {e}")
+            raise UpstreamError(f"GET {url}: {e}") from e
+
     def post(self, url: str, payload: dict):
         """Send a POST request with full URL"""
+        breaker = get_breaker(BREAKER_NAMES.get(url, "upstream"), is_failure=_is_upstream_failure)
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
+            with breaker.guard():
+                response = self._send("POST", url, payload)
+                response.raise_for_status()
             logger.info(f"✅ POST {url} successful")
             return response.json()
+        except CircuitOpenError as e:
+            logger.warning(f"⏭️ POST {url} skipped: {e}")
+            return {"error": str(e)}
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ POST {url} failed: {e}")
             return {"error": str(e)}
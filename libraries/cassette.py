@@ -0,0 +1,186 @@
+import atexit
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from config.settings import CASSETTE_DIR, CASSETTE_LATENCY_SCALE, CASSETTE_MODE, CASSETTE_NAME
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+OFF, RECORD, REPLAY = "off", "record", "replay"
+
+
+class CassetteReplayError(Exception):
+    """A recorded call that failed at record time, or a call with nothing recorded for it."""
+    pass
+
+
+def interaction_key(kind: str, request: Dict[str, Any]) -> str:
+    blob = json.dumps({"kind": kind, "request": request}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """
+    Raw upstream and OpenAI responses on local disk, for reproducing production runs offline.
+
+    record: every call is appended, with its latency, to `{directory}/{name}.{pid}.jsonl.gz`
+            (one file per process, so gunicorn workers never interleave writes; buffered and
+            flushed as extra gzip members, which gzip readers concatenate).
+    replay: calls are answered from `{directory}/{name}.*.jsonl.gz` instead of the network.
+            Identical requests get their recordings back in recorded order (the last one repeats),
+            after sleeping the recorded latency times `latency_scale` (1 = as recorded,
+            0.1 = 10x faster, 0 = no waiting).
+    """
+
+    def __init__(self, directory: str, name: Optional[str] = None, mode: str = OFF,
+                 latency_scale: float = 1.0, flush_every: int = 50):
+        self.directory = directory
+        self.name = name or datetime.now().strftime("%Y-%m-%d")
+        self.mode = mode if mode in (RECORD, REPLAY) else OFF
+        self.latency_scale = latency_scale
+        self.flush_every = flush_every
+        self._buffer: List[str] = []
+        self._index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._fallback_cursor = 0
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    # ---------- record ----------
+
+    def record(self, kind: str, request: Dict[str, Any], response: Dict[str, Any], elapsed_ms: float) -> None:
+        if not self.recording:
+            return
+        line = json.dumps({
+            "key": interaction_key(kind, request),
+            "kind": kind,
+            "recorded_at": time.time(),
+            "elapsed_ms": round(elapsed_ms, 2),
+            "request": request,
+            "response": response,
+        }, separators=(",", ":"), default=str)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.name}.{os.getpid()}.jsonl.gz")
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.write("\n".join(self._buffer) + "\n")
+        self._buffer.clear()
+
+    def record_http(self, request: Dict[str, Any], response: Optional[requests.Response],
+                    error: Optional[Exception], elapsed_ms: float) -> None:
+        if error is not None:
+            body = {"error": f"{type(error).__name__}: {error}"}
+        else:
+            body = {"status": response.status_code, "body": response.text,
+                    "content_type": response.headers.get("Content-Type")}
+        self.record("http", request, body, elapsed_ms)
+
+    # ---------- replay ----------
+
+    def entries(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All recorded interactions (optionally of one kind) in recorded order."""
+        index = self._load()
+        found = [e for recorded in index.values() for e in recorded if kind is None or e["kind"] == kind]
+        return sorted(found, key=lambda e: e["recorded_at"])
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            if self._index is None:
+                index: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+                paths = sorted(glob.glob(os.path.join(self.directory, f"{self.name}.*.jsonl.gz")))
+                for path in paths:
+                    with gzip.open(path, "rt", encoding="utf-8") as f:
+                        for line in f:
+                            if line.strip():
+                                entry = json.loads(line)
+                                index[entry["key"]].append(entry)
+                for recorded in index.values():
+                    recorded.sort(key=lambda e: e["recorded_at"])
+                self._index = dict(index)
+                logger.info(f"📼 Cassette '{self.name}': {sum(map(len, index.values()))} interactions from {len(paths)} files")
+            return self._index
+
+    def replay(self, kind: str, request: Dict[str, Any], fallback: bool = False, wait: bool = True) -> Dict[str, Any]:
+        """
+        The next recording of this exact request. With `fallback`, a request that was never
+        recorded (e.g. an LLM prompt built from different stored state) gets the next
+        recording of the same kind instead, so its latency is still reproduced. `wait=False`
+        leaves the pacing to the caller (streamed responses).
+        """
+        index = self._load()
+        key = interaction_key(kind, request)
+        with self._lock:
+            recorded = index.get(key)
+            if recorded:
+                entry = recorded[min(self._cursors[key], len(recorded) - 1)]
+                self._cursors[key] += 1
+                metrics.incr(f"cassette.{kind}.hit")
+            else:
+                same_kind = [e for es in index.values() for e in es if e["kind"] == kind] if fallback else []
+                if not same_kind:
+                    metrics.incr(f"cassette.{kind}.miss")
+                    raise CassetteReplayError(f"No {kind} recording for {json.dumps(request, default=str)[:200]}")
+                entry = same_kind[self._fallback_cursor % len(same_kind)]
+                self._fallback_cursor += 1
+                metrics.incr(f"cassette.{kind}.fallback")
+
+        if wait:
+            self.sleep(entry["elapsed_ms"])
+        if "error" in entry["response"]:
+            raise CassetteReplayError(entry["response"]["error"])
+        return entry
+
+    def sleep(self, recorded_ms: float) -> None:
+        if self.latency_scale > 0 and recorded_ms > 0:
+            time.sleep(recorded_ms / 1000 * self.latency_scale)
+
+    def replay_http(self, request: Dict[str, Any]) -> requests.Response:
+        """The recorded response as a requests.Response, so raise_for_status()/json() behave as live."""
+        try:
+            recorded = self.replay("http", request)["response"]
+        except CassetteReplayError as e:
+            raise requests.exceptions.ConnectionError(f"[cassette] {e}") from e
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response._content = (recorded.get("body") or "").encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.get("url")
+        if recorded.get("content_type"):
+            response.headers["Content-Type"] = recorded["content_type"]
+        return response
+
+
+cassette = CassetteStore(CASSETTE_DIR, CASSETTE_NAME, CASSETTE_MODE, CASSETTE_LATENCY_SCALE)
+
+if cassette.recording:
+    atexit.register(cassette.flush)
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import BREAKER_DEFAULTS, BREAKER_OVERRIDES
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Rolling-window breaker for one dependency.
+
+    The last `window` calls are kept as (failed, slow) outcomes. Once at least `min_calls`
+    are recorded, the breaker opens when the failure rate reaches `failure_rate` or the
+    share of calls slower than `slow_call_ms` reaches `slow_rate`. While open every call
+    fails immediately with CircuitOpenError. After `reset_timeout` seconds it lets
+    `half_open_calls` probe calls through: a success closes it, a failure re-opens it.
+    `is_failure(exc)` decides which exceptions count against the dependency (client errors
+    such as a 404 usually should not).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_ms: float = 10000,
+        slow_rate: float = 0.8,
+        reset_timeout: float = 30,
+        half_open_calls: int = 1,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_rate = slow_rate
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.is_failure = is_failure or (lambda exc: True)
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state, self._probes = HALF_OPEN, 0
+            logger.info(f"🟡 Circuit '{self.name}' half-open, probing")
+        return self._state
+
+    def _acquire(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN:
+                metrics.incr(f"breaker.{self.name}.rejected")
+                raise CircuitOpenError(self.name, self.reset_timeout - (time.monotonic() - self._opened_at))
+            if state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    metrics.incr(f"breaker.{self.name}.rejected")
+                    raise CircuitOpenError(self.name, 0)
+                self._probes += 1
+
+    def _record(self, failed: bool, elapsed_ms: float) -> None:
+        slow = elapsed_ms >= self.slow_call_ms
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._open("probe failed")
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"🟢 Circuit '{self.name}' closed")
+                return
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if self._state == CLOSED and calls >= self.min_calls:
+                failures = sum(1 for f, _ in self._outcomes if f)
+                slows = sum(1 for _, s in self._outcomes if s)
+                if failures / calls >= self.failure_rate:
+                    self._open(f"{failures}/{calls} calls failed")
+                elif slows / calls >= self.slow_rate:
+                    self._open(f"{slows}/{calls} calls slower than {self.slow_call_ms:.0f}ms")
+
+    def _open(self, reason: str) -> None:
+        self._state, self._opened_at = OPEN, time.monotonic()
+        self._outcomes.clear()
+        metrics.incr(f"breaker.{self.name}.opened")
+        logger.warning(f"🔴 Circuit '{self.name}' opened: {reason}")
+
+    @contextmanager
+    def guard(self):
+        """Wrap one call (or a whole streamed response) to the dependency."""
+        self._acquire()
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception as exc:
+            failed = self.is_failure(exc)
+            raise
+        finally:
+            self._record(failed, (time.perf_counter() - started) * 1000)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        with self.guard():
+            return fn(*args, **kwargs)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._outcomes)
+            return {
+                "state": state,
+                "calls_in_window": calls,
+                "failures_in_window": sum(1 for f, _ in self._outcomes if f),
+                "slow_in_window": sum(1 for _, s in self._outcomes if s),
+                "open_for_s": round(time.monotonic() - self._opened_at, 1) if state != CLOSED else 0,
+                "opened": metrics.counter(f"breaker.{self.name}.opened"),
+                "rejected": metrics.counter(f"breaker.{self.name}.rejected"),
+            }
+
+
+class BreakerProxy:
+    """Routes every method call of `target` (e.g. a QdrantClient) through a breaker."""
+
+    def __init__(self, target: Any, breaker: CircuitBreaker):
+        self._target = target
+        self._breaker = breaker
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def guarded(*args, **kwargs):
+            return self._breaker.call(attr, *args, **kwargs)
+
+        return guarded
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, is_failure: Optional[Callable[[BaseException], bool]] = None) -> CircuitBreaker:
+    """Process-wide breaker for a dependency, configured from BREAKER_DEFAULTS/BREAKER_OVERRIDES."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            config = {**BREAKER_DEFAULTS, **BREAKER_OVERRIDES.get(name, {})}
+            breaker = _breakers[name] = CircuitBreaker(name, is_failure=is_failure, **config)
+        return breaker
+
+
+def breaker_snapshot() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        breakers = dict(_breakers)
+    return {name: b.snapshot() for name, b in sorted(breakers.items())}
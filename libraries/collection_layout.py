@@ -0,0 +1,189 @@
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from qdrant_client.http.models import Distance, HnswConfigDiff, PayloadSelectorExclude, PayloadSelectorInclude, VectorParams
+
+from config.settings import (
+    EMBEDDING_MODEL,
+    EMBEDDING_DIM,
+    HYBRID_SEARCH_ENABLED,
+    QDRANT_LAYOUT,
+    MATCHES_COLLECTION,
+    NAMED_VECTORS,
+    SPARSE_VECTOR_NAME,
+    QDRANT_TENANT_GRAPHS,
+    QDRANT_PAYLOAD_M,
+    QDRANT_SHARD_BY_LEAGUE,
+    QDRANT_SHARDS_PER_KEY,
+    QDRANT_DEFAULT_SHARD_KEY,
+)
+
+# Sparse vectors need qdrant-client >= 1.10 (IDF modifier); older clients stay dense-only
+try:
+    from qdrant_client.http.models import SparseVectorParams, Modifier
+except Exception:
+    SparseVectorParams = Modifier = None
+
+# Custom sharding needs qdrant-client >= 1.7
+try:
+    from qdrant_client.http.models import ShardingMethod
+except Exception:
+    ShardingMethod = None
+
+STAMP_FIELD = "vector_stamp"
+
+# Payload fields that belong to one source (match_details or match_stats summary); the rest
+# (PAYLOAD_FIELDS, section, faq, ...) is the same for both and stored once in the named layout
+SOURCE_FIELDS = ("text", "fingerprint", STAMP_FIELD)
+
+
+def vector_stamp(text: str, model: str = EMBEDDING_MODEL) -> str:
+    """Version stamp of a point's dense vector: it changes only when the embedded text or the model does."""
+    return f"{zlib.crc32((model + chr(10) + text).encode('utf-8')):08x}"
+
+
+class CollectionTarget(NamedTuple):
+    """
+    Where the points of one logical collection (match_details / match_stats) live in Qdrant.
+
+    Split layout: a collection of its own with the unnamed dense vector, `text_bm25` and a flat
+    payload. Named layout: the `vector` named vectors of MATCHES_COLLECTION, whose points carry
+    the shared payload once plus one `{text, fingerprint, vector_stamp}` object per source.
+    Callers always see the flat per-source payload (flatten).
+    """
+
+    collection: str
+    vector: Optional[str] = None
+
+    @property
+    def sparse(self) -> str:
+        return SPARSE_VECTOR_NAME if self.vector is None else f"{self.vector}_{SPARSE_VECTOR_NAME}"
+
+    def field(self, name: str) -> str:
+        """Payload path of a field for this source ("text" -> "details.text" in the named layout)."""
+        return f"{self.vector}.{name}" if self.vector and name in SOURCE_FIELDS else name
+
+    def selector(self, with_payload: Any) -> Any:
+        """`with_payload` of a flat-payload request, rewritten for this source's points."""
+        if self.vector is None:
+            return with_payload
+        others = [name for name in NAMED_VECTORS.values() if name != self.vector]
+        if isinstance(with_payload, PayloadSelectorInclude):
+            return PayloadSelectorInclude(include=[self.field(f) for f in with_payload.include])
+        if isinstance(with_payload, PayloadSelectorExclude):
+            return PayloadSelectorExclude(exclude=[self.field(f) for f in with_payload.exclude] + others)
+        return PayloadSelectorExclude(exclude=others) if with_payload is True else with_payload
+
+    def flatten(self, payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """The payload as a per-source collection would store it."""
+        if self.vector is None or payload is None:
+            return payload
+        sources = set(NAMED_VECTORS.values())
+        flat = {k: v for k, v in payload.items() if k not in sources}
+        flat.update(payload.get(self.vector) or {})
+        return flat
+
+    def nest(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Inverse of flatten: a flat payload as stored on a named-layout point."""
+        if self.vector is None:
+            return payload
+        shared = {k: v for k, v in payload.items() if k not in SOURCE_FIELDS}
+        shared[self.vector] = {k: payload[k] for k in SOURCE_FIELDS if k in payload}
+        return shared
+
+    def point_vector(self, dense: List[float], sparse: Any = None) -> Any:
+        """Vector(s) of a point for this source (sparse only when given)."""
+        if self.vector is None:
+            return {"": dense, SPARSE_VECTOR_NAME: sparse} if sparse is not None else dense
+        vectors = {self.vector: dense}
+        if sparse is not None:
+            vectors[self.sparse] = sparse
+        return vectors
+
+    def dense(self, vector: Any) -> Optional[List[float]]:
+        """This source's dense vector out of a retrieved record's vector(s)."""
+        if isinstance(vector, dict):
+            vector = vector.get(self.vector or "")
+        return vector if isinstance(vector, list) else None
+
+
+def collection_targets(layout: str = QDRANT_LAYOUT) -> Dict[str, CollectionTarget]:
+    """Logical collection -> CollectionTarget for the configured layout ("split" or "named")."""
+    if layout == "named":
+        return {logical: CollectionTarget(MATCHES_COLLECTION, name) for logical, name in NAMED_VECTORS.items()}
+    return {logical: CollectionTarget(logical) for logical in NAMED_VECTORS}
+
+
+def create_named_collection(client, name: str = MATCHES_COLLECTION, dim: int = EMBEDDING_DIM,
+                            hybrid: bool = HYBRID_SEARCH_ENABLED) -> bool:
+    """Create the named-layout collection (a dense + BM25 sparse vector per source); returns whether it has the sparse ones."""
+    sparse_cfg = None
+    if hybrid and SparseVectorParams is not None:
+        sparse_cfg = {f"{v}_{SPARSE_VECTOR_NAME}": SparseVectorParams(modifier=Modifier.IDF) for v in NAMED_VECTORS.values()}
+    client.create_collection(
+        collection_name=name,
+        vectors_config={v: VectorParams(size=dim, distance=Distance.COSINE) for v in NAMED_VECTORS.values()},
+        sparse_vectors_config=sparse_cfg,
+        **partition_config(),
+    )
+    return sparse_cfg is not None
+
+
+def tenant_hnsw_config() -> HnswConfigDiff:
+    """Per-tenant graphs only: no global graph (m=0), payload_m links within each tenant's points."""
+    return HnswConfigDiff(m=0, payload_m=QDRANT_PAYLOAD_M)
+
+
+def partition_config(tenant_graphs: bool = QDRANT_TENANT_GRAPHS, shard_by_league: bool = QDRANT_SHARD_BY_LEAGUE) -> Dict[str, Any]:
+    """Extra create_collection arguments for tenant graphs / custom sharding (empty when both are off)."""
+    config: Dict[str, Any] = {}
+    if tenant_graphs:
+        config["hnsw_config"] = tenant_hnsw_config()
+    if shard_by_league and ShardingMethod is not None:
+        config["sharding_method"] = ShardingMethod.CUSTOM
+        config["shard_number"] = QDRANT_SHARDS_PER_KEY
+    return config
+
+
+def is_custom_sharded(collection_info: Any) -> bool:
+    method = getattr(getattr(getattr(collection_info, "config", None), "params", None), "sharding_method", None)
+    return ShardingMethod is not None and method == ShardingMethod.CUSTOM
+
+
+def shard_key(payload: Dict[str, Any]) -> str:
+    """Shard key of a point in a league-sharded collection."""
+    return str(payload.get("league_id") or QDRANT_DEFAULT_SHARD_KEY)
+
+
+def ensure_shard_key(client, collection: str, key: str) -> None:
+    """Create a shard key (idempotent); points can only be written to existing keys."""
+    try:
+        client.create_shard_key(collection_name=collection, shard_key=key, shards_number=QDRANT_SHARDS_PER_KEY)
+    except Exception as e:
+        if "already exists" not in str(e).lower():
+            raise
+
+
+def target_of(collection: str, targets: Optional[Dict[str, CollectionTarget]] = None) -> CollectionTarget:
+    """Target of a logical collection; any other name (a versioned reindex collection, a scratch one) is its own split target."""
+    return (targets if targets is not None else collection_targets()).get(collection) or CollectionTarget(collection)
+
+
+def fused_selector(with_payload: Any, targets: List[CollectionTarget]) -> Tuple[Any, bool]:
+    """
+    `with_payload` of one query over several sources of a named-layout collection. Each
+    source's stamp is always read (every named-layout source object has one), so a hit can
+    be attributed to the sources the point actually has; the bool says to drop it again.
+    """
+    stamps = [t.field(STAMP_FIELD) for t in targets]
+    if isinstance(with_payload, PayloadSelectorInclude):
+        fields = [t.field(f) for f in with_payload.include for t in targets]
+        fields = list(dict.fromkeys(fields + stamps))
+        return PayloadSelectorInclude(include=fields), STAMP_FIELD not in with_payload.include
+    if isinstance(with_payload, PayloadSelectorExclude):
+        fields = list(dict.fromkeys(t.field(f) for f in with_payload.exclude for t in targets))
+        kept = [f for f in fields if f not in stamps]
+        return (PayloadSelectorExclude(exclude=kept) if kept else True), STAMP_FIELD in with_payload.exclude
+    if with_payload is True:
+        return True, False
+    return PayloadSelectorInclude(include=stamps), True
@@ -0,0 +1,203 @@
+import glob
+import itertools
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Union
+
+import torch
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from config.settings import (
+    EMBEDDING_MODEL,
+    EMBEDDING_MMAP_WEIGHTS,
+    EMBED_MICRO_BATCHING,
+    EMBED_BATCH_MAX_SIZE,
+    EMBED_BATCH_MAX_WAIT_MS,
+)
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8, "U8": torch.uint8,
+}
+
+
+class MicroBatchEmbedder:
+    """
+    Coalesces concurrent embed calls into batched forward passes on one worker thread.
+
+    Callers get futures (submit) or block on them (embed_query / embed_documents, the same
+    interface as HuggingFaceEmbeddings). The worker takes the first waiting text, then keeps
+    collecting until `max_batch` texts or `max_wait_ms` have passed, and runs one
+    embed_documents call for the lot. `max_wait_ms=0` never waits: it batches whatever queued
+    up during the previous forward pass, which adds no latency when traffic is light. Higher
+    values trade latency for fuller batches under load (scripts/benchmark_micro_batching.py).
+    The worker thread is started lazily and again after fork, so each gunicorn worker has its own.
+
+    The queue is by priority: embed_query texts (interactive questions) are always taken before
+    embed_documents texts (ingestion, reindex), so a bulk push delays a question by at most the
+    forward pass already running, not by everything queued ahead of it.
+    """
+
+    QUERY, DOCUMENT = 0, 1
+
+    def __init__(self, base: HuggingFaceEmbeddings, max_batch: int = 32, max_wait_ms: float = 2.0):
+        self.base = base
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()  # FIFO within a priority; futures are never compared
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, text: str, priority: int = QUERY) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((priority, next(self._seq), text, future, time.perf_counter()))
+        return future
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        futures = [self.submit(text, self.DOCUMENT) for text in texts]
+        return [future.result() for future in futures]
+
+    def _ensure_worker(self) -> None:
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid != os.getpid():
+                    self._queue = queue.PriorityQueue()  # forked: the parent's queue (and its lock) is not ours
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), name="embed-batcher", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _collect(self, work: "queue.PriorityQueue") -> list:
+        batch = [work.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(work.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(work.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, work: "queue.PriorityQueue") -> None:
+        while True:
+            batch = self._collect(work)
+            started = time.perf_counter()
+            for priority, _, _, _, queued_at in batch:
+                metrics.observe("embed.queue_wait_ms" if priority == self.QUERY else "embed.document_queue_wait_ms",
+                                (started - queued_at) * 1000)
+            try:
+                vectors = self.base.embed_documents([text for _, _, text, _, _ in batch])
+            except Exception as e:
+                for _, _, _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, _, future, _), vector in zip(batch, vectors):
+                future.set_result(vector)
+            metrics.incr("embed.batches")
+            metrics.incr("embed.items", len(batch))
+            metrics.observe("embed.batch_ms", (time.perf_counter() - started) * 1000)
+
+
+Embedder = Union[HuggingFaceEmbeddings, MicroBatchEmbedder]
+
+_embedders: Dict[str, Embedder] = {}
+_lock = threading.Lock()
+
+
+def get_embedder(model_name: str = EMBEDDING_MODEL) -> Embedder:
+    """
+    One embedding model per process (searcher and pushers share it), behind the micro-batching
+    executor when EMBED_MICRO_BATCHING is on. Under gunicorn it is loaded in the master before
+    fork (gunicorn.conf.py), so workers share its weight pages.
+    """
+    with _lock:
+        embedder = _embedders.get(model_name)
+        if embedder is None:
+            embedder = HuggingFaceEmbeddings(model_name=model_name)
+            if EMBEDDING_MMAP_WEIGHTS:
+                try:
+                    map_weights(embedder)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not memory-map weights of {model_name}, keeping the loaded copy: {e}")
+            if EMBED_MICRO_BATCHING:
+                embedder = MicroBatchEmbedder(embedder, EMBED_BATCH_MAX_SIZE, EMBED_BATCH_MAX_WAIT_MS)
+            _embedders[model_name] = embedder
+        return embedder
+
+
+def load_safetensors_mmap(path: str) -> Dict[str, torch.Tensor]:
+    """
+    Tensors of a .safetensors file as views of a private (copy-on-write) file mapping: the
+    pages stay in the page cache and are shared by every process that maps the file, as long
+    as nobody writes to them (inference never does).
+    """
+    with open(path, "rb") as f:
+        header_len = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_len))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    base = 8 + header_len
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__" or info["dtype"] not in _DTYPES:
+            continue
+        start, end = info["data_offsets"]
+        dtype = _DTYPES[info["dtype"]]
+        if end <= start:
+            continue
+        tensor = torch.frombuffer(mapped, dtype=dtype, count=(end - start) // dtype.itemsize, offset=base + start)
+        tensors[name] = tensor.reshape(info["shape"])
+    return tensors
+
+
+def map_weights(embedder: HuggingFaceEmbeddings) -> int:
+    """
+    Swap the loaded parameters of the transformer for memory-mapped views of its safetensors
+    files (same names, shapes and dtypes only). Returns the number of bytes now file-backed.
+    """
+    embedder = getattr(embedder, "base", embedder)
+    model = embedder.client[0].auto_model  # SentenceTransformer -> Transformer module -> HF model
+    root = model.name_or_path
+    files = sorted(glob.glob(os.path.join(root, "*.safetensors"))) if os.path.isdir(root) else []
+    if not files:
+        logger.info(f"No safetensors files under {root}; embedding weights stay process-private")
+        return 0
+
+    targets = {**dict(model.named_parameters()), **dict(model.named_buffers())}
+    mapped = 0
+    with torch.no_grad():
+        for path in files:
+            for name, tensor in load_safetensors_mmap(path).items():
+                # checkpoints of base models are sometimes saved with the architecture prefix ("bert.")
+                target = targets.get(name)
+                if target is None and "." in name:
+                    target = targets.get(name.split(".", 1)[1])
+                if target is None or target.shape != tensor.shape or target.dtype != tensor.dtype:
+                    continue
+                target.data = tensor
+                mapped += tensor.numel() * tensor.element_size()
+    logger.info(f"🧠 Memory-mapped {mapped / 2**20:.1f} MiB of embedding weights from {len(files)} file(s)")
+    return mapped
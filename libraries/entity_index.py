@@ -0,0 +1,276 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from qdrant_client.http.models import (
+    Filter as QFilter,
+    FieldCondition,
+    MatchAny,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Squad-membership phrasings only ("in the XI", "playing XI"); questions about how a player
+# plays, their role or record need retrieval
+PLAYING_QUESTION = re.compile(
+    r"\b(in|into|out of|from) the (playing )?(squad|team|xi|11|eleven|lineup|line-up|line up)\b|\bplaying (xi|11|eleven)\b",
+    re.IGNORECASE,
+)
+# "is <player> playing (today)?", "will <player> start?", "is <player> selected for ...?", "<player> available?"
+_PLAYING = r"(play|playing|start|starting|available|fit)( (today|tonight|tomorrow|(in|for) (this|the|today s) (match|game)))? $"
+_SELECTED = r"(selected|included|picked|dropped|benched)"
+
+
+def is_playing_question(question: str, players: List[Dict[str, Any]]) -> bool:
+    """Whether the question asks if one of the detected players is in the squad / XI."""
+    if PLAYING_QUESTION.search(question or ""):
+        return True
+    text = normalize(question)
+    for alias in {normalize(p.get("alias") or p.get("name")).strip() for p in players} - {""}:
+        name = re.escape(alias)
+        if (re.search(rf" (is|will|would|does|can) {name} {_PLAYING}", text)
+                or re.search(rf" (is|was|has|have) {name} (been )?{_SELECTED} ", text)
+                or re.match(rf" {name} (is )?{_PLAYING}", text)):
+            return True
+    return False
+
+
+def normalize(text: str) -> str:
+    """Lowercase, collapse punctuation to single spaces and pad, so ' ks bharat ' only matches whole words."""
+    return f" {_NON_ALNUM.sub(' ', str(text or '').lower()).strip()} "
+
+
+class AhoCorasick:
+    """Minimal Aho-Corasick automaton: all patterns found in a single pass over the text."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+
+    def add(self, pattern: str, value: Any) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), value))
+
+    def build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                if node:
+                    f = self._fail[node]
+                    while f and ch not in self._goto[f]:
+                        f = self._fail[f]
+                    self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, value) for every pattern occurrence."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, value in self._out[node]:
+                yield i + 1 - length, i + 1, value
+
+
+class MatchEntityIndex:
+    """
+    In-memory entity dictionary (players, teams, venues, leagues) for the active matches.
+
+    Entities are kept per match so a cron upsert only replaces that match's patterns;
+    the automaton is recompiled lazily on the next lookup after any change.
+    """
+
+    def __init__(self):
+        self._entities: Dict[str, List[Dict[str, Any]]] = {}
+        self._automaton: Optional[AhoCorasick] = None
+        self._lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+
+    # ---------- maintenance ----------
+    @staticmethod
+    def _entities_for_match(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+        match_id = str(match.get("match_id", ""))
+        base = {"match_id": match_id}
+        entities: List[Dict[str, Any]] = []
+
+        teams = {
+            str(match.get("home_team_id", "")): match.get("home_team_name") or match.get("home_team"),
+            str(match.get("away_team_id", "")): match.get("away_team_name") or match.get("away_team"),
+        }
+        for side in ("home", "away"):
+            team_id = str(match.get(f"{side}_team_id", ""))
+            for alias in (match.get(f"{side}_team_name"), match.get(f"{side}_team")):
+                if alias:
+                    entities.append({**base, "kind": "team", "alias": alias, "team_id": team_id,
+                                     "name": teams.get(team_id)})
+
+            for player in match.get(f"{side}_team_squad") or []:
+                info = {
+                    **base,
+                    "kind": "player",
+                    "player_id": str(player.get("player_id", "")),
+                    "name": player.get("full_name"),
+                    "nick_name": player.get("nick_name"),
+                    "position": player.get("position"),
+                    "team_id": str(player.get("team_id") or team_id),
+                    "team_name": teams.get(str(player.get("team_id") or team_id)),
+                    "last_match_played": player.get("last_match_played"),
+                }
+                for alias in {player.get("full_name"), player.get("nick_name")}:
+                    if alias:
+                        entities.append({**info, "alias": alias})
+
+        if match.get("ground_name"):
+            entities.append({**base, "kind": "venue", "alias": match["ground_name"],
+                             "venue_id": str(match.get("venue_id", "")), "name": match["ground_name"]})
+        if match.get("league_name"):
+            entities.append({**base, "kind": "league", "alias": match["league_name"],
+                             "league_id": str(match.get("league_id", "")), "name": match["league_name"]})
+
+        context = {
+            "match_title": match.get("match_title"),
+            "lineup_announce": match.get("lineup_announce"),
+            "match_scheduled_date": match.get("match_scheduled_date"),
+        }
+        for entity in entities:
+            entity.update(context)
+        return entities
+
+    def upsert_match(self, match: Dict[str, Any]) -> None:
+        """Replace the entities of one match (call after each match_details upsert)."""
+        match_id = str(match.get("match_id", ""))
+        if not match_id:
+            return
+        entities = self._entities_for_match(match)
+        with self._lock:
+            self._entities[match_id] = entities
+            self._automaton = None
+
+    def remove_match(self, match_id: Any) -> None:
+        with self._lock:
+            if self._entities.pop(str(match_id), None) is not None:
+                self._automaton = None
+
+    def load(self, matches: List[Dict[str, Any]]) -> None:
+        """Full (re)load from the active match_details documents."""
+        entities = {str(m.get("match_id")): self._entities_for_match(m) for m in matches if m.get("match_id")}
+        with self._lock:
+            self._entities = entities
+            self._automaton = None
+            self.loaded_at = time.monotonic()
+        logger.info(f"📇 Entity index loaded for {len(entities)} matches")
+
+    def is_stale(self, max_age: float) -> bool:
+        """Never loaded, or the last full load is older than max_age seconds."""
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+    def _get_automaton(self) -> AhoCorasick:
+        with self._lock:
+            if self._automaton is None:
+                automaton = AhoCorasick()
+                for entities in self._entities.values():
+                    for entity in entities:
+                        pattern = normalize(entity["alias"])
+                        if pattern.strip():
+                            automaton.add(pattern, entity)
+                automaton.build()
+                self._automaton = automaton
+            return self._automaton
+
+    # ---------- lookup ----------
+    def detect(self, question: str, match_id: Any = None) -> List[Dict[str, Any]]:
+        """
+        Entities mentioned in the question, longest match wins on overlap.
+        With match_id, only entities of that match are returned plus players of other
+        active matches (so "not in this squad" can be answered directly).
+        """
+        text = normalize(question)
+        found = sorted(self._get_automaton().iter_matches(text), key=lambda m: (m[0], -(m[1] - m[0])))
+
+        out: List[Dict[str, Any]] = []
+        seen = set()
+        last_span = None
+        for start, end, entity in found:
+            # patterns carry their padding spaces, so adjacent matches share one space;
+            # the same alias can belong to several matches, so equal spans are all kept
+            if last_span and (start, end) != last_span and start < last_span[1] - 1:
+                continue
+            key = (entity["kind"], entity["match_id"], entity.get("player_id") or entity.get("alias"))
+            if key in seen:
+                continue
+            if match_id is not None and entity["match_id"] != str(match_id) and entity["kind"] != "player":
+                continue
+            seen.add(key)
+            out.append(entity)
+            last_span = (start, end)
+        return out
+
+    @staticmethod
+    def to_filter(entities: List[Dict[str, Any]]) -> Optional[QFilter]:
+        """Payload filter narrowing search to the matches (and teams/venues) the question names."""
+        if not entities:
+            return None
+        match_ids = sorted({e["match_id"] for e in entities})
+        must = [FieldCondition(key="match_id", match=MatchAny(any=match_ids))]
+        team_ids = sorted({e["team_id"] for e in entities if e["kind"] in {"team", "player"} and e.get("team_id")})
+        venue_ids = sorted({e["venue_id"] for e in entities if e["kind"] == "venue" and e.get("venue_id")})
+        if venue_ids:
+            must.append(FieldCondition(key="venue_id", match=MatchAny(any=venue_ids)))
+        should = []
+        if team_ids:
+            should = [
+                FieldCondition(key="home_team_id", match=MatchAny(any=team_ids)),
+                FieldCondition(key="away_team_id", match=MatchAny(any=team_ids)),
+            ]
+        return QFilter(must=must, should=should or None)
+
+    @staticmethod
+    def direct_answer(question: str, entities: List[Dict[str, Any]], match_id: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Answer squad/availability questions straight from the squad lists.
+        Returns None when the question needs retrieval.
+        """
+        players = [e for e in entities if e["kind"] == "player"]
+        if not players or not is_playing_question(question, players):
+            return None
+
+        lines = []
+        in_match = [p for p in players if match_id is None or p["match_id"] == str(match_id)]
+        for p in in_match:
+            lineup = "Lineup announced." if str(p.get("lineup_announce")) == "1" else "Lineup not announced yet."
+            lines.append(
+                f"{p['name']} ({p.get('nick_name') or p['name']}, {p.get('position')}) is in the "
+                f"{p.get('team_name') or p.get('team_id')} squad for {p.get('match_title') or 'match ' + p['match_id']}"
+                f" (match_id {p['match_id']}). {lineup}"
+            )
+        if match_id is not None:
+            named = {p["player_id"] for p in in_match}
+            for p in players:
+                if p["player_id"] not in named and p["match_id"] != str(match_id):
+                    named.add(p["player_id"])
+                    lines.append(f"{p['name']} is not in either squad for this match.")
+        if not lines:
+            return None
+        return {"answer": " ".join(lines), "entities": players, "source": "entity_index"}
+
+
+# Shared by the cron (writes) and user (reads) controllers within one process
+match_entity_index = MatchEntityIndex()
@@ -0,0 +1,168 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from qdrant_client.http.models import FieldCondition, Filter as QFilter, MatchValue
+
+from config.settings import FAQ_QUESTIONS, FAQ_MATCH_THRESHOLD, FAQ_CACHE_TTL
+from utils.cache import TTLCache
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+FAQ_FIELD = "faq"
+FAQ_POINT = FieldCondition(key=FAQ_FIELD, match=MatchValue(value=True))
+
+
+def exclude_faqs(qfilter: QFilter) -> QFilter:
+    """Question searches never return FAQ answer points (they quote the summaries, not add to them)."""
+    qfilter.must_not = list(qfilter.must_not or []) + [FAQ_POINT]
+    return qfilter
+
+
+def match_filter(match_id: Any) -> QFilter:
+    return exclude_faqs(QFilter(must=[FieldCondition(key="match_id", match=MatchValue(value=str(match_id)))]))
+
+
+def faq_section(key: str) -> str:
+    """`section` of a FAQ point, so QdrantMatchPusher.point_id gives it a stable id of its own."""
+    return f"faq:{key}"
+
+
+class FaqLookup:
+    """
+    Question path side: maps a question to the closest configured FAQ by embedding (the FAQ
+    questions are embedded once per process) and returns that match's precomputed answer.
+    A match's answers are read from Mongo once per `ttl` and kept under the match's points_version
+    (bumped whenever its points, FAQ points included, are replaced), so answers regenerated by
+    any process are picked up on the next lookup. An empty read is not kept: the FAQs of a match
+    asked about before its precompute ran are found as soon as they exist.
+    """
+
+    def __init__(self, questions: Dict[str, str] = FAQ_QUESTIONS, threshold: float = FAQ_MATCH_THRESHOLD,
+                 ttl: Optional[float] = FAQ_CACHE_TTL):
+        self.questions = dict(questions)
+        self.threshold = threshold
+        self._keys = list(self.questions)
+        self._matrix: Optional[np.ndarray] = None
+        self._answers = TTLCache(maxsize=1024, ttl=ttl)
+
+    def match(self, embedder, vector) -> Optional[Tuple[str, float]]:
+        """(faq key, similarity) of the closest FAQ at or above the threshold, or None."""
+        if not self._keys:
+            return None
+        if self._matrix is None:
+            matrix = np.asarray(embedder.embed_documents([self.questions[k] for k in self._keys]), dtype=np.float32)
+            self._matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        query = np.asarray(vector, dtype=np.float32)
+        similarities = self._matrix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return self._keys[best], float(similarities[best])
+
+    def answer(self, embedder, match_id: Any, vector, load: Callable[[str], Dict[str, Dict[str, Any]]],
+               version: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Precomputed answer for the question embedded as `vector`; `load(match_id)` reads a match's
+        FAQs. `version` is the match's current points_version (None: unknown, nothing is cached).
+        """
+        found = self.match(embedder, vector)
+        if found is None:
+            return None
+        key, similarity = found
+        cached = self._answers.get(str(match_id))
+        if version is not None and cached is not None and cached[0] == version:
+            faqs = cached[1]
+        else:
+            faqs = load(str(match_id)) or {}
+            if faqs and version is not None:
+                self._answers.set(str(match_id), (version, faqs))
+        doc = faqs.get(key)
+        if not doc or not doc.get("answer"):
+            return None
+        return {
+            "faq": key,
+            "question": doc.get("question"),
+            "answer": doc["answer"],
+            "similarity": round(similarity, 4),
+            "generated_at": doc.get("generated_at"),
+        }
+
+    def invalidate(self, match_id: Any) -> None:
+        self._answers.invalidate(str(match_id))
+
+
+class FaqPrecomputer:
+    """
+    Ingest side: after a match's sections are embedded, answer every configured FAQ from the
+    same retrieval and synthesis as a live question, store the answers in Mongo and push them
+    as `faq` points. An answer is regenerated only when the summary version of its context
+    (AnswerSynthesizer.summary_version) or the FAQ question changed.
+    """
+
+    def __init__(self, searcher, synthesizer, ai_model, store, questions: Dict[str, str] = FAQ_QUESTIONS):
+        self.searcher = searcher
+        self.synthesizer = synthesizer
+        self.ai_model = ai_model
+        self.store = store  # CronModel: get_match_faqs / upsert_match_faq / bump_points_version
+        self.questions = dict(questions)
+
+    def precompute(self, record, pusher) -> Dict[str, int]:
+        """FAQ answers of one match (a MatchDetails); returns generated/reused/failed counts."""
+        match_id = str(record.match_id)
+        existing = self.store.get_match_faqs(match_id)
+        counts = {"generated": 0, "reused": 0, "failed": 0}
+        docs = []
+        for key, question in self.questions.items():
+            qfilter = match_filter(match_id)
+            results = self.searcher.search_question(question, top_k=5, filters={c: qfilter for c in self.searcher.collections})
+            chunks = self.synthesizer.select_context(question, results)
+            if not chunks:
+                continue
+            version = self.synthesizer.summary_version(chunks)
+            old = existing.get(key)
+            if old and old.get("summary_version") == version and old.get("question") == question and old.get("answer"):
+                counts["reused"] += 1
+                if not pusher.document_exists(pusher.point_id(match_id, faq_section(key))):
+                    docs.append(self._document(record, key, question, old["answer"]))  # e.g. after a reindex
+                continue
+            try:
+                answer = self.synthesizer.answer(self.ai_model, match_id, question, results)["answer"]
+            except Exception as e:
+                counts["failed"] += 1
+                logger.warning(f"⚠️ FAQ '{key}' of match {match_id} not generated: {e}")
+                continue
+            result = self.store.upsert_match_faq(match_id, key, {
+                "question": question,
+                "answer": answer,
+                "summary_version": version,
+                "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "match_scheduled_date": record.match_scheduled_date,  # retention prunes on it
+            })
+            if result.get("status") == "error":
+                counts["failed"] += 1
+                continue
+            counts["generated"] += 1
+            docs.append(self._document(record, key, question, answer))
+
+        if docs:
+            pusher.push_matches(docs)
+        if counts["generated"]:
+            faq_lookup.invalidate(match_id)
+            self.store.bump_points_version(match_id)  # other processes re-read the FAQs on their next lookup
+        metrics.incr("faq.generated", counts["generated"])
+        metrics.incr("faq.reused", counts["reused"])
+        logger.info(f"❓ FAQs of match {match_id}: {counts['generated']} generated, {counts['reused']} reused, {counts['failed']} failed")
+        return counts
+
+    @staticmethod
+    def _document(record, key: str, question: str, answer: str) -> Document:
+        metadata = {**record.to_payload(), "section": faq_section(key), FAQ_FIELD: True, "faq_key": key, "question": question}
+        return Document(page_content=f"{question}\n{answer}", metadata=metadata)
+
+
+# Shared by the cron (invalidates after regenerating) and user (reads) controllers within one process
+faq_lookup = FaqLookup()
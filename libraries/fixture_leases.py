@@ -0,0 +1,232 @@
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def current_cycle(cycle_seconds: int, now: Optional[float] = None) -> str:
+    """Cycle id shared by every worker: fixtures are processed at most once per cycle."""
+    return str(int((now if now is not None else time.time()) // cycle_seconds))
+
+
+class MongoLeaseStore:
+    """
+    Lease documents in a Mongo collection, one per fixture:
+        {_id: fixture_id, owner, token, cycle, expires_at, heartbeat_at, done_cycle}
+
+    A lease is acquired with one conditional upsert: it matches when the fixture is not done
+    for this cycle and the lease is ours or expired. Any other state makes the upsert collide
+    on _id, so exactly one worker wins. `token` is bumped on every acquisition and fences
+    renew/complete/release against a worker whose lease was taken over.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def acquire(self, fixture_id: str, owner: str, cycle: str, ttl: int) -> Optional[int]:
+        now = datetime.now(timezone.utc)
+        try:
+            doc = self.collection.find_one_and_update(
+                {
+                    "_id": fixture_id,
+                    "done_cycle": {"$ne": cycle},
+                    "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}],
+                },
+                {
+                    "$set": {"owner": owner, "cycle": cycle, "expires_at": now + timedelta(seconds=ttl), "heartbeat_at": now},
+                    "$inc": {"token": 1},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return doc["token"]
+        except DuplicateKeyError:
+            return None
+
+    def renew(self, fixture_id: str, owner: str, token: int, ttl: int) -> bool:
+        now = datetime.now(timezone.utc)
+        result = self.collection.update_one(
+            {"_id": fixture_id, "owner": owner, "token": token},
+            {"$set": {"expires_at": now + timedelta(seconds=ttl), "heartbeat_at": now}},
+        )
+        return result.matched_count == 1
+
+    def complete(self, fixture_id: str, owner: str, token: int, cycle: str) -> bool:
+        now = datetime.now(timezone.utc)
+        result = self.collection.update_one(
+            {"_id": fixture_id, "owner": owner, "token": token},
+            {"$set": {"done_cycle": cycle, "done_at": now, "expires_at": now}},
+        )
+        return result.matched_count == 1
+
+    def release(self, fixture_id: str, owner: str, token: int) -> bool:
+        result = self.collection.update_one(
+            {"_id": fixture_id, "owner": owner, "token": token},
+            {"$set": {"expires_at": datetime.now(timezone.utc)}},
+        )
+        return result.matched_count == 1
+
+
+class MemoryLeaseStore:
+    """Same semantics as MongoLeaseStore in one process (offline benchmark, single-node runs)."""
+
+    def __init__(self):
+        self._leases: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, fixture_id: str, owner: str, cycle: str, ttl: int) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            lease = self._leases.get(fixture_id)
+            if lease and (lease.get("done_cycle") == cycle or (lease["owner"] != owner and lease["expires_at"] > now)):
+                return None
+            lease = lease or {"token": 0}
+            lease.update(owner=owner, cycle=cycle, expires_at=now + ttl, token=lease["token"] + 1)
+            self._leases[fixture_id] = lease
+            return lease["token"]
+
+    def _owned(self, fixture_id: str, owner: str, token: int) -> Optional[dict]:
+        lease = self._leases.get(fixture_id)
+        return lease if lease and lease["owner"] == owner and lease["token"] == token else None
+
+    def renew(self, fixture_id: str, owner: str, token: int, ttl: int) -> bool:
+        with self._lock:
+            lease = self._owned(fixture_id, owner, token)
+            if lease:
+                lease["expires_at"] = time.monotonic() + ttl
+            return lease is not None
+
+    def complete(self, fixture_id: str, owner: str, token: int, cycle: str) -> bool:
+        with self._lock:
+            lease = self._owned(fixture_id, owner, token)
+            if lease:
+                lease.update(done_cycle=cycle, expires_at=time.monotonic())
+            return lease is not None
+
+    def release(self, fixture_id: str, owner: str, token: int) -> bool:
+        with self._lock:
+            lease = self._owned(fixture_id, owner, token)
+            if lease:
+                lease["expires_at"] = time.monotonic()
+            return lease is not None
+
+
+class FixtureLeaseManager:
+    """
+    Per-worker view of the lease store: acquires fixtures, keeps the held ones alive from a
+    heartbeat thread and drops any lease another worker has taken over (owns() turns False,
+    so the caller stops before summarizing or writing).
+    """
+
+    def __init__(self, store, worker_id: Optional[str] = None, ttl: int = 120, heartbeat: int = 30):
+        self.store = store
+        self.worker_id = worker_id or default_worker_id()
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self._held: Dict[str, int] = {}
+        self._renewed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def acquire(self, fixture_id: str, cycle: str) -> bool:
+        token = self.store.acquire(fixture_id, self.worker_id, cycle, self.ttl)
+        if token is None:
+            return False
+        with self._lock:
+            self._held[fixture_id] = token
+            self._renewed_at[fixture_id] = time.monotonic()
+        self._ensure_heartbeat()
+        return True
+
+    def owns(self, fixture_id: str) -> bool:
+        """False once the lease was taken over, or could not be renewed for a whole TTL."""
+        with self._lock:
+            renewed_at = self._renewed_at.get(fixture_id)
+            return fixture_id in self._held and time.monotonic() - renewed_at < self.ttl
+
+    def complete(self, fixture_id: str, cycle: str) -> bool:
+        token = self._pop(fixture_id)
+        return token is not None and self.store.complete(fixture_id, self.worker_id, token, cycle)
+
+    def release(self, fixture_id: str) -> bool:
+        token = self._pop(fixture_id)
+        return token is not None and self.store.release(fixture_id, self.worker_id, token)
+
+    def close(self) -> None:
+        self._stop.set()
+        for fixture_id in list(self._held):
+            self.release(fixture_id)
+
+    def _pop(self, fixture_id: str) -> Optional[int]:
+        with self._lock:
+            self._renewed_at.pop(fixture_id, None)
+            return self._held.pop(fixture_id, None)
+
+    def _ensure_heartbeat(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._heartbeat_loop, name=f"lease-heartbeat-{self.worker_id}", daemon=True)
+            self._thread.start()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat):
+            with self._lock:
+                held = dict(self._held)
+            for fixture_id, token in held.items():
+                try:
+                    alive = self.store.renew(fixture_id, self.worker_id, token, self.ttl)
+                except Exception as e:
+                    logger.warning(f"⚠️ Lease heartbeat failed for fixture {fixture_id}: {e}")
+                    continue
+                with self._lock:
+                    if self._held.get(fixture_id) != token:
+                        continue
+                    if alive:
+                        self._renewed_at[fixture_id] = time.monotonic()
+                        continue
+                    del self._held[fixture_id]
+                    self._renewed_at.pop(fixture_id, None)
+                logger.warning(f"⚠️ Lease on fixture {fixture_id} was taken over; {self.worker_id} stops working on it")
+
+
+def run_leased(fixtures: List[Dict[str, Any]], leases: FixtureLeaseManager, cycle: str,
+               process: Callable[..., bool], key: str = "season_game_uid") -> Dict[str, Any]:
+    """
+    Work through `fixtures`, processing only the ones this worker wins a lease for.
+    Workers start at different offsets of the list (by worker id) so they rarely contend
+    for the same fixture. `process(fixture, still_owner)` returns False when it gave up.
+    """
+    stats = {"worker_id": leases.worker_id, "cycle": cycle, "processed": 0, "skipped": 0, "lost": 0, "failed": 0}
+    if not fixtures:
+        return stats
+    offset = zlib.crc32(leases.worker_id.encode("utf-8")) % len(fixtures)
+    for fixture in fixtures[offset:] + fixtures[:offset]:
+        fixture_id = str(fixture[key])
+        if not leases.acquire(fixture_id, cycle):
+            stats["skipped"] += 1
+            continue
+        try:
+            if process(fixture, lambda: leases.owns(fixture_id)) and leases.complete(fixture_id, cycle):
+                stats["processed"] += 1
+            else:
+                leases.release(fixture_id)
+                stats["lost"] += 1
+        except Exception as e:
+            leases.release(fixture_id)
+            stats["failed"] += 1
+            logger.error(f"❌ Fixture {fixture_id} failed on {leases.worker_id}: {e}")
+    return stats
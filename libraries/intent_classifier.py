@@ -0,0 +1,140 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Words that signal an open-ended question the stored fields cannot answer on their own
+OPEN_ENDED = re.compile(
+    r"\b(why|explain|compare|comparison|analy[sz]e|analysis|should i|fantasy|captain|vice[- ]captain|"
+    r"best (pick|player|team)|strategy|tips?|everything|summary|summari[sz]e)\b",
+    re.IGNORECASE,
+)
+
+
+# Questions about a player: the team-level fields (predicted score, favourite) answer something else
+PLAYER_QUESTION = re.compile(
+    r"\b(players?|batters?|batsm[ae]n|bowlers?|all[- ]?rounders?|(wicket[- ]?)?keepers?|openers?)\b",
+    re.IGNORECASE,
+)
+
+
+def _val(doc: Dict[str, Any], field: str) -> Any:
+    value = doc.get(field)
+    return None if value in (None, "") else value
+
+
+def _score_prediction(doc: Dict[str, Any]) -> Optional[str]:
+    parts = []
+    for side in ("home", "away"):
+        score = _val(doc, f"{side}_team_score_prediction")
+        if score is None:
+            continue
+        wickets = _val(doc, f"{side}_team_wicket_prediction")
+        team = _val(doc, f"{side}_team_name") or _val(doc, f"{side}_team")
+        parts.append(f"{team}: {score}" + (f"/{wickets}" if wickets is not None else ""))
+    return f"Predicted scores — {', '.join(parts)}." if parts else None
+
+
+def _win_prediction(doc: Dict[str, Any]) -> Optional[str]:
+    team = _val(doc, "win_team_name")
+    if team is None:
+        return None
+    answer = f"{team} is predicted to win"
+    probability = _val(doc, "win_team_win_probability")
+    if probability is not None:
+        answer += f" with a {probability}% win probability"
+    margins = []
+    if _val(doc, "win_team_run") is not None:
+        margins.append(f"{doc['win_team_run']} runs")
+    if _val(doc, "win_team_wicket") is not None:
+        margins.append(f"{doc['win_team_wicket']} wickets")
+    if margins:
+        answer += f" (projected margin: {' / '.join(margins)})"
+    return answer + "."
+
+
+def _weather(doc: Dict[str, Any]) -> Optional[str]:
+    if _val(doc, "weather") is None and _val(doc, "temperature") is None:
+        return None
+    details = []
+    for field, label, unit in (
+        ("temperature", "temperature", "°C"),
+        ("humidity", "humidity", "%"),
+        ("clouds", "cloud cover", "%"),
+        ("wind_speed", "wind", " km/h"),
+    ):
+        if _val(doc, field) is not None:
+            details.append(f"{label} {doc[field]}{unit}")
+    desc = _val(doc, "weather_desc") or _val(doc, "weather") or "n/a"
+    return f"Weather: {desc}" + (f" — {', '.join(details)}." if details else ".")
+
+
+def _pitch(doc: Dict[str, Any]) -> Optional[str]:
+    pitch = _val(doc, "pitch_support_description")
+    bowling = _val(doc, "bowling_support_description")
+    if pitch is None and bowling is None:
+        return None
+    parts = [p for p in (pitch, bowling) if p]
+    venue = _val(doc, "ground_name")
+    return (f"Pitch at {venue}: " if venue else "Pitch: ") + " ".join(parts)
+
+
+def _toss_trend(doc: Dict[str, Any]) -> Optional[str]:
+    first = _val(doc, "bat_first_win_on_this_venue")
+    second = _val(doc, "bat_second_win_on_this_venue")
+    if first is None and second is None:
+        return None
+    total = _val(doc, "total_matches_played_on_this_venue")
+    answer = f"At this venue, teams batting first won {first}% and teams chasing won {second}%"
+    return answer + (f" of {total} matches." if total is not None else ".")
+
+
+def _venue_scores(doc: Dict[str, Any]) -> Optional[str]:
+    first = _val(doc, "avg_first_inning_score")
+    second = _val(doc, "avg_second_inning_score")
+    if first is None and second is None:
+        return None
+    return (
+        f"Average first innings: {first}/{_val(doc, 'avg_first_inning_wicket')}, "
+        f"average second innings: {second}/{_val(doc, 'avg_second_inning_wicket')}."
+    )
+
+
+# (intent, trigger pattern, answer builder) — checked in order, exactly one must fire
+INTENTS: List[Tuple[str, "re.Pattern", Callable[[Dict[str, Any]], Optional[str]]]] = [
+    ("score_prediction", re.compile(
+        r"\b(predicted|projected|expected) (team )?(score|total|runs)|\bscore prediction|how many runs will", re.I),
+     _score_prediction),
+    ("win_prediction", re.compile(
+        r"\bwho (will|would|is going to|is likely to) win|\bwin(ning)? (probability|chance|chances|odds|prediction)"
+        r"|\bwinner\b|\bwhich team (will )?wins?\b|\bfavou?rites?\b", re.I),
+     _win_prediction),
+    ("weather", re.compile(r"\b(weather|rain|raining|temperature|humid|humidity|cloudy|clouds|wind|forecast)\b", re.I),
+     _weather),
+    ("pitch", re.compile(r"\b(pitch|surface|wicket (type|report)|batting track|bowling support|spinners?|pacers?)\b", re.I),
+     _pitch),
+    ("toss_trend", re.compile(r"\b(toss|bat first|batting first|bat second|chase|chasing|defend)\b", re.I),
+     _toss_trend),
+    ("venue_scores", re.compile(r"\b(average|avg|par) (first |second )?(innings? )?score|\bpar score\b", re.I),
+     _venue_scores),
+]
+
+
+def classify(question: str, entities: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+    """
+    Return the single field-backed intent of the question, or None for open-ended and player
+    questions. `entities` are the question's detected entities (MatchEntityIndex.detect);
+    "How many runs will KS Bharat score?" names a player, so it is not a score_prediction.
+    """
+    if not question or OPEN_ENDED.search(question) or PLAYER_QUESTION.search(question):
+        return None
+    if any(e.get("kind") == "player" for e in entities or ()):
+        return None
+    hits = [name for name, pattern, _ in INTENTS if pattern.search(question)]
+    return hits[0] if len(hits) == 1 else None
+
+
+def answer(intent: str, match_stats: Dict[str, Any]) -> Optional[str]:
+    """Build the answer for an intent from a match_stats document; None if the fields are missing."""
+    for name, _, builder in INTENTS:
+        if name == intent:
+            return builder(match_stats or {})
+    return None
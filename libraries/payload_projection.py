@@ -0,0 +1,109 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from qdrant_client.http.models import PayloadSelectorExclude, PayloadSelectorInclude
+
+from config.settings import SEARCH_PAYLOAD_INCLUDE, SEARCH_PAYLOAD_EXCLUDE, SEARCH_SNIPPET_CHARS
+from libraries.sparse_encoder import BM25SparseEncoder
+
+TEXT_FIELD = "text"
+
+# sentences (or lines) of a summary; the trailing punctuation stays with its sentence
+_SENTENCE = re.compile(r"[^.!?\n]+[.!?]*")
+
+
+class PayloadProjection:
+    """
+    Which payload fields a question search returns, and how much of the summary text.
+
+    `include` / `exclude` are pushed down to Qdrant as a payload selector, so dropped fields
+    are never read or sent. With `snippet_chars` > 0 the `text` field (when returned) is cut
+    to a window of that many characters around the sentence that best matches the question.
+    """
+
+    def __init__(
+        self,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        snippet_chars: int = 0,
+    ):
+        self.include = list(dict.fromkeys(include)) if include else None
+        self.exclude = [f for f in dict.fromkeys(exclude or []) if not self.include or f in self.include]
+        if self.include and self.exclude:
+            self.include = [f for f in self.include if f not in self.exclude]
+            self.exclude = []
+        self.snippet_chars = max(0, snippet_chars or 0)
+
+    @classmethod
+    def from_request(
+        cls,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        snippet_chars: Optional[int] = None,
+    ) -> "PayloadProjection":
+        """Request overrides on top of the SEARCH_PAYLOAD_* / SEARCH_SNIPPET_CHARS defaults."""
+        return cls(
+            include=include if include is not None else SEARCH_PAYLOAD_INCLUDE,
+            exclude=exclude if exclude is not None else SEARCH_PAYLOAD_EXCLUDE,
+            snippet_chars=snippet_chars if snippet_chars is not None else SEARCH_SNIPPET_CHARS,
+        )
+
+    def wants(self, field: str) -> bool:
+        if self.include is not None:
+            return field in self.include
+        return field not in self.exclude
+
+    def selector(self, need_text: bool = False) -> Any:
+        """`with_payload` value for Qdrant; `need_text` keeps `text` for the caller (answer prompt)."""
+        if self.include is not None:
+            fields = self.include + ([TEXT_FIELD] if need_text and TEXT_FIELD not in self.include else [])
+            return PayloadSelectorInclude(include=fields)
+        exclude = [f for f in self.exclude if not (need_text and f == TEXT_FIELD)]
+        return PayloadSelectorExclude(exclude=exclude) if exclude else True
+
+    def apply(self, hits: List[Dict[str, Any]], question: str) -> List[Dict[str, Any]]:
+        """Hits as returned to the client; the input hits (and their payloads) are left untouched."""
+        keep_text = self.wants(TEXT_FIELD)
+        if keep_text and not self.snippet_chars:
+            return hits
+        terms = set(BM25SparseEncoder.tokenize(question))
+        out = []
+        for hit in hits:
+            payload = dict(hit.get("payload") or {})
+            text = payload.pop(TEXT_FIELD, None)
+            if keep_text and text is not None:
+                payload[TEXT_FIELD] = snippet(text, terms, self.snippet_chars)
+                if len(payload[TEXT_FIELD]) < len(text):
+                    payload["text_chars"] = len(text)  # full length, so the client knows it was cut
+            out.append({**hit, "payload": payload})
+        return out
+
+    def apply_results(self, results: Dict[str, List[Dict[str, Any]]], question: str) -> Dict[str, List[Dict[str, Any]]]:
+        return {collection: self.apply(hits, question) for collection, hits in results.items()}
+
+
+def snippet(text: str, terms: set, max_chars: int) -> str:
+    """
+    At most `max_chars` of `text` centred on the sentence sharing the most terms with the
+    question (the first sentence when none does), cut at word boundaries and marked with "…".
+    """
+    if len(text) <= max_chars:
+        return text
+    best_start, best_end, best_score = 0, 0, -1
+    lowered = text.lower()
+    for m in _SENTENCE.finditer(lowered):
+        sentence = m.group()
+        score = sum(1 for term in terms if term in sentence)  # substring: "bowl" also finds "bowlers"
+        if score > best_score:
+            best_start, best_end, best_score = m.start(), m.end(), score
+
+    slack = max(0, max_chars - (best_end - best_start))
+    start = max(0, min(best_start - slack // 2, len(text) - max_chars))
+    end = min(len(text), start + max_chars)
+    if start > 0:
+        space = text.find(" ", start, best_start + 1)
+        start = space + 1 if space != -1 else start
+    if end < len(text):
+        space = text.rfind(" ", start, end + 1)
+        end = space if space > start else end
+    return ("…" if start > 0 else "") + text[start:end].strip() + ("…" if end < len(text) else "")
@@ -0,0 +1,150 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PayloadSchemaType
+from qdrant_client.http.exceptions import UnexpectedResponse
+from config.settings import PAYLOAD_INDEX_SCHEMA
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Schema names used in config → client enum (newer types only exist on newer clients)
+SCHEMA_TYPES: Dict[str, Any] = {
+    name: getattr(PayloadSchemaType, name)
+    for name in ("KEYWORD", "INTEGER", "FLOAT", "TEXT", "BOOL", "DATETIME", "UUID")
+    if hasattr(PayloadSchemaType, name)
+}
+# Keyword index Qdrant groups storage by (QDRANT_TENANT_FIELD); needs qdrant-client >= 1.11
+try:
+    from qdrant_client.http.models import KeywordIndexParams, KeywordIndexType
+
+    SCHEMA_TYPES["KEYWORD_TENANT"] = KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+except Exception:
+    pass
+
+# Rough bytes per indexed value on top of the value itself (map entry + point-id posting)
+_INDEX_OVERHEAD_BYTES = {"KEYWORD": 24, "KEYWORD_TENANT": 24, "INTEGER": 24, "FLOAT": 24, "BOOL": 8, "DATETIME": 24, "UUID": 32, "TEXT": 16}
+
+
+def expected_schema(collection: str) -> Dict[str, str]:
+    """Configured field -> schema type for a collection (empty for unknown collections)."""
+    return dict(PAYLOAD_INDEX_SCHEMA.get(collection, {}))
+
+
+def create_payload_index(client: QdrantClient, collection: str, field: str, schema: Any) -> bool:
+    """
+    Create one payload index. `schema` is a config name ("KEYWORD", "TEXT", ...) or a
+    ready-made *IndexParams object. Returns False when the index could not be created.
+    """
+    field_schema = SCHEMA_TYPES.get(schema) if isinstance(schema, str) else schema
+    if field_schema is None:
+        raise ValueError(f"Unknown schema '{schema}'")
+    try:
+        client.create_payload_index(collection_name=collection, field_name=field, field_schema=field_schema)
+        logger.info(f"📚 Created payload index: {collection}.{field} ({schema if isinstance(schema, str) else type(schema).__name__})")
+        return True
+    except UnexpectedResponse as e:
+        if "already exists" in str(e).lower():
+            logger.info(f"✅ Index already exists: {collection}.{field}")
+            return True
+        logger.warning(f"⚠️ Skipped index creation for '{collection}.{field}' → {e}")
+    except Exception as e:
+        logger.warning(f"⚠️ Skipped index creation for '{collection}.{field}' → {e}")
+    return False
+
+
+def get_payload_schema(client: QdrantClient, collection: str) -> Dict[str, Dict[str, Any]]:
+    """Live payload indexes: field -> {"type": "KEYWORD", "points": N}."""
+    info = client.get_collection(collection)
+    out = {}
+    for field, index_info in (getattr(info, "payload_schema", None) or {}).items():
+        data_type = getattr(index_info, "data_type", None)
+        data_type = str(getattr(data_type, "value", data_type)).upper()
+        if data_type == "KEYWORD" and getattr(getattr(index_info, "params", None), "is_tenant", False):
+            data_type = "KEYWORD_TENANT"
+        out[field] = {"type": data_type, "points": getattr(index_info, "points", None) or 0}
+    return out
+
+
+def estimate_index_bytes(client: QdrantClient, collection: str, field: str, schema: str, points: int, sample: int = 256) -> int:
+    """
+    Estimated RAM of one payload index, from the average value size of a payload sample.
+    Qdrant does not report per-index memory, so this is an order-of-magnitude figure.
+    """
+    if not points:
+        return 0
+    try:
+        records, _ = client.scroll(
+            collection_name=collection,
+            limit=sample,
+            with_payload=[field],
+            with_vectors=False,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not sample '{collection}.{field}': {e}")
+        return 0
+
+    sizes = []
+    for record in records:
+        value = (record.payload or {}).get(field)
+        if value is None:
+            continue
+        if schema == "TEXT":
+            # one posting per token
+            sizes.append(len(str(value).split()) * (8 + _INDEX_OVERHEAD_BYTES["TEXT"]))
+        else:
+            sizes.append(len(json.dumps(value)) + _INDEX_OVERHEAD_BYTES.get(schema, 24))
+    if not sizes:
+        return 0
+    return int(points * sum(sizes) / len(sizes))
+
+
+def audit_collection(client: QdrantClient, collection: str, with_memory: bool = True) -> List[Dict[str, Any]]:
+    """
+    Compare a collection's payload_schema with PAYLOAD_INDEX_SCHEMA.
+    status: ok | missing | wrong_type | unexpected
+    """
+    expected = expected_schema(collection)
+    actual = get_payload_schema(client, collection)
+    rows = []
+    for field in sorted(set(expected) | set(actual)):
+        want: Optional[str] = expected.get(field)
+        have = actual.get(field, {})
+        have_type: Optional[str] = have.get("type")
+        if want and not have_type:
+            status = "missing"
+        elif have_type and not want:
+            status = "unexpected"
+        elif want != have_type:
+            status = "wrong_type"
+        else:
+            status = "ok"
+        points = have.get("points", 0)
+        rows.append({
+            "collection": collection,
+            "field": field,
+            "expected": want,
+            "actual": have_type,
+            "points": points,
+            "est_bytes": estimate_index_bytes(client, collection, field, have_type, points) if with_memory and have_type else 0,
+            "status": status,
+        })
+    return rows
+
+
+def fix_collection(client: QdrantClient, collection: str, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Drop unexpected/wrong indexes and (re)build missing/wrong ones from PAYLOAD_INDEX_SCHEMA."""
+    dropped = created = 0
+    for row in rows:
+        if row["status"] in {"unexpected", "wrong_type"}:
+            try:
+                client.delete_payload_index(collection_name=collection, field_name=row["field"])
+                dropped += 1
+                logger.info(f"🗑️ Dropped payload index: {collection}.{row['field']} ({row['actual']})")
+            except Exception as e:
+                logger.warning(f"⚠️ Could not drop '{collection}.{row['field']}' → {e}")
+                continue
+        if row["status"] in {"missing", "wrong_type"}:
+            created += int(create_payload_index(client, collection, row["field"], row["expected"]))
+    return {"dropped": dropped, "created": created}
@@ -1,14 +1,16 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from uuid import uuid5, NAMESPACE_DNS
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import (
     PointStruct,
     VectorParams,
     Distance,
-    PayloadSchemaType,
     Filter as QFilter,
     FieldCondition,
     MatchValue,
+    PointIdsList,
+    PointVectors,
+    HasIdCondition,
 )
 from qdrant_client.http.exceptions import UnexpectedResponse
 # from langchain_community.embeddings import HuggingFaceEmbeddings
@@ -19,20 +21,54 @@ from config.settings import (
     EMBEDDING_DIM,
     QDRANT_URL,
     QDRANT_API_KEY,
-    COLLECTION_INDEX_FIELDS,
-    ID_INDEX_TYPE,  # <-- add this in your config (see below)
+    ID_INDEX_TYPE,
+    HYBRID_SEARCH_ENABLED,
+    SPARSE_VECTOR_NAME,
+    NAMED_VECTORS,
 )
+from libraries.circuit_breaker import BreakerProxy, get_breaker
+from libraries.embeddings import get_embedder as shared_embedder
+from libraries.sparse_encoder import BM25SparseEncoder
+from libraries.payload_schema import expected_schema, create_payload_index
+from libraries.collection_layout import (
+    STAMP_FIELD,
+    create_named_collection,
+    ensure_shard_key,
+    is_custom_sharded,
+    partition_config,
+    shard_key,
+    target_of,
+    vector_stamp,
+)
+from models.match_types import PAYLOAD_FIELDS, MatchBase
 from utils.logger import get_logger
 
-# Fallback types for older qdrant-client versions
+# Sparse vectors need qdrant-client >= 1.10 (IDF modifier); older clients stay dense-only
+try:
+    from qdrant_client.http.models import SparseVector, SparseVectorParams, Modifier
+except Exception:
+    SparseVector = SparseVectorParams = Modifier = None
+
+# Filtering on vector presence needs qdrant-client >= 1.13; older clients leave vectorless named-layout points
 try:
-    from qdrant_client.http.models import KeywordIndexParams, IntegerIndexParams, TextIndexParams
+    from qdrant_client.http.models import HasVectorCondition
 except Exception:
-    KeywordIndexParams = IntegerIndexParams = TextIndexParams = None
+    HasVectorCondition = None
 
 logger = get_logger(__name__)
 
 
+def is_qdrant_failure(exc: BaseException) -> bool:
+    """Only outages count against the breaker: 4xx answers and client-side misuse do not."""
+    if isinstance(exc, UnexpectedResponse):
+        return exc.status_code is None or exc.status_code >= 500
+    return not isinstance(exc, (TypeError, ValueError))
+
+
+def qdrant_breaker():
+    return get_breaker("qdrant", is_failure=is_qdrant_failure)
+
+
 class QdrantMatchPusher:
     def __init__(
         self,
@@ -41,30 +77,42 @@ class QdrantMatchPusher:
         qdrant: Optional[QdrantClient] = None,
     ):
         self.collection_name = collection_name
+        self.target = target_of(collection_name)  # physical collection (+ named vector) of the configured layout
         self.embedder = embedder or self.get_embedder()
         self.qdrant = qdrant or self.get_qdrant_client()
         self.vector_dim = EMBEDDING_DIM  # default; will verify/create
+        self.sparse_enabled = False  # set by _ensure_collection when the collection has a sparse vector
+        self.sharded = False  # set by _ensure_collection when the collection uses custom (league) sharding
+        self._shard_keys: set = set()  # shard keys known to exist
+        self.sparse_encoder = BM25SparseEncoder()
         self._ensure_collection()
 
     @staticmethod
     def get_embedder(model_name: str = EMBEDDING_MODEL) -> HuggingFaceEmbeddings:
-        """Initialize HuggingFace embeddings."""
-        return HuggingFaceEmbeddings(model_name=model_name)
+        """Process-wide HuggingFace embeddings (shared with the searcher)."""
+        return shared_embedder(model_name)
 
     @staticmethod
     def get_qdrant_client() -> QdrantClient:
-        """Initialize Qdrant client."""
-        return QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+        """Initialize Qdrant client; every call goes through the shared "qdrant" breaker."""
+        return BreakerProxy(QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY), qdrant_breaker())
 
     @staticmethod
     def generate_unique_id_from_match_id(match_id: str) -> str:
         """Generate deterministic UUID based on match_id."""
         return str(uuid5(NAMESPACE_DNS, str(match_id)))
 
+    @classmethod
+    def point_id(cls, match_id: str, section: Optional[str] = None) -> str:
+        """Whole-summary point id, or the id of one summary section's point."""
+        if section is None:
+            return cls.generate_unique_id_from_match_id(match_id)
+        return str(uuid5(NAMESPACE_DNS, f"{match_id}#{section}"))
+
     def document_exists(self, vector_id: str) -> bool:
         """Check if a document/vector already exists in Qdrant."""
         try:
-            result = self.qdrant.retrieve(collection_name=self.collection_name, ids=[vector_id])
+            result = self.qdrant.retrieve(collection_name=self.target.collection, ids=[vector_id])
             return bool(result)
         except UnexpectedResponse as e:
             if getattr(e, "status_code", None) == 404:
@@ -75,84 +123,13 @@ class QdrantMatchPusher:
             logger.warning(f"⚠️ Existence check failed for ID {vector_id}: {e}")
             return False
 
-    # ---------- index helpers ----------
-    @staticmethod
-    def _infer_schema_for_field(field: str) -> str:
-        """
-        Decide which payload index schema to use.
-        Returns one of: "KEYWORD", "TEXT", "INTEGER".
-        Uses config.ID_INDEX_TYPE for IDs.
-        """
-        f = field.lower()
-
-        # IDs & short categorical codes
-        if f == "match_id" or f.endswith("_id") or f in {"venue_id", "player_id"}:
-            return ID_INDEX_TYPE  # "INTEGER" or "KEYWORD" (see config)
-        if f in {"home_team", "away_team", "match_format", "position"}:
-            # short codes; keep as KEYWORD
-            return "KEYWORD"
-
-        # Human-readable names / free text
-        if f.endswith("_name") or f in {"ground_name", "full_name", "league_name"}:
-            return "TEXT"
-
-        # Default safe choice
-        return "TEXT"
-
-    def _create_payload_index(self, field: str, schema: str):
-        """
-        Create payload index handling both modern (PayloadSchemaType) and older
-        (*IndexParams) client signatures.
-        schema ∈ {"KEYWORD","TEXT","INTEGER"}
-        """
-        try:
-            if KeywordIndexParams and TextIndexParams:
-                if schema == "KEYWORD":
-                    idx = KeywordIndexParams()
-                elif schema == "TEXT":
-                    idx = TextIndexParams()
-                elif schema == "INTEGER":
-                    idx = IntegerIndexParams()
-                else:
-                    raise ValueError(f"Unknown schema '{schema}'")
-
-                self.qdrant.create_payload_index(
-                    collection_name=self.collection_name,
-                    field_name=field,
-                    field_schema=idx,
-                )
-            else:
-                if schema == "KEYWORD":
-                    enum_schema = PayloadSchemaType.KEYWORD
-                elif schema == "TEXT":
-                    enum_schema = PayloadSchemaType.TEXT
-                elif schema == "INTEGER":
-                    enum_schema = PayloadSchemaType.INTEGER
-                else:
-                    raise ValueError(f"Unknown schema '{schema}'")
-
-                self.qdrant.create_payload_index(
-                    collection_name=self.collection_name,
-                    field_name=field,
-                    field_schema=enum_schema,
-                )
-            logger.info(f"📚 Created payload index: {self.collection_name}.{field} ({schema})")
-        except UnexpectedResponse as e:
-            msg = str(e).lower()
-            if "already exists" in msg:
-                logger.info(f"✅ Index already exists: {self.collection_name}.{field}")
-            else:
-                logger.warning(f"⚠️ Skipped index creation for '{field}' → {e}")
-        except Exception as e:
-            logger.warning(f"⚠️ Skipped index creation for '{field}' → {e}")
-
     # ---------- collection + index bootstrap ----------
     def _ensure_collection(self):
         """Create collection if it doesn't exist and setup payload schema."""
         existing_fields = set()
         try:
-            collection_info = self.qdrant.get_collection(self.collection_name)
-            logger.info(f"Collection '{self.collection_name}' already exists.")
+            collection_info = self.qdrant.get_collection(self.target.collection)
+            logger.info(f"Collection '{self.target.collection}' already exists.")
             # Try to detect vector dim if server exposes it
             try:
                 vcfg = getattr(collection_info, "vectors_count", None)  # not always present
@@ -164,28 +141,44 @@ class QdrantMatchPusher:
                     existing_fields = set(collection_info.payload_schema.keys())
             except Exception:
                 existing_fields = set()
+            try:
+                sparse_cfg = getattr(collection_info.config.params, "sparse_vectors", None) or {}
+                self.sparse_enabled = HYBRID_SEARCH_ENABLED and self.target.sparse in sparse_cfg
+            except Exception:
+                self.sparse_enabled = False
+            self.sharded = is_custom_sharded(collection_info)
         except UnexpectedResponse as e:
-            if getattr(e, "status_code", None) == 404:
-                # Create missing collection with configured vector dim
+            if getattr(e, "status_code", None) == 404 and self.target.vector:
+                self.sparse_enabled = create_named_collection(self.qdrant, self.target.collection)
+                self.sharded = "sharding_method" in partition_config()
+                logger.info(f"🆕 Created Qdrant collection: {self.target.collection} (named vectors, sparse={self.sparse_enabled})")
+            elif getattr(e, "status_code", None) == 404:
+                # Create missing collection with configured vector dim (+ BM25 sparse vector for hybrid search)
+                sparse_cfg = None
+                if HYBRID_SEARCH_ENABLED and SparseVectorParams is not None:
+                    sparse_cfg = {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
                 self.qdrant.create_collection(
-                    collection_name=self.collection_name,
+                    collection_name=self.target.collection,
                     vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE),
+                    sparse_vectors_config=sparse_cfg,
+                    **partition_config(),
+                )
+                self.sparse_enabled = sparse_cfg is not None
+                self.sharded = "sharding_method" in partition_config()
+                logger.info(
+                    f"🆕 Created Qdrant collection: {self.target.collection} "
+                    f"(dim={EMBEDDING_DIM}, sparse={self.sparse_enabled}, sharded={self.sharded})"
                 )
-                logger.info(f"🆕 Created Qdrant collection: {self.collection_name} (dim={EMBEDDING_DIM})")
             else:
                 logger.warning(f"⚠️ Could not fetch existing collection info: {e}")
         except Exception as e:
             logger.warning(f"⚠️ Could not fetch existing collection info: {e}")
 
-        # Build index set: configured fields + 'text'
-        fields_cfg = COLLECTION_INDEX_FIELDS.get(self.collection_name, [])
-        fields = set(fields_cfg) | {"text"}  # always index 'text'
-
-        for field in fields:
+        # Create missing payload indexes from PAYLOAD_INDEX_SCHEMA (scripts/audit_payload_indexes.py fixes wrong types)
+        for field, schema in expected_schema(self.target.collection).items():
             if field in existing_fields:
                 continue
-            schema = self._infer_schema_for_field(field)
-            self._create_payload_index(field, schema)
+            create_payload_index(self.qdrant, self.target.collection, field, schema)
 
     # ---------- fast search helpers ----------
     def _make_match_id_filter(self, match_id: Any) -> QFilter:
@@ -206,13 +199,14 @@ class QdrantMatchPusher:
         # 1) Try filter-only scroll (recommended for equality lookups)
         try:
             hits, _ = self.qdrant.scroll(
-                collection_name=self.collection_name,
+                collection_name=self.target.collection,
                 scroll_filter=qfilter,
                 limit=limit,
                 with_payload=True,
                 with_vectors=False,
             )
-            return [{"id": h.id, "payload": h.payload} for h in hits]
+            return [{"id": h.id, "payload": self.target.flatten(h.payload)} for h in hits
+                    if not self.target.vector or self.target.vector in (h.payload or {})]
         except Exception as e:
             logger.warning(f"Scroll failed, falling back to search: {e}")
 
@@ -220,45 +214,143 @@ class QdrantMatchPusher:
         try:
             zero_vec = [0.0] * EMBEDDING_DIM
             results = self.qdrant.search(
-                collection_name=self.collection_name,
-                query_vector=zero_vec,
+                collection_name=self.target.collection,
+                query_vector=(self.target.vector, zero_vec) if self.target.vector else zero_vec,
                 limit=limit,
                 filter=qfilter,          # newer clients
                 with_payload=True,
                 with_vectors=False,
             )
-            return [{"id": r.id, "payload": r.payload, "score": r.score} for r in results]
+            return [{"id": r.id, "payload": self.target.flatten(r.payload), "score": r.score} for r in results]
         except TypeError as te:
             # Older clients: query_filter=
             if "unexpected keyword argument 'filter'" in str(te):
                 results = self.qdrant.search(
-                    collection_name=self.collection_name,
-                    query_vector=zero_vec,
+                    collection_name=self.target.collection,
+                    query_vector=(self.target.vector, zero_vec) if self.target.vector else zero_vec,
                     limit=limit,
                     query_filter=qfilter,  # older param name
                     with_payload=True,
                     with_vectors=False,
                 )
-                return [{"id": r.id, "payload": r.payload, "score": r.score} for r in results]
+                return [{"id": r.id, "payload": self.target.flatten(r.payload), "score": r.score} for r in results]
             raise
         except Exception as e:
             logger.error(f"❌ fetch_by_match_id failed: {e}")
             return []
 
     # ---------- upsert ----------
-    def push_matches(self, match_docs: List[Document]):
-        """Push each match document individually to Qdrant."""
+    @staticmethod
+    def build_document(record: Union[MatchBase, Dict[str, Any], None], summary_field: str) -> Optional[Document]:
+        """Document for a match_details/match_stats record (typed or raw), or None if it has no summary yet."""
+        if isinstance(record, MatchBase):
+            summary = getattr(record, summary_field, None)
+            return Document(page_content=summary, metadata=record.to_payload()) if summary else None
+        if not record or not record.get(summary_field):
+            return None
+        metadata = {field: record.get(field) for field in PAYLOAD_FIELDS}
+        return Document(page_content=record[summary_field], metadata=metadata)
+
+    @staticmethod
+    def build_section_documents(record: MatchBase, sections_field: str, names: Optional[List[str]] = None) -> List[Document]:
+        """One Document per summary section (all, or only `names`), tagged with its section name and fingerprint."""
+        sections = getattr(record, sections_field, None) or {}
+        payload = record.to_payload()
+        return [
+            Document(page_content=section.text, metadata={**payload, "section": name, "fingerprint": section.fingerprint})
+            for name, section in sections.items()
+            if section.text and (names is None or name in names)
+        ]
+
+    def build_point(self, doc: Document, vector: List[float]) -> PointStruct:
+        """Point with the deterministic match/section id, dense (+ sparse) vectors and the metadata payload."""
+        return PointStruct(
+            id=self.point_id(doc.metadata.get("match_id"), doc.metadata.get("section")),
+            vector=self._point_vector(vector, doc.page_content),
+            # the stamp lets the local vector mirror tell which points were re-embedded since its last sync
+            payload=self.target.nest({**doc.metadata, "text": doc.page_content, STAMP_FIELD: vector_stamp(doc.page_content)}),
+        )
+
+    def _point_vector(self, dense: List[float], text: str) -> Any:
+        """Dense vector alone, or dense + BM25 sparse when the collection supports hybrid search."""
+        if not self.sparse_enabled:
+            return self.target.point_vector(dense)
+        indices, values = self.sparse_encoder.encode_document(text)
+        return self.target.point_vector(dense, SparseVector(indices=indices, values=values))
+
+    def _upsert(self, point: PointStruct) -> None:
+        """
+        Upsert one point. In the named layout the point is shared with the other source, so only
+        this source's slice is written (update_vectors + set_payload, each atomic on the server);
+        the point is created by a plain upsert the first time either source writes it.
+        """
+        shard = self._shard_selector(point.payload)
+        if self.target.vector:
+            try:
+                self.qdrant.update_vectors(collection_name=self.target.collection,
+                                           points=[PointVectors(id=point.id, vector=point.vector)], **shard)
+                # set_payload merges top-level keys: the shared fields and this source's object
+                self.qdrant.set_payload(collection_name=self.target.collection, payload=point.payload,
+                                        points=[point.id], **shard)
+                return
+            except (UnexpectedResponse, KeyError) as e:
+                # point not there yet (KeyError: local client); a missing collection is a 404 too,
+                # and the upsert below raises it again for push_matches to recreate the collection
+                if isinstance(e, UnexpectedResponse) and getattr(e, "status_code", None) != 404:
+                    raise
+        self.qdrant.upsert(collection_name=self.target.collection, points=[point], **shard)
+
+    def _shard_selector(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """upsert arguments routing a point to its league's shard key (created on first use)."""
+        if not self.sharded:
+            return {}
+        key = shard_key(payload)
+        if key not in self._shard_keys:
+            ensure_shard_key(self.qdrant, self.target.collection, key)
+            self._shard_keys.add(key)
+        return {"shard_key_selector": key}
+
+    def delete_points(self, point_ids: List[str]) -> None:
+        """Delete points; in the named layout only this source's vectors and payload object go, the point stays while the other source has it."""
+        try:
+            if not self.target.vector:
+                self.qdrant.delete(collection_name=self.target.collection, points_selector=PointIdsList(points=point_ids))
+                return
+            own = [self.target.vector]
+            if self.sparse_enabled:
+                own.append(self.target.sparse)
+            self.qdrant.delete_vectors(collection_name=self.target.collection, vectors=own, points=point_ids)
+            self.qdrant.delete_payload(collection_name=self.target.collection, keys=[self.target.vector], points=point_ids)
+            if HasVectorCondition is not None:
+                # points neither source has any more (server-side, so a concurrent push is not lost)
+                self.qdrant.delete(collection_name=self.target.collection, points_selector=QFilter(
+                    must=[HasIdCondition(has_id=point_ids)],
+                    must_not=[HasVectorCondition(has_vector=name) for name in NAMED_VECTORS.values()],
+                ))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not delete {len(point_ids)} points from '{self.collection_name}': {e}")
+
+    def push_matches(self, match_docs: List[Document]) -> List[Document]:
+        """Push each match document individually to Qdrant; returns the documents that were upserted."""
+        pushed: List[Document] = []
         if not match_docs:
             logger.warning(f"No documents to embed for collection: {self.collection_name}")
-            return
+            return pushed
+
+        # one embed_documents call: batched forward passes instead of one per document
+        try:
+            vectors = self.embedder.embed_documents([doc.page_content for doc in match_docs])
+        except Exception as e:
+            logger.warning(f"⚠️ Batch embedding failed, embedding documents one by one: {e}")
+            vectors = [None] * len(match_docs)
 
-        for doc in match_docs:
+        for doc, vector in zip(match_docs, vectors):
             match_id = doc.metadata.get("match_id")
             if match_id is None:
                 logger.warning(f"⚠️ Skipped document without match_id: {doc.page_content[:50]}")
                 continue
 
-            vector_id = self.generate_unique_id_from_match_id(match_id)
+            vector_id = self.point_id(match_id, doc.metadata.get("section"))
 
             if not self.document_exists(vector_id):
                 logger.info(f"🆕 Adding new match → ID: {vector_id}")
@@ -266,7 +358,7 @@ class QdrantMatchPusher:
                 logger.info(f"♻️ Updating existing match → ID: {vector_id}")
 
             try:
-                vector = self.embedder.embed_query(doc.page_content)
+                vector = vector or self.embedder.embed_query(doc.page_content)
             except Exception as e:
                 logger.error(f"❌ Embedding failed for match ID {match_id} → {e}")
                 continue
@@ -275,14 +367,11 @@ class QdrantMatchPusher:
                 logger.warning(f"⚠️ Skipped invalid vector for match ID {match_id}")
                 continue
 
-            point = PointStruct(
-                id=vector_id,
-                vector=vector,
-                payload={**doc.metadata, "text": doc.page_content},
-            )
+            point = self.build_point(doc, vector)
 
             try:
-                self.qdrant.upsert(collection_name=self.collection_name, points=[point])
+                self._upsert(point)
+                pushed.append(doc)
                 logger.info(f"✅ Upserted match ID {match_id} to '{self.collection_name}'")
             except UnexpectedResponse as e:
                 if getattr(e, "status_code", None) == 404:
@@ -290,9 +379,12 @@ class QdrantMatchPusher:
                         f"⚠️ Collection '{self.collection_name}' not found during upsert. Recreating collection."
                     )
                     self._ensure_collection()
-                    self.qdrant.upsert(collection_name=self.collection_name, points=[point])
+                    self._upsert(point)
+                    pushed.append(doc)
                     logger.info(f"✅ Upserted match ID {match_id} after recreating collection.")
                 else:
                     logger.error(f"❌ Qdrant upsert failed for match ID {match_id}: {e}")
             except Exception as e:
                 logger.error(f"❌ Qdrant upsert failed for match ID {match_id}: {e}")
+
+        return pushed
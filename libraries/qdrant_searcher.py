@@ -1,16 +1,38 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Filter as QFilter
+from qdrant_client.http.models import Filter as QFilter, NamedVector, SearchRequest
 from qdrant_client.http.exceptions import UnexpectedResponse
 from langchain_huggingface import HuggingFaceEmbeddings  # non-deprecated
+from libraries.circuit_breaker import BreakerProxy, CircuitOpenError
+from libraries.collection_layout import STAMP_FIELD, CollectionTarget, fused_selector, target_of
+from libraries.qdrant_client import qdrant_breaker
+from libraries.embeddings import get_embedder
+from libraries.sparse_encoder import BM25SparseEncoder
+
+# Query API (prefetch + fusion) needs qdrant-client >= 1.10; older clients stay dense-only
+try:
+    from qdrant_client.http.models import Prefetch, FusionQuery, Fusion, SparseVector, QueryRequest
+except Exception:
+    Prefetch = FusionQuery = Fusion = SparseVector = QueryRequest = None
 
 logger = logging.getLogger(__name__)
 
 
+def is_unsupported_query(exc: BaseException) -> bool:
+    """
+    Whether a failed hybrid query was rejected for good (unknown sparse vector, query API
+    missing on an older server or client) rather than hit a timeout, reset or 5xx that the
+    next request may not see.
+    """
+    if isinstance(exc, UnexpectedResponse):
+        return exc.status_code is not None and 400 <= exc.status_code < 500 and exc.status_code != 429
+    return isinstance(exc, (AttributeError, TypeError, ValueError))
+
+
 class QdrantForbiddenError(Exception):
     """Raised when Qdrant returns 403 Forbidden (bad URL/key/permissions/IP)."""
     pass
@@ -25,14 +47,36 @@ class QdrantMultiCollectionSearcher:
         qdrant_api_key: Optional[str] = None,
         timeout: Optional[float] = 15.0,
         run_self_test: bool = True,
+        hybrid: bool = False,
+        sparse_vector_name: str = "text_bm25",
+        prefetch_limit: int = 20,
+        qdrant: Optional[QdrantClient] = None,
+        embedder: Optional[HuggingFaceEmbeddings] = None,
+        targets: Optional[Dict[str, CollectionTarget]] = None,
     ):
         """
         :param qdrant_url: MUST be your cluster API endpoint (use https://).
         :param qdrant_api_key: Required for Qdrant Cloud/private deployments.
+        :param hybrid: Query dense + BM25 sparse vectors in one request and fuse them with RRF.
+                       Collections without the sparse vector fall back to dense-only search.
+        :param qdrant / embedder: Pre-built client and embedding model (e.g. a local in-memory
+                       Qdrant for scripts/load_test_questions.py); built from the URL/model otherwise.
+        :param targets: Where each collection's points live (libraries/collection_layout.py);
+                       the configured QDRANT_LAYOUT by default. Results are keyed by `collections`
+                       and carry flat payloads in either layout.
         """
         self.collections = collections
-        self.qdrant = QdrantClient(url=qdrant_url, api_key=qdrant_api_key, timeout=timeout)
-        self.embedder = HuggingFaceEmbeddings(model_name=embedder_model)
+        self.targets = {c: target_of(c, targets) for c in collections}
+        self._fusion_failed = False  # named layout: the server rejected the single fused query, search per source
+        # shares the "qdrant" breaker with the pusher: while it is open searches fail fast
+        self.qdrant = BreakerProxy(qdrant or QdrantClient(url=qdrant_url, api_key=qdrant_api_key, timeout=timeout), qdrant_breaker())
+        self.embedder = embedder or get_embedder(embedder_model)
+        self.hybrid = hybrid and Prefetch is not None
+        self.sparse_vector_name = sparse_vector_name
+        self.prefetch_limit = prefetch_limit
+        self.sparse_encoder = BM25SparseEncoder()
+        self._dense_only: set = set()  # collections that rejected the hybrid query
+        self.alias_targets: Dict[str, str] = {}  # alias -> versioned collection (blue/green reindex)
 
         if run_self_test:
             self._self_test()
@@ -43,6 +87,7 @@ class QdrantMultiCollectionSearcher:
             resp = self.qdrant.get_collections()
             names = [c.name for c in resp.collections]
             logger.info(f"Qdrant reachable. Collections: {names}")
+            self.resolve_aliases()
         except UnexpectedResponse as e:
             # Qdrant returns UnexpectedResponse with details
             if getattr(e, "status_code", None) == 403 or "403" in str(e):
@@ -55,6 +100,21 @@ class QdrantMultiCollectionSearcher:
             logger.error(f"Qdrant self-test error: {e}")
             raise
 
+    def resolve_aliases(self) -> Dict[str, str]:
+        """
+        Record which versioned collection each configured name currently points to.
+        Searches always go through the alias, so a reindex switch needs no restart.
+        """
+        try:
+            aliases = {a.alias_name: a.collection_name for a in self.qdrant.get_aliases().aliases}
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read Qdrant aliases: {e}")
+            return self.alias_targets
+        self.alias_targets = {name: aliases[name] for name in self.collections if name in aliases}
+        if self.alias_targets:
+            logger.info(f"Qdrant aliases: {self.alias_targets}")
+        return self.alias_targets
+
     def _embed_query(self, query: str) -> List[float]:
         return self.embedder.embed_query(query)
 
@@ -64,6 +124,7 @@ class QdrantMultiCollectionSearcher:
         vector: List[float],
         top_k: int = 5,
         qfilter: Optional[QFilter] = None,
+        with_payload: Any = True,
     ) -> List[Dict[str, Any]]:
         """
         Version-agnostic call:
@@ -71,14 +132,17 @@ class QdrantMultiCollectionSearcher:
         - Falls back to older `query_filter=` param.
         Raises QdrantForbiddenError on 403 so the caller can return a clear message.
         """
+        target = self.targets.get(collection_name) or target_of(collection_name)
+        query_vector = NamedVector(name=target.vector, vector=vector) if target.vector else vector
+        with_payload = target.selector(with_payload)
         try:
             # Newer client signature
             results = self.qdrant.search(
-                collection_name=collection_name,
-                query_vector=vector,
+                collection_name=target.collection,
+                query_vector=query_vector,
                 limit=top_k,
                 filter=qfilter,            # newer param name
-                with_payload=True,
+                with_payload=with_payload,
                 with_vectors=False,
             )
         except TypeError as te:
@@ -86,11 +150,11 @@ class QdrantMultiCollectionSearcher:
             if "unexpected keyword argument 'filter'" in str(te):
                 try:
                     results = self.qdrant.search(
-                        collection_name=collection_name,
-                        query_vector=vector,
+                        collection_name=target.collection,
+                        query_vector=query_vector,
                         limit=top_k,
                         query_filter=qfilter,  # older param name
-                        with_payload=True,
+                        with_payload=with_payload,
                         with_vectors=False,
                     )
                 except UnexpectedResponse as e2:
@@ -101,6 +165,8 @@ class QdrantMultiCollectionSearcher:
                         raise QdrantForbiddenError("Forbidden (403) while searching Qdrant.") from e2
                     logger.warning(f"⚠️ Search failed for '{collection_name}' (fallback): {e2}")
                     return []
+                except CircuitOpenError:
+                    raise
                 except Exception as e2:
                     logger.warning(f"⚠️ Search failed for '{collection_name}' (fallback): {e2}")
                     return []
@@ -115,27 +181,298 @@ class QdrantMultiCollectionSearcher:
                 raise QdrantForbiddenError("Forbidden (403) while searching Qdrant.") from e
             logger.warning(f"⚠️ Search failed for '{collection_name}': {e}")
             return []
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.warning(f"⚠️ Search failed for '{collection_name}': {e}")
             return []
 
-        return [{"id": r.id, "payload": r.payload, "score": r.score} for r in results]
+        return [{"id": r.id, "payload": target.flatten(r.payload), "score": r.score} for r in results]
+
+    def _hybrid_search_collection(
+        self,
+        collection_name: str,
+        vector: List[float],
+        sparse: Any,
+        top_k: int = 5,
+        qfilter: Optional[QFilter] = None,
+        with_payload: Any = True,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Dense + sparse prefetch fused with reciprocal rank fusion, in a single request.
+        Returns None when the collection cannot serve hybrid queries so the caller can
+        fall back to dense search; raises QdrantForbiddenError on 403.
+        """
+        limit = max(self.prefetch_limit, top_k)
+        target = self.targets.get(collection_name) or target_of(collection_name)
+        try:
+            response = self.qdrant.query_points(
+                collection_name=target.collection,
+                prefetch=[
+                    Prefetch(query=vector, using=target.vector, limit=limit, filter=qfilter),
+                    Prefetch(query=sparse, using=self._sparse_name(target), limit=limit, filter=qfilter),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=top_k,
+                with_payload=target.selector(with_payload),
+                with_vectors=False,
+            )
+        except UnexpectedResponse as e:
+            if getattr(e, "status_code", None) == 403 or "403" in str(e):
+                raise QdrantForbiddenError("Forbidden (403) while searching Qdrant.") from e
+            return self._hybrid_failed(collection_name, e, "Hybrid search")
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            return self._hybrid_failed(collection_name, e, "Hybrid search")
+
+        return [{"id": r.id, "payload": target.flatten(r.payload), "score": r.score} for r in response.points]
+
+    def _hybrid_failed(self, collection_name: str, exc: BaseException, label: str) -> None:
+        """Dense search for this call; only a definitive rejection turns hybrid off for the collection."""
+        if is_unsupported_query(exc):
+            logger.warning(f"⚠️ {label} unavailable for '{collection_name}', using dense only: {exc}")
+            self._dense_only.add(collection_name)
+        else:
+            logger.warning(f"⚠️ {label} failed for '{collection_name}', dense search for this request: {exc}")
+        return None
+
+    def _sparse_name(self, target: CollectionTarget) -> str:
+        # split layout: the configured name; named layout: one sparse vector per source
+        return target.sparse if target.vector else self.sparse_vector_name
+
+    def _sparse_query(self, question: str) -> Any:
+        indices, values = self.sparse_encoder.encode_query(question)
+        return SparseVector(indices=indices, values=values) if indices else None
+
+    def _search_batch(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        qfilters: List[Optional[QFilter]],
+        top_k: int = 5,
+        with_payload: Any = True,
+    ) -> List[List[Dict[str, Any]]]:
+        """One search_batch round trip for many dense queries; raises QdrantForbiddenError on 403."""
+        target = self.targets.get(collection_name) or target_of(collection_name)
+        requests = [
+            SearchRequest(vector=NamedVector(name=target.vector, vector=v) if target.vector else v, filter=f,
+                          limit=top_k, with_payload=target.selector(with_payload), with_vector=False)
+            for v, f in zip(vectors, qfilters)
+        ]
+        try:
+            responses = self.qdrant.search_batch(collection_name=target.collection, requests=requests)
+        except UnexpectedResponse as e:
+            if getattr(e, "status_code", None) == 403 or "403" in str(e):
+                raise QdrantForbiddenError("Forbidden (403) while searching Qdrant.") from e
+            logger.warning(f"⚠️ Batch search failed for '{collection_name}': {e}")
+            return [[] for _ in requests]
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Batch search failed for '{collection_name}': {e}")
+            return [[] for _ in requests]
+
+        return [[{"id": r.id, "payload": target.flatten(r.payload), "score": r.score} for r in hits] for hits in responses]
+
+    def _hybrid_search_batch(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        sparses: List[Any],
+        qfilters: List[Optional[QFilter]],
+        top_k: int = 5,
+        with_payload: Any = True,
+    ) -> Optional[List[List[Dict[str, Any]]]]:
+        """One query_batch_points round trip for many hybrid queries; None means fall back to dense."""
+        limit = max(self.prefetch_limit, top_k)
+        target = self.targets.get(collection_name) or target_of(collection_name)
+        requests = []
+        for vector, sparse, qfilter in zip(vectors, sparses, qfilters):
+            prefetch = [Prefetch(query=vector, using=target.vector, limit=limit, filter=qfilter)]
+            if sparse is not None:
+                prefetch.append(Prefetch(query=sparse, using=self._sparse_name(target), limit=limit, filter=qfilter))
+            requests.append(QueryRequest(
+                prefetch=prefetch,
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=top_k,
+                with_payload=target.selector(with_payload),
+                with_vector=False,
+            ))
+        try:
+            responses = self.qdrant.query_batch_points(collection_name=target.collection, requests=requests)
+        except UnexpectedResponse as e:
+            if getattr(e, "status_code", None) == 403 or "403" in str(e):
+                raise QdrantForbiddenError("Forbidden (403) while searching Qdrant.") from e
+            return self._hybrid_failed(collection_name, e, "Hybrid batch search")
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            return self._hybrid_failed(collection_name, e, "Hybrid batch search")
+
+        return [[{"id": r.id, "payload": target.flatten(r.payload), "score": r.score} for r in resp.points] for resp in responses]
+
+    def search_questions_batch(
+        self,
+        queries: List[Tuple[str, Optional[Dict[str, QFilter]]]],
+        top_k: int = 5,
+        with_payload: Any = True,
+    ) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Search many (question, per-collection filters) pairs: distinct questions are embedded
+        in one batched model call and each collection is hit with one batch request.
+        `with_payload` is passed to Qdrant as is (True, or a PayloadProjection selector).
+        """
+        if not queries:
+            return []
+        distinct = list(dict.fromkeys(q for q, _ in queries))
+        embedded = dict(zip(distinct, self.embedder.embed_documents(distinct)))
+        vectors = [embedded[q] for q, _ in queries]
+        sparses = None
+        if self.hybrid:
+            sparse_by_q = {q: self._sparse_query(q) for q in distinct}
+            sparses = [sparse_by_q[q] for q, _ in queries]
+
+        out: List[Dict[str, List[Dict[str, Any]]]] = [{} for _ in queries]
+        for collection in self.collections:
+            qfilters = [f.get(collection) if f else None for _, f in queries]
+            hits = None
+            if sparses is not None and collection not in self._dense_only:
+                hits = self._hybrid_search_batch(collection, vectors, sparses, qfilters, top_k=top_k, with_payload=with_payload)
+            if hits is None:
+                hits = self._search_batch(collection, vectors, qfilters, top_k=top_k, with_payload=with_payload)
+            for i, collection_hits in enumerate(hits):
+                out[i][collection] = collection_hits
+        return out
 
     def search_question(
         self,
         question: str,
         top_k: int = 5,
         filters: Optional[Dict[str, QFilter]] = None,
+        with_payload: Any = True,
     ) -> Dict[str, List[Dict[str, Any]]]:
-        vector = self._embed_query(question)
-        out: Dict[str, List[Dict[str, Any]]] = {}
+        vector, sparse = self.embed_question(question)
+        return self.search_embedded(vector, sparse, top_k=top_k, filters=filters, with_payload=with_payload)
 
+    def search_embedded(
+        self,
+        vector: List[float],
+        sparse: Any = None,
+        top_k: int = 5,
+        filters: Optional[Dict[str, QFilter]] = None,
+        with_payload: Any = True,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """search_question for a question already embedded with embed_question."""
+        if self._fusable():
+            fused = self._fused_search(vector, sparse, top_k, filters, with_payload)
+            if fused is not None:
+                return fused
+        out: Dict[str, List[Dict[str, Any]]] = {}
         for collection in self.collections:
             qf = filters.get(collection) if filters else None
-            out[collection] = self._search_collection(
-                collection_name=collection,
+            out[collection] = self.search_collection(collection, vector, sparse=sparse, top_k=top_k, qfilter=qf, with_payload=with_payload)
+        return out
+
+    def _fusable(self) -> bool:
+        """Named layout: all collections are sources of one physical collection, so one query can search them all."""
+        targets = list(self.targets.values())
+        return (
+            len(targets) > 1 and Prefetch is not None and not self._fusion_failed
+            and all(t.vector for t in targets) and len({t.collection for t in targets}) == 1
+        )
+
+    def _fused_search(
+        self,
+        vector: List[float],
+        sparse: Any,
+        top_k: int,
+        filters: Optional[Dict[str, QFilter]],
+        with_payload: Any,
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Every source's dense (and sparse) vector as a prefetch of one query, fused with RRF, and
+        the fused hits handed back to each source the point has (up to `top_k` each). One
+        request per question instead of one per collection; None means search per source.
+        """
+        limit = max(self.prefetch_limit, top_k)
+        prefetch = []
+        for collection, target in self.targets.items():
+            qf = filters.get(collection) if filters else None
+            prefetch.append(Prefetch(query=vector, using=target.vector, limit=limit, filter=qf))
+            if sparse is not None and collection not in self._dense_only:
+                prefetch.append(Prefetch(query=sparse, using=target.sparse, limit=limit, filter=qf))
+        selector, strip = fused_selector(with_payload, list(self.targets.values()))
+        physical = next(iter(self.targets.values())).collection
+        try:
+            response = self.qdrant.query_points(
+                collection_name=physical,
+                prefetch=prefetch,
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=top_k * len(self.targets),
+                with_payload=selector,
+                with_vectors=False,
+            )
+        except UnexpectedResponse as e:
+            if getattr(e, "status_code", None) == 403 or "403" in str(e):
+                raise QdrantForbiddenError("Forbidden (403) while searching Qdrant.") from e
+            return self._fusion_error(physical, e)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            return self._fusion_error(physical, e)
+
+        out: Dict[str, List[Dict[str, Any]]] = {collection: [] for collection in self.collections}
+        for r in response.points:
+            payload = r.payload or {}
+            for collection, target in self.targets.items():
+                if target.vector not in payload or len(out[collection]) >= top_k:
+                    continue
+                flat = target.flatten(payload)
+                if strip:
+                    flat.pop(STAMP_FIELD, None)
+                out[collection].append({"id": r.id, "payload": flat, "score": r.score})
+        return out
+
+    def _fusion_error(self, physical: str, exc: BaseException) -> None:
+        """Per-source search for this call; only a definitive rejection turns the fused query off."""
+        if is_unsupported_query(exc):
+            logger.warning(f"⚠️ Fused search unavailable for '{physical}', searching per source: {exc}")
+            self._fusion_failed = True
+        else:
+            logger.warning(f"⚠️ Fused search failed for '{physical}', searching per source for this request: {exc}")
+        return None
+
+    def embed_question(self, question: str) -> Tuple[List[float], Any]:
+        """Dense vector and (when hybrid) sparse vector for a question, computed once per request."""
+        return self._embed_query(question), (self._sparse_query(question) if self.hybrid else None)
+
+    def search_collection(
+        self,
+        collection_name: str,
+        vector: List[float],
+        sparse: Any = None,
+        top_k: int = 5,
+        qfilter: Optional[QFilter] = None,
+        with_payload: Any = True,
+    ) -> List[Dict[str, Any]]:
+        """Hybrid search when a sparse query is given and supported, dense otherwise."""
+        hits = None
+        if sparse is not None and collection_name not in self._dense_only:
+            hits = self._hybrid_search_collection(
+                collection_name=collection_name,
                 vector=vector,
+                sparse=sparse,
                 top_k=top_k,
-                qfilter=qf,
+                qfilter=qfilter,
+                with_payload=with_payload,
             )
-        return out
+        if hits is None:
+            hits = self._search_collection(
+                collection_name=collection_name,
+                vector=vector,
+                top_k=top_k,
+                qfilter=qfilter,
+                with_payload=with_payload,
+            )
+        return hits
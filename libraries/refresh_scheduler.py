@@ -0,0 +1,183 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from libraries.fixture_leases import FixtureLeaseManager
+from models.match_types import SquadPlayer
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def squad_hash(players: Iterable[SquadPlayer]) -> str:
+    """Order-independent fingerprint of a squad (who is in it and in which position)."""
+    keys = sorted(f"{p.team_id}|{p.player_id}|{p.position}" for p in players)
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+
+
+def full_interval(hours_to_start: float, tiers: Sequence[Tuple[Optional[float], int]]) -> int:
+    for bound, seconds in tiers:
+        if bound is None or hours_to_start <= bound:
+            return seconds
+    return tiers[-1][1]
+
+
+class RefreshScheduler:
+    """
+    Decides per fixture, on every tick, between nothing, a cheap squad poll (SOURCE_URL_4 only)
+    and a full re-enrichment (all upstream calls + LLM summaries):
+
+      - full when the fixture is new, its tier interval has elapsed, `lineup_announce` flipped
+        in the fixture list, or a squad poll saw a different squad;
+      - squad poll every SQUAD_POLL_INTERVAL_SECONDS inside the last SQUAD_POLL_WINDOW_HOURS;
+      - nothing for matches that have already started.
+
+    Per-fixture state lives in a Mongo collection so it survives restarts and is shared by
+    every worker; full refreshes go through the fixture leases, so concurrent schedulers never
+    enrich the same fixture for the same reason twice.
+    """
+
+    def __init__(
+        self,
+        state_collection,
+        leases: FixtureLeaseManager,
+        fetch_fixtures: Callable[[], List[Dict[str, Any]]],
+        fetch_squad: Callable[[Dict[str, Any]], List[Dict[str, Any]]],
+        enrich: Callable[..., Any],
+        tiers: Sequence[Tuple[Optional[float], int]],
+        squad_window_hours: float = 3,
+        squad_interval: int = 300,
+        after_refresh: Optional[Callable[[], Any]] = None,
+    ):
+        self.state = state_collection
+        self.leases = leases
+        self.fetch_fixtures = fetch_fixtures
+        self.fetch_squad = fetch_squad
+        self.enrich = enrich
+        self.tiers = tiers
+        self.squad_window_hours = squad_window_hours
+        self.squad_interval = squad_interval
+        self.after_refresh = after_refresh  # once per tick that fully refreshed a fixture (e.g. vector mirror sync)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def plan(self, fixture: Dict[str, Any], state: Optional[Dict[str, Any]], now: datetime) -> Tuple[Optional[str], str]:
+        """(action, reason) with action in {None, "squad", "full"}."""
+        try:
+            start = datetime.strptime(fixture.get("season_scheduled_date", ""), DATE_FORMAT)
+        except ValueError:
+            return "full" if not state else None, "no_schedule"
+        if start <= now:
+            return None, "started"
+        if not state:
+            return "full", "new"
+        if str(fixture.get("playing_announce", "")) != str(state.get("lineup_announce", "")):
+            return "full", "lineup_changed"
+        if now >= state.get("next_full_at", now):
+            return "full", "interval"
+        hours_to_start = (start - now).total_seconds() / 3600
+        if hours_to_start <= self.squad_window_hours and now >= state.get("next_squad_at", now):
+            return "squad", "window"
+        return None, "fresh"
+
+    def tick(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        now = now or datetime.now()
+        stats = {"fixtures": 0, "full": 0, "squad_polls": 0, "escalated": 0, "idle": 0, "busy": 0, "failed": 0}
+        fixtures = self.fetch_fixtures() or []
+        states = {
+            doc["_id"]: doc
+            for doc in self.state.find({"_id": {"$in": [str(f.get("season_game_uid")) for f in fixtures]}})
+        }
+
+        for fixture in fixtures:
+            stats["fixtures"] += 1
+            match_id = str(fixture.get("season_game_uid"))
+            state = states.get(match_id)
+            action, reason = self.plan(fixture, state, now)
+            try:
+                if action == "squad":
+                    stats["squad_polls"] += 1
+                    metrics.incr("refresh.squad_poll")
+                    team_ids = set(state.get("team_ids") or [])
+                    players = [SquadPlayer.from_upstream(p) for p in self.fetch_squad(fixture) or []]
+                    digest = squad_hash(p for p in players if not team_ids or p.team_id in team_ids)
+                    if digest == state.get("squad_hash"):
+                        self._save(match_id, {"next_squad_at": now + timedelta(seconds=self.squad_interval)})
+                        continue
+                    action, reason = "full", "squad_changed"
+                    stats["escalated"] += 1
+                if action == "full":
+                    result = self._full_refresh(fixture, match_id, reason, now)
+                    stats[result] += 1
+                else:
+                    stats["idle"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                logger.error(f"❌ Refresh of fixture {match_id} ({action}/{reason}) failed: {e}")
+
+        if stats["full"] and self.after_refresh:
+            try:
+                self.after_refresh()
+            except Exception as e:
+                logger.error(f"❌ Post-refresh hook failed: {e}")
+        logger.info(f"⏱️ Refresh tick: {stats}")
+        return stats
+
+    def _full_refresh(self, fixture: Dict[str, Any], match_id: str, reason: str, now: datetime) -> str:
+        # lease "cycle" = why and when: a second worker seeing the same trigger skips it
+        cycle = f"{reason}:{now.strftime('%Y%m%d%H%M')}"
+        if not self.leases.acquire(match_id, cycle):
+            return "busy"
+        try:
+            match_details = self.enrich(fixture, lambda: self.leases.owns(match_id))
+            if not match_details:
+                self.leases.release(match_id)
+                return "busy"
+            self.leases.complete(match_id, cycle)
+        except Exception:
+            self.leases.release(match_id)
+            raise
+
+        start = datetime.strptime(fixture["season_scheduled_date"], DATE_FORMAT) if fixture.get("season_scheduled_date") else now
+        hours_to_start = max((start - now).total_seconds() / 3600, 0)
+        squad = list(getattr(match_details, "home_team_squad", [])) + list(getattr(match_details, "away_team_squad", []))
+        self._save(match_id, {
+            "lineup_announce": str(fixture.get("playing_announce", "")),
+            "squad_hash": squad_hash(squad),
+            "team_ids": [t for t in (getattr(match_details, "home_team_id", None), getattr(match_details, "away_team_id", None)) if t],
+            "match_scheduled_date": fixture.get("season_scheduled_date"),
+            "last_full_at": now,
+            "last_full_reason": reason,
+            "next_full_at": now + timedelta(seconds=full_interval(hours_to_start, self.tiers)),
+            "next_squad_at": now + timedelta(seconds=self.squad_interval),
+        })
+        metrics.incr(f"refresh.full.{reason}")
+        logger.info(f"🔄 Full refresh of fixture {match_id} ({reason}, {hours_to_start:.1f}h to start)")
+        return "full"
+
+    def _save(self, match_id: str, fields: Dict[str, Any]) -> None:
+        self.state.update_one({"_id": match_id}, {"$set": fields}, upsert=True)
+
+    def start(self, tick_seconds: int) -> None:
+        """Run tick() every `tick_seconds` on a daemon thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(tick_seconds,), name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"⏱️ Refresh scheduler started (tick every {tick_seconds}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, tick_seconds: int) -> None:
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"❌ Refresh tick failed: {e}")
+            self._stop.wait(tick_seconds)
@@ -0,0 +1,146 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import bson
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (
+    Filter as QFilter,
+    FieldCondition,
+    DatetimeRange,
+    PointIdsList,
+)
+from config.settings import EMBEDDING_DIM
+from utils.logger import get_logger
+
+# Parquet archives when pyarrow is installed, gzip'd JSONL otherwise
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pq = None
+
+logger = get_logger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}"  # prefix of DATE_FORMAT
+
+
+class _ArchiveWriter:
+    """
+    Archives records per (store, collection, run). Every write() is durable on disk before it
+    returns, so a batch is only deleted once its archive survives a crash: one Parquet file per
+    batch, or one fsync'd gzip member per batch of the JSONL archive.
+    """
+
+    def __init__(self, archive_dir: str, store: str, collection: str, run_at: datetime):
+        folder = os.path.join(archive_dir, run_at.strftime("%Y-%m-%d"))
+        os.makedirs(folder, exist_ok=True)
+        self._stem = os.path.join(folder, f"{store}_{collection}_{run_at.strftime('%H%M%S')}")
+        self.paths: List[str] = []  # files written so far; empty runs leave no file
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        if not pq:
+            path = f"{self._stem}.jsonl.gz"
+            with gzip.open(path, "at", encoding="utf-8") as fh:
+                for record in records:
+                    fh.write(json.dumps(record, default=str, separators=(",", ":")) + "\n")
+            _fsync(path)
+        else:
+            # nested squads/metadata are kept as JSON strings so the schema stays flat
+            rows = [{"match_id": str(r.get("match_id")), "record": json.dumps(r, default=str)} for r in records]
+            path = f"{self._stem}_{len(self.paths):04d}.parquet"
+            tmp = f"{path}.tmp"
+            pq.write_table(pa.Table.from_pylist(rows), tmp, compression="zstd")
+            _fsync(tmp)
+            os.replace(tmp, path)
+        if path not in self.paths:
+            self.paths.append(path)
+
+    def close(self) -> List[str]:
+        return list(self.paths)
+
+
+def _fsync(path: str) -> None:
+    with open(path, "rb") as fh:
+        os.fsync(fh.fileno())
+
+
+class RetentionManager:
+    """
+    Deletes matches whose match_scheduled_date is older than the retention horizon from
+    Mongo and Qdrant, archiving them first. Both stores are queried through their date
+    index, so each run only touches the expired rows.
+    """
+
+    def __init__(self, mongo_db, qdrant: QdrantClient, archive_dir: str, batch_size: int = 256):
+        self.mongo_db = mongo_db
+        self.qdrant = qdrant
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+
+    @staticmethod
+    def cutoff(days: int, now: Optional[datetime] = None) -> str:
+        return ((now or datetime.now()) - timedelta(days=days)).strftime(DATE_FORMAT)
+
+    def prune_mongo(self, collection: str, cutoff: str, run_at: datetime, archive: bool = True) -> Dict[str, Any]:
+        coll = self.mongo_db[collection]
+        coll.create_index("match_scheduled_date")  # no-op once it exists
+        writer = _ArchiveWriter(self.archive_dir, "mongo", collection, run_at) if archive else None
+        deleted = reclaimed = 0
+        match_ids = set()
+
+        while True:
+            # string comparison: only well-formed dates ("" and "TBD" are not finished matches)
+            docs = list(coll.find({"match_scheduled_date": {"$lt": cutoff, "$regex": DATE_PATTERN}}).limit(self.batch_size))
+            if not docs:
+                break
+            if writer:
+                writer.write([{k: v for k, v in d.items() if k != "_id"} for d in docs])
+            reclaimed += sum(len(bson.encode(d)) for d in docs)
+            match_ids.update(str(d.get("match_id")) for d in docs)
+            result = coll.delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+            deleted += result.deleted_count
+
+        paths = writer.close() if writer else []
+        logger.info(f"🧹 Mongo {collection}: deleted {deleted} docs older than {cutoff} ({reclaimed} bytes)")
+        return {"documents": deleted, "bytes": reclaimed, "archive": paths, "match_ids": sorted(match_ids)}
+
+    def prune_qdrant(self, collection: str, cutoff: str, run_at: datetime, archive: bool = True) -> Dict[str, Any]:
+        cutoff_dt = datetime.strptime(cutoff, DATE_FORMAT)  # naive, like the stored strings (both read as UTC)
+        qfilter = QFilter(must=[FieldCondition(key="match_scheduled_date", range=DatetimeRange(lt=cutoff_dt))])
+        writer = _ArchiveWriter(self.archive_dir, "qdrant", collection, run_at) if archive else None
+        deleted = reclaimed = 0
+        match_ids = set()
+
+        while True:
+            # deleted points drop out of the filter, so every page starts from the beginning
+            records, _ = self.qdrant.scroll(
+                collection_name=collection,
+                scroll_filter=qfilter,
+                limit=self.batch_size,
+                with_payload=True,
+                with_vectors=False,
+            )
+            if not records:
+                break
+            payloads = [{"id": str(r.id), **(r.payload or {})} for r in records]
+            if writer:
+                writer.write(payloads)
+            # dense float32 vector + payload; sparse vectors and index entries are not counted
+            reclaimed += sum(EMBEDDING_DIM * 4 + len(json.dumps(p, default=str)) for p in payloads)
+            match_ids.update(str(p.get("match_id")) for p in payloads)
+            self.qdrant.delete(
+                collection_name=collection,
+                points_selector=PointIdsList(points=[r.id for r in records]),
+                wait=True,
+            )
+            deleted += len(records)
+
+        paths = writer.close() if writer else []
+        logger.info(f"🧹 Qdrant {collection}: deleted {deleted} points older than {cutoff} (~{reclaimed} bytes)")
+        return {"points": deleted, "bytes": reclaimed, "archive": paths, "match_ids": sorted(match_ids)}
@@ -0,0 +1,182 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stage order of one fixture in a cron run
+STAGES = ("fetched", "summarized", "persisted", "embedded", "faqs")
+
+# Finished ledger entries are dropped by Mongo after this long
+LEDGER_TTL_SECONDS = 7 * 24 * 3600
+
+Stage = Tuple[str, Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]]
+
+
+class RunLedger:
+    """
+    Mongo-backed checkpoints for cron runs.
+
+    `runs` holds one document per run ({_id: run_id, status, fixture_ids, ...}); `entries`
+    holds one per (run, fixture) with the completed stages, the checkpointed state of the
+    last completed stage and the retry bookkeeping. A run stays "running" until every fixture
+    is done or given up, so the next trigger resumes it: completed stages are skipped and the
+    next stage starts from the checkpointed state. A failing fixture is retried with
+    exponential backoff while the others carry on.
+
+    With `leases` (a FixtureLeaseManager) a fixture is only worked on while its lease is held,
+    so overlapping triggers or nodes never run the same fixture at once (nor alongside the
+    refresh scheduler, which takes the same leases); held fixtures are left to their owner.
+    """
+
+    def __init__(self, runs, entries, max_attempts: int = 5, backoff_base: float = 30, backoff_max: float = 1800,
+                 leases=None):
+        self.runs = runs
+        self.entries = entries
+        self.leases = leases
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._indexed = False
+
+    def _ensure_indexes(self) -> None:
+        if not self._indexed:
+            self.entries.create_index("run_id")
+            self.entries.create_index("updated_at", expireAfterSeconds=LEDGER_TTL_SECONDS)
+            self.runs.create_index([("status", 1), ("started_at", -1)])
+            try:
+                # at most one running run: concurrent triggers resume it instead of each starting one
+                self.runs.create_index("status", name="one_running_run", unique=True,
+                                       partialFilterExpression={"status": "running"})
+            except OperationFailure as e:
+                logger.warning(f"⚠️ Unique running-run index not created (several runs still running?): {e}")
+            self._indexed = True
+
+    def start_or_resume(self, fixture_ids: List[str], resume_window: float = 3600) -> Tuple[str, bool]:
+        """
+        Resume the latest unfinished run started within `resume_window` seconds (adding any new
+        fixtures to it), or start a new one. Older unfinished runs are marked abandoned.
+        """
+        self._ensure_indexes()
+        now = datetime.now()
+        horizon = now - timedelta(seconds=resume_window)
+        self.runs.update_many({"status": "running", "started_at": {"$lt": horizon}}, {"$set": {"status": "abandoned"}})
+        while True:
+            run = self.runs.find_one({"status": "running"}, sort=[("started_at", -1)])
+            if run:
+                self.runs.update_one(
+                    {"_id": run["_id"]},
+                    {"$addToSet": {"fixture_ids": {"$each": fixture_ids}}, "$set": {"resumed_at": now}},
+                )
+                return run["_id"], True
+            run_id = now.strftime("%Y%m%d%H%M%S%f")
+            try:
+                self.runs.insert_one({"_id": run_id, "status": "running", "started_at": now, "fixture_ids": fixture_ids})
+                return run_id, False
+            except DuplicateKeyError:
+                continue  # another trigger started one first: resume it
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_base * (2 ** max(attempts - 1, 0)), self.backoff_max)
+        return delay * random.uniform(0.9, 1.1)  # jitter so retries of many fixtures spread out
+
+    def _entries(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        return {doc["fixture_id"]: doc for doc in self.entries.find({"run_id": run_id})}
+
+    def _update(self, run_id: str, fixture_id: str, update: Dict[str, Any]) -> None:
+        update.setdefault("$set", {}).update({"run_id": run_id, "fixture_id": fixture_id, "updated_at": datetime.now()})
+        self.entries.update_one({"_id": f"{run_id}:{fixture_id}"}, update, upsert=True)
+
+    def _due(self, entry: Dict[str, Any], counts: Dict[str, Any]) -> bool:
+        """Whether the entry still needs work now; counts the ones that do not."""
+        if entry.get("status") in ("done", "given_up"):
+            counts["already_done" if entry["status"] == "done" else "given_up"] += 1
+            return False
+        retry_at = entry.get("next_attempt_at")
+        if retry_at and retry_at > datetime.now():
+            counts["waiting"] += 1
+            counts["next_retry_at"] = min(counts["next_retry_at"] or retry_at, retry_at)
+            return False
+        return True
+
+    def run_pass(self, run_id: str, fixtures: List[Dict[str, Any]], stages: List[Stage], key: str = "season_game_uid") -> Dict[str, Any]:
+        """One pass over the fixtures; returns counts and the earliest pending retry time."""
+        counts = {"done": 0, "already_done": 0, "retry": 0, "given_up": 0, "waiting": 0, "busy": 0, "lost": 0,
+                  "stages_run": 0, "stages_skipped": 0, "next_retry_at": None}
+        entries = self._entries(run_id)
+
+        for fixture in fixtures:
+            fixture_id = str(fixture[key])
+            entry = entries.get(fixture_id) or {}
+            if not self._due(entry, counts):
+                continue
+            if self.leases:
+                if not self.leases.acquire(fixture_id, f"run:{run_id}"):
+                    counts["busy"] += 1
+                    continue
+                # re-read under the lease: the previous holder may have advanced or settled it
+                entry = self.entries.find_one({"_id": f"{run_id}:{fixture_id}"}) or {}
+                if not self._due(entry, counts):
+                    self.leases.release(fixture_id)
+                    continue
+            try:
+                self._run_fixture(run_id, fixture_id, fixture, entry, stages, counts)
+            finally:
+                if self.leases:
+                    self.leases.release(fixture_id)  # not complete(): the entry status is the record
+
+        return counts
+
+    def _run_fixture(self, run_id: str, fixture_id: str, fixture: Dict[str, Any], entry: Dict[str, Any],
+                     stages: List[Stage], counts: Dict[str, Any]) -> None:
+        completed = entry.get("stages") or {}
+        state = entry.get("state") or {}
+        stage = None
+        try:
+            for stage, fn in stages:
+                if stage in completed:
+                    counts["stages_skipped"] += 1
+                    continue
+                if self.leases and not self.leases.owns(fixture_id):
+                    counts["lost"] += 1
+                    logger.warning(f"⚠️ Lease on fixture {fixture_id} lost before stage '{stage}', leaving it to the new owner")
+                    return
+                state = fn(fixture, state) or state
+                self._update(run_id, fixture_id, {"$set": {f"stages.{stage}": datetime.now(), "state": state, "status": "in_progress"}})
+                counts["stages_run"] += 1
+            self._update(run_id, fixture_id, {"$set": {"status": "done"}, "$unset": {"state": "", "next_attempt_at": ""}})
+            counts["done"] += 1
+        except Exception as e:
+            attempts = entry.get("attempts", 0) + 1
+            given_up = attempts >= self.max_attempts
+            fields = {"status": "given_up" if given_up else "retry", "attempts": attempts,
+                      "failed_stage": stage, "last_error": str(e)[:500]}
+            if not given_up:
+                fields["next_attempt_at"] = datetime.now() + timedelta(seconds=self.backoff(attempts))
+                counts["next_retry_at"] = min(counts["next_retry_at"] or fields["next_attempt_at"], fields["next_attempt_at"])
+            self._update(run_id, fixture_id, {"$set": fields})
+            counts["given_up" if given_up else "retry"] += 1
+            logger.error(f"❌ Fixture {fixture_id} failed at stage '{stage}' (attempt {attempts}/{self.max_attempts}): {e}")
+
+    def run(self, fixtures: List[Dict[str, Any]], stages: List[Stage], resume_window: float = 3600,
+            key: str = "season_game_uid") -> Dict[str, Any]:
+        """
+        Resume or start a run and make one pass over its fixtures. Fixtures waiting for a retry
+        or held by another worker keep the run "running"; the next trigger resumes it (nothing
+        waits inside the request).
+        """
+        run_id, resumed = self.start_or_resume([str(f[key]) for f in fixtures], resume_window)
+        totals: Dict[str, Any] = {"run_id": run_id, "resumed": resumed}
+        totals.update(self.run_pass(run_id, fixtures, stages, key))
+
+        settled = not any(totals[name] for name in ("retry", "waiting", "busy", "lost"))
+        self.runs.update_one(
+            {"_id": run_id},
+            {"$set": {"status": "completed" if settled else "running", "updated_at": datetime.now(),
+                      "last_counts": {k: v for k, v in totals.items() if k != "run_id"}}},
+        )
+        totals["status"] = "completed" if settled else "running"
+        return totals
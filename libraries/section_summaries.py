@@ -0,0 +1,121 @@
+import hashlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import msgspec
+
+from models.match_types import MatchBase, SummarySection, json_encode
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Bump when the section prompts change, so every stored section is regenerated once
+SECTION_PROMPT_VERSION = 1
+
+
+class SectionSpec(NamedTuple):
+    name: str
+    title: str
+    instructions: str
+    fields: Tuple[str, ...]
+
+
+# The eight-part structure of AIModel.generate_documentation, with the input fields each part reads
+SECTIONS: List[SectionSpec] = [
+    SectionSpec("match_info", "Match & Tournament Info",
+                "Include match title, match ID, league name, match format, and scheduled date/time.",
+                ("match_title", "match_id", "league_id", "league_name", "match_format", "match_scheduled_date")),
+    SectionSpec("teams", "Teams Overview",
+                "Provide home and away team names, team IDs, and any relevant squad info.",
+                ("home_team", "away_team", "home_team_id", "away_team_id", "home_team_name", "away_team_name", "lineup_announce")),
+    SectionSpec("players", "Player Details",
+                "List all players with roles (BAT, BOW, AR, WK), last match played, and nicknames.",
+                ("home_team_squad", "away_team_squad")),
+    SectionSpec("venue_pitch", "Venue & Pitch Info",
+                "Include ground name, venue ID, total matches played at venue, pitch support description and type.",
+                ("ground_name", "venue_id", "total_matches_played_on_this_venue", "bat_first_win_on_this_venue",
+                 "bat_second_win_on_this_venue", "pitch_support_description", "pitch_support_type")),
+    SectionSpec("weather", "Weather & Conditions",
+                "Temperature, humidity, clouds, visibility, wind speed, weather description, and forecast summary.",
+                ("temperature", "humidity", "clouds", "visibility", "wind_speed", "weather", "weather_desc",
+                 "weather_report_description")),
+    SectionSpec("scores", "Historical & Predicted Scores",
+                "Average first and second inning scores, predicted team scores, predicted wickets, and winning probabilities.",
+                ("avg_first_inning_score", "avg_second_inning_score", "avg_first_inning_wicket", "avg_second_inning_wicket",
+                 "home_team_score_prediction", "home_team_wicket_prediction", "away_team_score_prediction",
+                 "away_team_wicket_prediction", "win_team_win_probability")),
+    SectionSpec("support", "Bowling & Batting Support",
+                "Describe bowling support type/description and batting/pitch support insights.",
+                ("bowling_support_type", "bowling_support_description", "pitch_support_type", "pitch_support_description")),
+    SectionSpec("outcome", "Match Outcome Prediction",
+                "Include predicted win team, run difference, wicket difference, and winning chance.",
+                ("win_team_id", "win_team_name", "win_team_run", "win_team_wicket", "win_team_win_probability")),
+]
+
+# Identify the match in every section prompt (and so are part of every fingerprint)
+CONTEXT_FIELDS = ("match_id", "home_team_name", "away_team_name")
+
+
+def section_inputs(data: Dict[str, Any], section: SectionSpec) -> Optional[Dict[str, Any]]:
+    """The fields a section is written from, or None when the record has none of them."""
+    own = {f: data[f] for f in section.fields if data.get(f) not in (None, "", [], {})}
+    if not own:
+        return None
+    return {**{f: data.get(f) for f in CONTEXT_FIELDS}, **own}
+
+
+def fingerprint(section: SectionSpec, inputs: Dict[str, Any]) -> str:
+    blob = json_encode({"v": SECTION_PROMPT_VERSION, "section": section.name, "inputs": inputs})
+    return hashlib.sha1(blob).hexdigest()
+
+
+def join_sections(sections: Dict[str, SummarySection]) -> str:
+    """Full summary text (the old single-string format), sections in their fixed order."""
+    parts = []
+    for i, section in enumerate(SECTIONS, start=1):
+        if section.name in sections:
+            parts.append(f"{i}. {section.title}\n{sections[section.name].text}")
+    return "\n\n".join(parts)
+
+
+class SectionSummarizer:
+    """Regenerates only the summary sections whose input fields changed since the last run."""
+
+    def __init__(self, ai_model):
+        self.ai_model = ai_model
+
+    def summarize(
+        self,
+        record: MatchBase,
+        previous: Optional[Dict[str, SummarySection]],
+        master_description: Dict[str, Any],
+    ) -> Tuple[Dict[str, SummarySection], Dict[str, int]]:
+        data = msgspec.to_builtins(record)
+        descriptions = (master_description or {}).get("description_data") or {}
+        previous = previous or {}
+        sections: Dict[str, SummarySection] = {}
+        counts = {"reused": 0, "rebuilt": 0}
+
+        for section in SECTIONS:
+            inputs = section_inputs(data, section)
+            if inputs is None:
+                continue
+            fp = fingerprint(section, inputs)
+            old = previous.get(section.name)
+            if old is not None and old.fingerprint == fp and old.text:
+                sections[section.name] = old  # keeps its `embedded` marker, so it is not re-embedded either
+                counts["reused"] += 1
+                continue
+            text = self.ai_model.generate_section(
+                section.title,
+                section.instructions,
+                inputs,
+                {k: v for k, v in descriptions.items() if k in inputs},
+            )
+            sections[section.name] = SummarySection(text=text, fingerprint=fp)
+            counts["rebuilt"] += 1
+
+        metrics.incr("summary.sections.reused", counts["reused"])
+        metrics.incr("summary.sections.rebuilt", counts["rebuilt"])
+        logger.info(f"🧩 Summary sections for {data.get('match_id')}: {counts['rebuilt']} rebuilt, {counts['reused']} reused")
+        return sections, counts
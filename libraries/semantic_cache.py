@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import (
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_PER_MATCH,
+    SEMANTIC_CACHE_MAX_MATCHES,
+    SEMANTIC_CACHE_TTL,
+)
+from utils.metrics import metrics
+
+
+class _Partition:
+    """Unit-length question vectors (one row each) and the results cached for them, oldest first."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.values: List[Dict[str, Any]] = []
+        self.stored_at: List[float] = []
+
+    def drop_first(self, n: int) -> None:
+        self.vectors = self.vectors[n:]
+        del self.values[:n]
+        del self.stored_at[:n]
+
+
+class SemanticQuestionCache:
+    """
+    Earlier question results per match, found again by question embedding: "who will win",
+    "winner prediction?" and "which team wins today" land on the same entry when their cosine
+    similarity is at least `threshold`.
+
+    Entries are partitioned by match_id and by a `variant` (the payload selector of the search),
+    so a hit never returns fields the request did not ask for. Each match's entries carry the
+    `version` they were stored under (the match's points_version, bumped in Mongo whenever its
+    points are replaced); a lookup or store under another version drops them, so an upsert
+    run by any process is seen here. invalidate() does the same at once in the upserting process.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_per_match: int = SEMANTIC_CACHE_MAX_PER_MATCH,
+        max_matches: int = SEMANTIC_CACHE_MAX_MATCHES,
+        ttl: Optional[float] = SEMANTIC_CACHE_TTL,
+    ):
+        self.threshold = threshold
+        self.max_per_match = max_per_match
+        self.max_matches = max_matches
+        self.ttl = ttl
+        self._matches: "OrderedDict[str, Dict[Hashable, _Partition]]" = OrderedDict()
+        self._versions: Dict[str, Hashable] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm else v
+
+    def _expire(self, part: _Partition) -> None:
+        if not self.ttl or not part.stored_at:
+            return
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        while expired < len(part.stored_at) and part.stored_at[expired] < cutoff:
+            expired += 1
+        if expired:
+            part.drop_first(expired)
+
+    def _check_version(self, key: str, version: Hashable) -> None:
+        """Drop the match's entries when they were stored under another version."""
+        if version is not None and key in self._matches and self._versions.get(key) != version:
+            self._matches.pop(key)
+
+    def lookup(self, match_id: Any, vector: List[float], variant: Hashable = None,
+               version: Hashable = None) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(cached value, similarity) of the closest earlier question above the threshold, or None."""
+        query = self._unit(vector)
+        with self._lock:
+            self._check_version(str(match_id), version)
+            part = self._matches.get(str(match_id), {}).get(variant)
+            if part is not None:
+                self._expire(part)
+            if part is None or not part.values:
+                metrics.incr("semantic_cache.miss")
+                return None
+            self._matches.move_to_end(str(match_id))
+            similarities = part.vectors @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                metrics.incr("semantic_cache.miss")
+                return None
+            metrics.incr("semantic_cache.hit")
+            return part.values[best], similarity
+
+    def store(self, match_id: Any, vector: List[float], value: Dict[str, Any], variant: Hashable = None,
+              version: Hashable = None) -> None:
+        row = self._unit(vector)
+        key = str(match_id)
+        with self._lock:
+            self._check_version(key, version)
+            partitions = self._matches.setdefault(key, {})
+            self._versions[key] = version
+            self._matches.move_to_end(key)
+            part = partitions.get(variant)
+            if part is None:
+                part = partitions[variant] = _Partition(len(row))
+            part.vectors = np.vstack([part.vectors, row[None, :]])
+            part.values.append(value)
+            part.stored_at.append(time.monotonic())
+            if len(part.values) > self.max_per_match:
+                part.drop_first(len(part.values) - self.max_per_match)
+            while len(self._matches) > self.max_matches:
+                evicted, _ = self._matches.popitem(last=False)
+                self._versions.pop(evicted, None)
+
+    def invalidate(self, match_id: Any) -> None:
+        with self._lock:
+            self._matches.pop(str(match_id), None)
+            self._versions.pop(str(match_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matches.clear()
+            self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = metrics.counter("semantic_cache.hit")
+        misses = metrics.counter("semantic_cache.miss")
+        with self._lock:
+            entries = sum(len(p.values) for parts in self._matches.values() for p in parts.values())
+            matches = len(self._matches)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "matches": matches,
+            "entries": entries,
+            "threshold": self.threshold,
+        }
+
+
+# Shared by the cron (invalidates on upsert) and user (reads) controllers within one process
+semantic_question_cache = SemanticQuestionCache()
@@ -0,0 +1,69 @@
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was",
+    "were", "will", "with", "what", "which", "who", "how", "does", "do", "did",
+})
+
+
+class BM25SparseEncoder:
+    """
+    Vocabulary-free BM25 encoder for Qdrant sparse vectors.
+
+    Tokens are hashed to stable integer ids, documents carry BM25-saturated term
+    frequencies and queries carry a weight of 1 per distinct term. IDF is applied
+    server-side through the sparse vector's IDF modifier, so nothing has to be
+    fitted or persisted alongside the collection.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_len: float = 256.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_len = avg_doc_len
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        if not text:
+            return []
+        return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+    @staticmethod
+    def token_id(token: str) -> int:
+        """Stable 31-bit id for a token (crc32, so it survives process restarts)."""
+        return zlib.crc32(token.encode("utf-8")) & 0x7FFFFFFF
+
+    @staticmethod
+    def _to_sparse(weights: Dict[int, float]) -> Tuple[List[int], List[float]]:
+        indices = sorted(weights)
+        return indices, [weights[i] for i in indices]
+
+    def encode_document(self, text: str) -> Tuple[List[int], List[float]]:
+        """Return (indices, values) with BM25 term-frequency weights."""
+        tokens = self.tokenize(text)
+        if not tokens:
+            return [], []
+        doc_len = len(tokens)
+        norm = self.k1 * (1.0 - self.b + self.b * doc_len / self.avg_doc_len)
+        weights: Dict[int, float] = {}
+        for token, tf in Counter(tokens).items():
+            tid = self.token_id(token)
+            # hash collisions simply merge weights
+            weights[tid] = weights.get(tid, 0.0) + tf * (self.k1 + 1.0) / (tf + norm)
+        return self._to_sparse(weights)
+
+    def encode_query(self, text: str) -> Tuple[List[int], List[float]]:
+        """Return (indices, values) with a unit weight per distinct query term."""
+        weights = {self.token_id(t): 1.0 for t in set(self.tokenize(text))}
+        return self._to_sparse(weights)
+
+    @staticmethod
+    def idf(doc_freq: int, n_docs: int) -> float:
+        """BM25 idf, matching the formula Qdrant uses for the IDF modifier."""
+        return math.log(1.0 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
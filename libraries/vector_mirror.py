@@ -0,0 +1,289 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client.http.models import (
+    DatetimeRange,
+    FieldCondition,
+    Filter as QFilter,
+    PayloadSelectorExclude,
+    PayloadSelectorInclude,
+)
+
+from config.settings import (
+    EMBEDDING_DIM,
+    ACTIVE_MATCH_WINDOW_HOURS,
+    VECTOR_MIRROR_DIR,
+    VECTOR_MIRROR_MAX_AGE_SECONDS,
+)
+from libraries.collection_layout import STAMP_FIELD, CollectionTarget, target_of
+from libraries.faq import exclude_faqs
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+SCROLL_BATCH = 512
+RETRIEVE_BATCH = 256
+MATRIX_DTYPE = "float32"
+
+
+def active_filter(hours: int = ACTIVE_MATCH_WINDOW_HOURS) -> QFilter:
+    """Non-FAQ points of the fixtures scheduled after now - `hours` (the mirrored set)."""
+    since = datetime.now() - timedelta(hours=hours)
+    return exclude_faqs(QFilter(must=[FieldCondition(key="match_scheduled_date", range=DatetimeRange(gte=since))]))
+
+
+def _with_stamp(with_payload: Any) -> Tuple[Any, bool]:
+    """Payload selector that also returns STAMP_FIELD, and whether the field has to be dropped from the hits again."""
+    if with_payload is True:
+        return True, False
+    if isinstance(with_payload, PayloadSelectorInclude):
+        if STAMP_FIELD in with_payload.include:
+            return with_payload, False
+        return PayloadSelectorInclude(include=list(with_payload.include) + [STAMP_FIELD]), True
+    if isinstance(with_payload, PayloadSelectorExclude):
+        if STAMP_FIELD not in with_payload.exclude:
+            return with_payload, False
+        return PayloadSelectorExclude(exclude=[f for f in with_payload.exclude if f != STAMP_FIELD]), True
+    return PayloadSelectorInclude(include=[STAMP_FIELD]), True
+
+
+class _Snapshot:
+    """One published generation of a collection's mirror: ids and stamps plus the mapped float32 matrix."""
+
+    def __init__(self, manifest: Dict[str, Any], matrix: np.ndarray):
+        self.version: int = manifest["version"]
+        self.synced_at: float = manifest["synced_at"]
+        self.dim: int = manifest["dim"]
+        self.ids: List[Any] = manifest["ids"]  # as Qdrant returns them: UUID strings or integers
+        self.match_ids: List[Optional[str]] = manifest["match_ids"]
+        self.sections: List[Optional[str]] = manifest["sections"]
+        self.stamps: List[Optional[str]] = manifest["stamps"]
+        # float32 on disk: BLAS multiplies the mapped pages as they are, so no process keeps a private copy
+        self.matrix = matrix
+
+
+class VectorMirror:
+    """
+    Local copy of the dense vectors of the active fixtures, for questions that span matches.
+
+    Each collection is mirrored as a float32 matrix of unit-length rows (`<collection>.<version>.f32`)
+    and a JSON manifest with the point ids, match ids, sections and vector stamps of its rows.
+    The cron process publishes a new generation after each embedding run (sync); question
+    workers memory-map whichever generation the manifest names, so every process on the host
+    shares the same file pages and picks up a new generation on its next search.
+
+    Consistency with Qdrant rests on the `vector_stamp` payload field written with every point:
+    a sync only reads the vectors of points whose stamp differs from the mirror's, and hits are
+    dropped when the payload read back from Qdrant carries another stamp (or the point is gone).
+    """
+
+    def __init__(self, directory: str = VECTOR_MIRROR_DIR, max_age: Optional[float] = VECTOR_MIRROR_MAX_AGE_SECONDS):
+        self.directory = directory
+        self.max_age = max_age
+        self._snapshots: Dict[str, Tuple[int, _Snapshot]] = {}  # collection -> (manifest mtime_ns, snapshot)
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ---------- reading ----------
+    def snapshot(self, collection: str) -> Optional[_Snapshot]:
+        """The published generation of `collection` (re-read only when the manifest changed), or None."""
+        path = self._path(f"{collection}.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._snapshots.get(collection)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            shape = (len(manifest["ids"]), manifest["dim"])
+            matrix = (np.memmap(self._path(manifest["matrix"]), dtype=MATRIX_DTYPE, mode="r", shape=shape)
+                      if shape[0] else np.empty(shape, dtype=MATRIX_DTYPE))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Vector mirror of '{collection}' unreadable: {e}")
+            return None
+        snap = _Snapshot(manifest, matrix)
+        with self._lock:
+            self._snapshots[collection] = (mtime, snap)
+        return snap
+
+    def search(self, collection: str, vector: List[float], top_k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Top-k rows by cosine similarity (id, score, match_id, section, stamp); None without a fresh mirror."""
+        snap = self.snapshot(collection)
+        if snap is None or (self.max_age and time.time() - snap.synced_at > self.max_age):
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape != (snap.dim,):
+            return None
+        if not snap.ids or top_k <= 0:
+            return []
+        scores = snap.matrix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {"id": snap.ids[i], "score": float(scores[i]), "match_id": snap.match_ids[i],
+             "section": snap.sections[i], "stamp": snap.stamps[i], "version": snap.version}
+            for i in top.tolist()
+        ]
+
+    def hits(self, qdrant, collection: str, vector: List[float], top_k: int = 10,
+             with_payload: Any = True, target: Optional[CollectionTarget] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        search() in the searcher's hit shape ({"id", "payload", "score"}), with the payloads read
+        from Qdrant by id: a point lookup instead of an active-window vector search. Hits whose point
+        changed or disappeared since the last sync are dropped; twice `top_k` rows are scored so
+        a few of those do not shorten the list. None without a fresh mirror.
+        """
+        found = self.search(collection, vector, top_k * 2)
+        if not found:
+            return found
+        target = target or target_of(collection)
+        selector, strip = _with_stamp(with_payload)
+        records = qdrant.retrieve(collection_name=target.collection, ids=[h["id"] for h in found],
+                                  with_payload=target.selector(selector), with_vectors=False)
+        payloads = {r.id: target.flatten(r.payload or {}) for r in records}
+        out, stale = [], 0
+        for hit in found:
+            payload = payloads.get(hit["id"])
+            if payload is None or payload.get(STAMP_FIELD) != hit["stamp"]:  # re-embedded, deleted, or this source removed
+                stale += 1
+                continue
+            if strip:
+                payload = {k: v for k, v in payload.items() if k != STAMP_FIELD}
+            out.append({"id": hit["id"], "payload": payload, "score": hit["score"]})
+            if len(out) == top_k:
+                break
+        if stale:
+            metrics.incr("vector_mirror.stale_hits", stale)
+        return out
+
+    # ---------- writing ----------
+    def _scroll_stamps(self, qdrant, target: CollectionTarget, qfilter: QFilter) -> Dict[Any, Tuple[Any, Any, Any]]:
+        """point id -> (match_id, section, stamp) of every point to mirror; payload only, no vectors."""
+        points: Dict[Any, Tuple[Any, Any, Any]] = {}
+        offset = None
+        while True:
+            records, offset = qdrant.scroll(
+                collection_name=target.collection,
+                scroll_filter=qfilter,
+                limit=SCROLL_BATCH,
+                offset=offset,
+                with_payload=["match_id", "section", target.field(STAMP_FIELD)],
+                with_vectors=False,
+            )
+            for r in records:
+                payload = r.payload or {}
+                if target.vector and target.vector not in payload:
+                    continue  # named layout: the point has no vector of this source
+                payload = target.flatten(payload)
+                points[r.id] = (payload.get("match_id"), payload.get("section"), payload.get(STAMP_FIELD))
+            if offset is None:
+                return points
+
+    def _fetch_vectors(self, qdrant, target: CollectionTarget, ids: List[Any]) -> Dict[Any, np.ndarray]:
+        vectors: Dict[Any, np.ndarray] = {}
+        for start in range(0, len(ids), RETRIEVE_BATCH):
+            records = qdrant.retrieve(collection_name=target.collection, ids=ids[start:start + RETRIEVE_BATCH],
+                                      with_payload=False, with_vectors=[target.vector] if target.vector else True)
+            for r in records:
+                dense = target.dense(r.vector)
+                if dense is not None:
+                    v = np.asarray(dense, dtype=np.float32)
+                    vectors[r.id] = v / max(float(np.linalg.norm(v)), 1e-12)
+        return vectors
+
+    def sync(self, qdrant, collection: str, qfilter: Optional[QFilter] = None,
+             target: Optional[CollectionTarget] = None) -> Dict[str, Any]:
+        """
+        Bring the mirror of `collection` in line with Qdrant (the active points by default).
+        Only new or re-embedded points are read with their vectors, dropped points are removed,
+        the other rows are copied from the current generation. Returns the sync counts.
+        """
+        started = time.perf_counter()
+        target = target or target_of(collection)
+        current = self._scroll_stamps(qdrant, target, qfilter or active_filter())
+        old = self.snapshot(collection)
+        old_rows = {pid: i for i, pid in enumerate(old.ids)} if old else {}
+        changed = [pid for pid, (_, _, stamp) in current.items()
+                   if pid not in old_rows or old.stamps[old_rows[pid]] != stamp]
+        removed = sum(1 for pid in old_rows if pid not in current)
+        fetched = self._fetch_vectors(qdrant, target, changed) if changed else {}
+
+        ids = [pid for pid in current if pid in fetched or (pid in old_rows and pid not in changed)]
+        dim = next(iter(fetched.values())).shape[0] if fetched else (old.dim if old else EMBEDDING_DIM)
+        matrix = np.empty((len(ids), dim), dtype=MATRIX_DTYPE)
+        for row, pid in enumerate(ids):
+            matrix[row] = fetched[pid] if pid in fetched else old.matrix[old_rows[pid]]
+
+        version = (old.version if old else 0) + (1 if changed or removed or old is None else 0)
+        self._publish(collection, version, matrix, ids, current, write_matrix=version != (old.version if old else 0))
+        report = {
+            "version": version,
+            "rows": len(ids),
+            "fetched": len(fetched),
+            "removed": removed,
+            "unchanged": len(ids) - len(fetched),
+            "sync_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        metrics.observe("vector_mirror.sync_ms", report["sync_ms"])
+        logger.info(f"🪞 Vector mirror of '{collection}' v{version}: {len(ids)} rows, {len(fetched)} fetched, {removed} removed")
+        return report
+
+    def _publish(self, collection: str, version: int, matrix: np.ndarray, ids: List[Any],
+                 points: Dict[Any, Tuple[Any, Any, Any]], write_matrix: bool) -> None:
+        """Matrix first, then the manifest (atomic rename): readers never see a manifest without its matrix."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{collection}.{version}.f32"
+        if write_matrix or not os.path.exists(self._path(name)):
+            tmp = self._path(f".{name}.{os.getpid()}")
+            matrix.tofile(tmp)
+            os.replace(tmp, self._path(name))
+        manifest = {
+            "version": version,
+            "synced_at": time.time(),
+            "dim": int(matrix.shape[1]),
+            "matrix": name,
+            "ids": ids,
+            "match_ids": [points[pid][0] for pid in ids],
+            "sections": [points[pid][1] for pid in ids],
+            "stamps": [points[pid][2] for pid in ids],
+        }
+        tmp = self._path(f".{collection}.json.{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp, self._path(f"{collection}.json"))
+        # the previous generation stays for readers that mapped it just before the switch
+        for file in os.listdir(self.directory):
+            prefix, _, rest = file.partition(f"{collection}.")
+            if prefix == "" and rest.endswith(".f32") and rest[:-4].isdigit() and int(rest[:-4]) < version - 1:
+                os.remove(self._path(file))
+
+    def stats(self, collections: List[str]) -> Dict[str, Any]:
+        out = {}
+        for collection in collections:
+            snap = self.snapshot(collection)
+            out[collection] = None if snap is None else {
+                "version": snap.version,
+                "rows": len(snap.ids),
+                "matches": len(set(snap.match_ids)),
+                "bytes": int(snap.matrix.nbytes),
+                "age_s": round(time.time() - snap.synced_at, 1),
+            }
+        out["stale_hits"] = metrics.counter("vector_mirror.stale_hits")
+        return out
+
+
+# Shared by the cron (syncs after embedding runs) and user (searches) controllers; other processes read the same files
+vector_mirror = VectorMirror()
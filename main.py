@@ -1,18 +1,26 @@
 # === main.py ===
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse
 import uvicorn
-from config.settings import PORT
+from config.settings import PORT, REFRESH_SCHEDULER_ENABLED, REFRESH_TICK_SECONDS, RESPONSE_GZIP_MIN_BYTES, RESPONSE_GZIP_LEVEL
 from routes.cron_routes import router as cron_routes
 from routes.admin_routes import router as admin_routes
 from routes.user_routes import router as user_routes
+from controllers.cron_controller import get_refresh_scheduler
 
-app = FastAPI(title="Prediction App")
+app = FastAPI(title="Prediction App", default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_GZIP_MIN_BYTES, compresslevel=RESPONSE_GZIP_LEVEL)
 
 app.include_router(cron_routes, prefix="/cron", tags=["Prediction App Cron Service"])
 app.include_router(admin_routes, prefix="/admin", tags=["Prediction App Admin Service"])
 app.include_router(user_routes, prefix="/user", tags=["Prediction App User Service"])
 
+@app.on_event("startup")
+def start_refresh_scheduler():
+    if REFRESH_SCHEDULER_ENABLED:
+        get_refresh_scheduler().start(REFRESH_TICK_SECONDS)
+
 @app.get("/", response_class=HTMLResponse)
 def root():
     return """
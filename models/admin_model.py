@@ -21,6 +21,10 @@ def convert_decimals(obj):
     
 class AdminModel:
     def __init__(self):
+        self.connect()
+
+    def connect(self):
+        """(Re)create the Mongo client; called again in each worker after fork (MongoClient is not fork-safe)."""
         try:
             self.mongo_client = MongoClient(MONGO_URL)
             self.mongo_db = self.mongo_client[MONGO_DB]
@@ -1,15 +1,25 @@
 # === models/cron_model.py ===
 from pymongo import MongoClient
-from config.settings import MONGO_URL, MONGO_DB
+from config.settings import MONGO_URL, MONGO_DB, MATCH_STATS_CACHE_TTL, FAQ_COLLECTION, POINTS_VERSION_CACHE_TTL
 from utils.logger import get_logger
+from utils.cache import TTLCache
+from models.match_types import MatchDetails, MatchStats, decode
 from decimal import Decimal
+from uuid import uuid4
 
-from bson.json_util import dumps
-import json
+import msgspec
 
 logger = get_logger(__name__)
 
+# match_stats by match_id for the question fast path; dropped on every upsert in this process
+match_stats_cache = TTLCache(maxsize=1024, ttl=MATCH_STATS_CACHE_TTL)
+
+# match_details.points_version by match_id; what the semantic cache checks its entries against
+points_version_cache = TTLCache(maxsize=4096, ttl=POINTS_VERSION_CACHE_TTL)
+
 def convert_decimals(obj):
+    if isinstance(obj, msgspec.Struct):
+        return msgspec.to_builtins(obj)
     if isinstance(obj, dict):
         return {k: convert_decimals(v) for k, v in obj.items()}
     elif isinstance(obj, list):
@@ -21,6 +31,10 @@ def convert_decimals(obj):
     
 class CronModel:
     def __init__(self):
+        self.connect()
+
+    def connect(self):
+        """(Re)create the Mongo client; called again in each worker after fork (MongoClient is not fork-safe)."""
         try:
             self.mongo_client = MongoClient(MONGO_URL)
             self.mongo_db = self.mongo_client[MONGO_DB]
@@ -29,7 +43,7 @@ class CronModel:
             logger.error(f"Initialization failed: {e}")
             raise
 
-    def upsert_match_detail_by_id(self, match_id: str, match_data: dict, collection: str = "match_details"):
+    def upsert_match_detail_by_id(self, match_id: str, match_data, collection: str = "match_details"):
         try:
             sanitized_data = convert_decimals(match_data)
             result = self.mongo_db[collection].update_one(
@@ -47,7 +61,7 @@ class CronModel:
             logger.error(f"Error in upsert_match_by_id: {e}")
             return {"status": "error", "message": str(e)}
         
-    def upsert_match_stats_by_id(self, match_id: str, match_data: dict, collection: str = "match_stats"):
+    def upsert_match_stats_by_id(self, match_id: str, match_data, collection: str = "match_stats"):
         try:
             sanitized_data = convert_decimals(match_data)
             result = self.mongo_db[collection].update_one(
@@ -55,6 +69,7 @@ class CronModel:
                 {"$set": sanitized_data},
                 upsert=True
             )
+            match_stats_cache.invalidate(str(match_id))
             if result.matched_count:
                 logger.info(f"Match updated for match_id: {match_id}")
                 return {"status": "updated", "match_id": match_id}
@@ -68,7 +83,7 @@ class CronModel:
     def get_match_description(self, description_type: str):
         try:
             description_data = self.mongo_db.match_descriptions.find_one({"description_type": description_type},{"_id": 0})
-            return json.loads(dumps(description_data)) if description_data else {}
+            return description_data or {}
         except Exception as e:
             logger.error(f"Error in get_match_description: {e}")
             return {}
@@ -76,7 +91,7 @@ class CronModel:
     def get_match_details_by_id(self, match_id: str):
         try:
             match_data = self.mongo_db.match_details.find_one({"match_id": match_id},{"_id": 0})
-            return json.loads(dumps(match_data)) if match_data else {}
+            return match_data or {}
         except Exception as e:
             logger.error(f"Error in get_match_details_by_id: {e}")
             return {}
@@ -84,7 +99,112 @@ class CronModel:
     def get_match_stats_by_id(self, match_id: str):
         try:
             match_data = self.mongo_db.match_stats.find_one({"match_id": match_id},{"_id": 0})
-            return json.loads(dumps(match_data)) if match_data else {}
+            return match_data or {}
         except Exception as e:
             logger.error(f"Error in get_match_stats_by_id: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+    def get_match_details(self, match_id: str):
+        """Typed MatchDetails for a match_id, or None."""
+        try:
+            return decode(self.get_match_details_by_id(match_id), MatchDetails)
+        except msgspec.ValidationError as e:
+            logger.error(f"Invalid match_details for {match_id}: {e}")
+            return None
+
+    def get_match_stats(self, match_id: str):
+        """Typed MatchStats for a match_id, or None."""
+        try:
+            return decode(self.get_match_stats_by_id(match_id), MatchStats)
+        except msgspec.ValidationError as e:
+            logger.error(f"Invalid match_stats for {match_id}: {e}")
+            return None
+
+    def mark_sections_embedded(self, collection: str, match_id: str, sections_field: str, fingerprints: dict):
+        """Record which section fingerprints are now in Qdrant, so unchanged sections are not re-embedded."""
+        if not fingerprints:
+            return
+        try:
+            self.mongo_db[collection].update_one(
+                {"match_id": match_id},
+                {"$set": {f"{sections_field}.{name}.embedded": fp for name, fp in fingerprints.items()}},
+            )
+        except Exception as e:
+            logger.error(f"Error in mark_sections_embedded: {e}")
+
+    def bump_points_version(self, match_id: str):
+        """New points_version on the match_details document: every process drops the match's cached results."""
+        version = uuid4().hex  # never repeats, even if the field was lost in between
+        try:
+            self.mongo_db.match_details.update_one({"match_id": str(match_id)}, {"$set": {"points_version": version}})
+            points_version_cache.set(str(match_id), version)
+        except Exception as e:
+            logger.error(f"Error in bump_points_version: {e}")
+
+    def get_points_version_cached(self, match_id: str):
+        """points_version of a match ("" when it has none) behind a short in-process TTL cache."""
+        key = str(match_id)
+        version = points_version_cache.get(key)
+        if version is None:
+            try:
+                doc = self.mongo_db.match_details.find_one({"match_id": key}, {"_id": 0, "points_version": 1})
+            except Exception as e:
+                logger.error(f"Error in get_points_version_cached: {e}")
+                return None
+            version = (doc or {}).get("points_version", "")
+            points_version_cache.set(key, version)
+        return version
+
+    def get_match_stats_cached(self, match_id: str):
+        """get_match_stats_by_id behind an in-process TTL cache."""
+        key = str(match_id)
+        match_data = match_stats_cache.get(key)
+        if match_data is None:
+            match_data = self.get_match_stats_by_id(key)
+            if match_data:
+                match_stats_cache.set(key, match_data)
+        return match_data
+
+    def upsert_match_faq(self, match_id: str, faq: str, faq_doc: dict):
+        """One precomputed FAQ answer per (match_id, faq key)."""
+        try:
+            self.mongo_db[FAQ_COLLECTION].update_one(
+                {"match_id": str(match_id), "faq": faq},
+                {"$set": {**faq_doc, "match_id": str(match_id), "faq": faq}},
+                upsert=True,
+            )
+            return {"status": "ok", "match_id": match_id, "faq": faq}
+        except Exception as e:
+            logger.error(f"Error in upsert_match_faq: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def get_match_faqs(self, match_id: str):
+        """Precomputed FAQ answers of a match: faq key -> document."""
+        try:
+            cursor = self.mongo_db[FAQ_COLLECTION].find({"match_id": str(match_id)}, {"_id": 0})
+            return {doc["faq"]: doc for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error in get_match_faqs: {e}")
+            return {}
+
+    def get_active_match_details(self, since: str):
+        """match_details documents scheduled at/after `since` ("YYYY-MM-DD HH:MM:SS" sorts as a string)."""
+        try:
+            cursor = self.mongo_db.match_details.find(
+                {"match_scheduled_date": {"$gte": since}},
+                {"_id": 0, "match_details_summary": 0},
+            )
+            return list(cursor)
+        except Exception as e:
+            logger.error(f"Error in get_active_match_details: {e}")
+            return []
+
+    def iter_match_documents(self, collection: str, summary_field: str, batch_size: int = 500):
+        """Stream every document of `collection` that has a non-empty summary (used by the reindex CLI)."""
+        cursor = self.mongo_db[collection].find(
+            {summary_field: {"$nin": [None, ""]}},
+            {"_id": 0},
+            batch_size=batch_size,
+        )
+        for doc in cursor:
+            yield convert_decimals(doc)
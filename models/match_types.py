@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional, Union
+
+import msgspec
+
+# Upstream ids and stats arrive as either strings or numbers; keep whatever was sent
+Id = Union[str, int]
+Number = Union[int, float, str]
+
+# Fields copied from a match document into the Qdrant point payload (the one projection)
+PAYLOAD_FIELDS = (
+    "match_id", "away_team", "away_team_id", "away_team_name", "ground_name",
+    "home_team", "home_team_id", "home_team_name", "league_id", "league_name",
+    "match_format", "match_title", "match_scheduled_date", "venue_id",
+)
+
+
+class SquadPlayer(msgspec.Struct, kw_only=True, omit_defaults=True, gc=False):
+    team_id: Optional[Id] = None
+    player_id: Optional[Id] = None
+    full_name: Optional[str] = None
+    nick_name: Optional[str] = None
+    position: Optional[str] = None
+    last_match_played: Optional[Id] = None
+
+    @classmethod
+    def from_upstream(cls, player: Dict[str, Any]) -> "SquadPlayer":
+        """Map a SOURCE_URL_4 squad entry."""
+        return cls(
+            team_id=player.get("team_uid"),
+            player_id=player.get("player_uid"),
+            full_name=player.get("full_name"),
+            nick_name=player.get("nick_name"),
+            position=player.get("position"),
+            last_match_played=player.get("last_match_played"),
+        )
+
+
+class SummarySection(msgspec.Struct, kw_only=True, omit_defaults=True, gc=False):
+    """One named part of a match summary; `embedded` is the fingerprint last pushed to Qdrant."""
+
+    text: str
+    fingerprint: str
+    embedded: Optional[str] = None
+
+
+class MatchBase(msgspec.Struct, kw_only=True, omit_defaults=True, gc=False):
+    """Fixture + SOURCE_URL_1 fields shared by match_details and match_stats."""
+
+    match_id: Id = ""
+    league_id: Id = ""
+    league_name: str = ""
+    home_team: str = ""
+    away_team: str = ""
+    match_format: Id = ""
+    match_scheduled_date: str = ""
+    lineup_announce: Id = ""
+    ground_name: Optional[str] = None
+    venue_id: Optional[Id] = None
+    match_title: Optional[str] = None
+    home_team_id: Optional[Id] = None
+    away_team_id: Optional[Id] = None
+    home_team_name: Optional[str] = None
+    away_team_name: Optional[str] = None
+
+    @staticmethod
+    def base_fields(fixture: Dict[str, Any], result_1_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Keyword arguments for the shared fields from a SOURCE_URL fixture and SOURCE_URL_1 data."""
+        fields = {
+            "match_id": fixture.get("season_game_uid", ""),
+            "league_id": fixture.get("league_id", ""),
+            "league_name": fixture.get("league_name", ""),
+            "home_team": fixture.get("home", ""),
+            "away_team": fixture.get("away", ""),
+            "match_format": fixture.get("format", ""),
+            "match_scheduled_date": fixture.get("season_scheduled_date", ""),
+            "lineup_announce": fixture.get("playing_announce", ""),
+        }
+        if result_1_data:
+            fields.update(
+                ground_name=result_1_data.get("ground_name", ""),
+                venue_id=result_1_data.get("venue_id", ""),
+                match_title=result_1_data.get("subtitle", ""),
+                home_team_id=result_1_data.get("home_uid", ""),
+                away_team_id=result_1_data.get("away_uid", ""),
+                home_team_name=result_1_data.get("home_team", ""),
+                away_team_name=result_1_data.get("away_team", ""),
+            )
+        return fields
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in PAYLOAD_FIELDS}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return msgspec.to_builtins(self)
+
+
+class MatchDetails(MatchBase, kw_only=True, omit_defaults=True, gc=False):
+    home_team_squad: List[SquadPlayer] = []
+    away_team_squad: List[SquadPlayer] = []
+    match_details_summary: Optional[str] = None
+    match_details_sections: Dict[str, SummarySection] = {}
+
+
+class MatchStats(MatchBase, kw_only=True, omit_defaults=True, gc=False):
+    bat_first_win_on_this_venue: Optional[Number] = None
+    bat_second_win_on_this_venue: Optional[Number] = None
+    total_matches_played_on_this_venue: Optional[Number] = None
+    pitch_support_type: Optional[Number] = None
+    bowling_support_type: Optional[Number] = None
+    avg_first_inning_score: Optional[Number] = None
+    avg_second_inning_score: Optional[Number] = None
+    avg_first_inning_wicket: Optional[Number] = None
+    avg_second_inning_wicket: Optional[Number] = None
+    pitch_support_description: Optional[str] = None
+    bowling_support_description: Optional[str] = None
+    weather_report_description: Optional[str] = None
+    temperature: Optional[Number] = None
+    clouds: Optional[Number] = None
+    weather: Optional[str] = None
+    humidity: Optional[Number] = None
+    visibility: Optional[Number] = None
+    wind_speed: Optional[Number] = None
+    weather_desc: Optional[str] = None
+    home_team_score_prediction: Optional[Number] = None
+    home_team_wicket_prediction: Optional[Number] = None
+    away_team_score_prediction: Optional[Number] = None
+    away_team_wicket_prediction: Optional[Number] = None
+    win_team_id: Optional[Id] = None
+    win_team_name: Optional[str] = None
+    win_team_win_probability: Optional[Number] = None
+    win_team_run: Optional[Number] = None
+    win_team_wicket: Optional[Number] = None
+    match_stats_summary: Optional[str] = None
+    match_stats_sections: Dict[str, SummarySection] = {}
+
+
+def decode(doc: Optional[Dict[str, Any]], type_: type) -> Any:
+    """Typed view of a Mongo document (unknown keys such as _id are ignored)."""
+    if not doc:
+        return None
+    return msgspec.convert(doc, type_, strict=False)
+
+
+json_encode = msgspec.json.Encoder().encode
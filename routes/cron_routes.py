@@ -1,6 +1,7 @@
 # === routes/cron_routes.py ===
 from fastapi import APIRouter, Body
-from controllers.cron_controller import get_upcoming_matches_list, get_upcoming_matches_cron, get_upcoming_matches_embeding
+from typing import Optional
+from controllers.cron_controller import get_upcoming_matches_list, get_upcoming_matches_cron, get_upcoming_matches_embeding, prune_finished_matches, run_cron_worker_cycle, run_refresh_tick
 
 router = APIRouter()
 
@@ -14,4 +15,16 @@ def get_upcoming_matches_cron_get():
 
 @router.get("/get_upcoming_matches_embeding")
 def get_upcoming_matches_embeding_get():
-    return get_upcoming_matches_embeding()
\ No newline at end of file
+    return get_upcoming_matches_embeding()
+
+@router.get("/prune_finished_matches")
+def prune_finished_matches_get(days: Optional[int] = None, archive: bool = True):
+    return prune_finished_matches(days, archive)
+
+@router.get("/run_cron_worker_cycle")
+def run_cron_worker_cycle_get(cycle: Optional[str] = None):
+    return run_cron_worker_cycle(cycle)
+
+@router.get("/run_refresh_tick")
+def run_refresh_tick_get():
+    return run_refresh_tick()
\ No newline at end of file
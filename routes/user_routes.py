@@ -1,9 +1,42 @@
 # === routes/user_routes.py ===
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Body
-from controllers.user_controller import handle_user_question
+from fastapi.responses import StreamingResponse
+from config.settings import CROSS_MATCH_TOP_K
+from controllers.user_controller import handle_user_question, handle_user_questions_batch, stream_user_question, handle_cross_match_question
 
 router = APIRouter()
 
+# Payload projection of the search hits (see libraries/payload_projection.py), all optional
+INCLUDE = Body(None, embed=True, description="Payload fields to return (default: all)")
+EXCLUDE = Body(None, embed=True, description="Payload fields to drop")
+SNIPPET_CHARS = Body(None, embed=True, description="Cut 'text' to this many chars around the best match; 0 = full text")
+
 @router.post("/handle_user_question")
-def handle_user_question_post(match_id: int, question: str = Body(..., embed=True)):
-    return handle_user_question(match_id, question)
\ No newline at end of file
+def handle_user_question_post(match_id: Optional[int] = None, question: str = Body(..., embed=True), answer: bool = False,
+                              include: Optional[List[str]] = INCLUDE, exclude: Optional[List[str]] = EXCLUDE,
+                              snippet_chars: Optional[int] = SNIPPET_CHARS):
+    return handle_user_question(match_id, question, include, exclude, snippet_chars, answer)
+
+@router.post("/handle_user_questions_batch")
+def handle_user_questions_batch_post(items: List[Dict[str, Any]] = Body(..., embed=True),
+                                     include: Optional[List[str]] = INCLUDE, exclude: Optional[List[str]] = EXCLUDE,
+                                     snippet_chars: Optional[int] = SNIPPET_CHARS):
+    return handle_user_questions_batch(items, include, exclude, snippet_chars)
+
+@router.post("/handle_cross_match_question")
+def handle_cross_match_question_post(question: str = Body(..., embed=True), top_k: int = CROSS_MATCH_TOP_K,
+                                     include: Optional[List[str]] = INCLUDE, exclude: Optional[List[str]] = EXCLUDE,
+                                     snippet_chars: Optional[int] = SNIPPET_CHARS):
+    return handle_cross_match_question(question, top_k, include, exclude, snippet_chars)
+
+@router.post("/handle_user_question_stream")
+def handle_user_question_stream_post(match_id: Optional[int] = None, question: str = Body(..., embed=True), answer: bool = False,
+                                     include: Optional[List[str]] = INCLUDE, exclude: Optional[List[str]] = EXCLUDE,
+                                     snippet_chars: Optional[int] = SNIPPET_CHARS):
+    return StreamingResponse(
+        stream_user_question(match_id, question, answer, include, exclude, snippet_chars),
+        media_type="text/event-stream",
+        # "identity" keeps GZipMiddleware off the stream: gzip would hold events back in its buffer
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
\ No newline at end of file
@@ -0,0 +1,96 @@
+# audit_payload_indexes.py
+#
+# Compare each collection's live payload_schema with PAYLOAD_INDEX_SCHEMA, report the
+# estimated memory of every index, and optionally drop/rebuild the wrong ones.
+#
+#   python scripts/audit_payload_indexes.py                  # report only
+#   python scripts/audit_payload_indexes.py --fix --benchmark  # fix + filtered-search latency before/after
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Filter as QFilter, FieldCondition, MatchValue
+
+from config.settings import QDRANT_URL, QDRANT_API_KEY, EMBEDDING_DIM, PAYLOAD_INDEX_SCHEMA
+from libraries.payload_schema import audit_collection, fix_collection
+
+
+def print_report(rows: List[Dict]) -> None:
+    print(f"\n{'collection':<16} {'field':<24} {'expected':<15} {'actual':<15} {'points':>8} {'est_KB':>9}  status")
+    for r in rows:
+        print(
+            f"{r['collection']:<16} {r['field']:<24} {str(r['expected'] or '-'):<15} {str(r['actual'] or '-'):<15} "
+            f"{r['points']:>8} {r['est_bytes'] / 1024:>9.1f}  {r['status']}"
+        )
+    wasted = sum(r["est_bytes"] for r in rows if r["status"] in {"unexpected", "wrong_type"})
+    print(f"\n≈ {wasted / 1024:.1f} KB held by unexpected or wrongly typed indexes")
+
+
+def wait_for_green(client: QdrantClient, collection: str, timeout: float = 120.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = getattr(client.get_collection(collection).status, "value", "")
+        if status == "green":
+            return
+        time.sleep(0.5)
+    print(f"   ⚠️ {collection} still optimizing after {timeout}s")
+
+
+def benchmark_filtered_search(client: QdrantClient, collection: str, queries: int) -> Dict[str, float]:
+    """p50/p95 of match_id-filtered searches with random query vectors."""
+    records, _ = client.scroll(collection_name=collection, limit=256, with_payload=["match_id"], with_vectors=False)
+    match_ids = [r.payload.get("match_id") for r in records if r.payload and r.payload.get("match_id") is not None]
+    if not match_ids:
+        return {}
+    timings = []
+    for _ in range(queries):
+        vector = [random.uniform(-1, 1) for _ in range(EMBEDDING_DIM)]
+        qfilter = QFilter(must=[FieldCondition(key="match_id", match=MatchValue(value=random.choice(match_ids)))])
+        started = time.perf_counter()
+        client.search(collection_name=collection, query_vector=vector, query_filter=qfilter, limit=5, with_payload=False)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {"p50": timings[len(timings) // 2], "p95": timings[int(len(timings) * 0.95) - 1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit Qdrant payload indexes against PAYLOAD_INDEX_SCHEMA")
+    parser.add_argument("--collections", nargs="+", default=list(PAYLOAD_INDEX_SCHEMA))
+    parser.add_argument("--fix", action="store_true", help="drop unexpected/wrong indexes and rebuild missing ones")
+    parser.add_argument("--benchmark", action="store_true", help="time match_id-filtered search before/after --fix")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+
+    for collection in args.collections:
+        rows = audit_collection(client, collection)
+        print_report(rows)
+
+        before = benchmark_filtered_search(client, collection, args.queries) if args.benchmark else {}
+        if args.fix and any(r["status"] != "ok" for r in rows):
+            result = fix_collection(client, collection, rows)
+            print(f"\n🔧 {collection}: dropped {result['dropped']}, created {result['created']}")
+            wait_for_green(client, collection)
+            print_report(audit_collection(client, collection))
+
+        if args.benchmark:
+            after = benchmark_filtered_search(client, collection, args.queries) if args.fix else {}
+            print(f"\n⏱️ {collection} filtered search (ms): before p50={before.get('p50', 0):.2f} p95={before.get('p95', 0):.2f}", end="")
+            if after:
+                print(f" | after p50={after['p50']:.2f} p95={after['p95']:.2f}")
+            else:
+                print()
+
+    print("\n🎉 Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmark_fixture_leases.py
+#
+# Offline scaling benchmark for leased cron workers. Each worker runs run_leased() over the
+# same fixture list against a shared in-memory lease store; processing a fixture sleeps for
+# the simulated upstream + LLM latency. Reports throughput, speedup over one worker and
+# duplicate processing (must be 0). --crash leaves one fixture leased by a dead worker; it
+# is taken over once that lease expires.
+#
+#   python scripts/benchmark_fixture_leases.py --fixtures 200 --workers 1 2 4 8 --latency 0.05
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from libraries.fixture_leases import FixtureLeaseManager, MemoryLeaseStore, run_leased
+
+
+def run(n_workers: int, fixtures, latency: float, ttl: float, heartbeat: float, crash: bool):
+    store = MemoryLeaseStore()
+    processed = Counter()
+    lock = threading.Lock()
+    results = []
+
+    if crash:
+        # a worker that died right after leasing the first fixture: no heartbeat, no release
+        store.acquire(fixtures[0]["season_game_uid"], "crashed-worker", "bench", ttl)
+
+    def process(fixture, still_owner):
+        time.sleep(latency)
+        if not still_owner():
+            return False
+        with lock:
+            processed[fixture["season_game_uid"]] += 1
+        return True
+
+    def worker(i: int):
+        leases = FixtureLeaseManager(store, worker_id=f"bench-{i}", ttl=ttl, heartbeat=heartbeat)
+        # repeated passes, like scripts/cron_worker.py, until every fixture is done
+        while len(processed) < len(fixtures):
+            stats = run_leased(fixtures, leases, "bench", process)
+            results.append(stats)
+            if not stats["processed"]:
+                time.sleep(0.01)  # the rest is leased by others (or expiring)
+        leases.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "elapsed": elapsed,
+        "done": len(processed),
+        "duplicates": sum(c - 1 for c in processed.values()),
+        "lost": sum(r["lost"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of N leased cron workers over one fixture list")
+    parser.add_argument("--fixtures", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per fixture")
+    parser.add_argument("--ttl", type=float, default=1.0)
+    parser.add_argument("--heartbeat", type=float, default=0.25)
+    parser.add_argument("--crash", action="store_true", help="start with one fixture leased by a dead worker")
+    args = parser.parse_args()
+
+    fixtures = [{"season_game_uid": str(90000 + i)} for i in range(args.fixtures)]
+    print(f"\n{'workers':>7} {'seconds':>8} {'fixtures/s':>11} {'speedup':>8} {'done':>6} {'dupes':>6} {'lost':>5}")
+    base = None
+    for n in args.workers:
+        r = run(n, fixtures, args.latency, args.ttl, args.heartbeat, args.crash)
+        rate = r["done"] / r["elapsed"]
+        base = base or rate
+        print(f"{n:>7} {r['elapsed']:>8.2f} {rate:>11.1f} {rate / base:>7.2f}x {r['done']:>6} {r['duplicates']:>6} {r['lost']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmark_match_serialization.py
+#
+# Per-fixture cost of the old dict path vs the typed msgspec models, using the sample
+# documents in documents/. Old path: Mongo doc -> bson.json_util round trip -> hand-copied
+# metadata dict -> json.dumps for the prompt. New path: Mongo doc -> MatchDetails/MatchStats
+# -> to_payload() -> msgspec encode.
+#
+#   python scripts/benchmark_match_serialization.py --repeat 20000
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bson.json_util import dumps
+
+from models.match_types import PAYLOAD_FIELDS, MatchDetails, MatchStats, decode, json_encode
+
+DOCUMENTS = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "documents"))
+
+
+def load(name: str) -> dict:
+    with open(os.path.join(DOCUMENTS, name), encoding="utf-8") as f:
+        doc = json.load(f)
+    doc.pop("_id", None)
+    return doc
+
+
+def dict_path(details: dict, stats: dict) -> int:
+    details = json.loads(dumps(details))
+    stats = json.loads(dumps(stats))
+    metadata = [{field: record.get(field) for field in PAYLOAD_FIELDS} for record in (details, stats)]
+    return len(json.dumps(details, separators=(",", ":"))) + len(json.dumps(stats, separators=(",", ":"))) + len(metadata)
+
+
+def typed_path(details: dict, stats: dict) -> int:
+    details = decode(details, MatchDetails)
+    stats = decode(stats, MatchStats)
+    metadata = [details.to_payload(), stats.to_payload()]
+    return len(json_encode(details)) + len(json_encode(stats)) + len(metadata)
+
+
+def measure(fn, details: dict, stats: dict, repeat: int) -> dict:
+    seconds = min(timeit.repeat(lambda: fn(details, stats), number=repeat, repeat=3))
+    tracemalloc.start()
+    for _ in range(100):
+        fn(details, stats)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us_per_fixture": seconds / repeat * 1e6, "peak_kb": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dict vs typed match serialization")
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    details = load("match_details_json.json")
+    stats = load("match_stats_json.json")
+
+    results = {
+        "dict + bson.json_util": measure(dict_path, details, stats, args.repeat),
+        "typed + msgspec": measure(typed_path, details, stats, args.repeat),
+    }
+    print(f"\n{'path':<24} {'µs/fixture':>12} {'peak KB':>10}")
+    for name, r in results.items():
+        print(f"{name:<24} {r['us_per_fixture']:>12.1f} {r['peak_kb']:>10.1f}")
+
+    base, new = results["dict + bson.json_util"], results["typed + msgspec"]
+    print(f"\n⚡ {base['us_per_fixture'] / new['us_per_fixture']:.1f}x faster per fixture")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmark_micro_batching.py
+#
+# Throughput vs added latency of MicroBatchEmbedder (libraries/embeddings.py) against direct
+# embed_query calls, for a number of concurrent clients each embedding questions back to back.
+# Every config is "max_wait_ms:max_batch"; pick EMBED_BATCH_MAX_WAIT_MS / EMBED_BATCH_MAX_SIZE
+# from the row that meets the latency budget at the expected concurrency.
+#
+# Uses the real EMBEDDING_MODEL by default. --simulate FIXED_MS,PER_ITEM_MS replaces it with a
+# single-core cost model (one pass costs FIXED + PER_ITEM * batch size, passes never overlap),
+# for tuning on machines without the model.
+#
+#   python scripts/benchmark_micro_batching.py --clients 1 8 32 --configs 0:32 2:32 5:64
+#   python scripts/benchmark_micro_batching.py --simulate 8,0.5 --clients 1 8 32
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from libraries.embeddings import MicroBatchEmbedder
+from utils.metrics import metrics
+
+QUESTIONS = [
+    "Who will win the match today?",
+    "Is the pitch good for spinners?",
+    "Which players should I captain for fantasy?",
+    "What is the weather forecast for the game?",
+    "How many runs will the home team score?",
+    "Compare the bowling attacks of both teams",
+]
+
+
+class SimulatedModel:
+    """embed_documents that costs fixed + per_item * n milliseconds on one shared core."""
+
+    def __init__(self, fixed_ms: float, per_item_ms: float, dim: int = 384):
+        self.fixed = fixed_ms / 1000
+        self.per_item = per_item_ms / 1000
+        self.dim = dim
+        self._core = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._core:
+            time.sleep(self.fixed + self.per_item * len(texts))
+        return [[float(len(t))] * self.dim for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def run(embedder, clients: int, duration: float):
+    latencies = []
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(i: int):
+        n = i
+        local = []
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            embedder.embed_query(QUESTIONS[n % len(QUESTIONS)])
+            local.append((time.perf_counter() - started) * 1000)
+            n += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * (len(latencies) - 1)))]
+    return {"qps": len(latencies) / elapsed, "p50": pct(50), "p95": pct(95)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MicroBatchEmbedder throughput vs latency")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--configs", nargs="+", default=["0:32", "2:32", "5:64"], help="max_wait_ms:max_batch")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per row")
+    parser.add_argument("--simulate", default=None, help="FIXED_MS,PER_ITEM_MS cost model instead of the real model")
+    args = parser.parse_args()
+
+    if args.simulate:
+        fixed_ms, per_item_ms = (float(v) for v in args.simulate.split(","))
+        base = SimulatedModel(fixed_ms, per_item_ms)
+    else:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from config.settings import EMBEDDING_MODEL
+        base = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        base.embed_query("warm up")
+
+    print(f"\n{'clients':>7} {'mode':>12} {'q/s':>8} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'avg batch':>10}")
+    for clients in args.clients:
+        direct = run(base, clients, args.duration)
+        print(f"{clients:>7} {'direct':>12} {direct['qps']:>8.1f} {1:>7.2f}x {direct['p50']:>8.2f} {direct['p95']:>8.2f} {1:>10.1f}")
+        for config in args.configs:
+            wait_ms, max_batch = config.split(":")
+            embedder = MicroBatchEmbedder(base, max_batch=int(max_batch), max_wait_ms=float(wait_ms))
+            batches, items = metrics.counter("embed.batches"), metrics.counter("embed.items")
+            r = run(embedder, clients, args.duration)
+            avg_batch = (metrics.counter("embed.items") - items) / max(metrics.counter("embed.batches") - batches, 1)
+            print(f"{clients:>7} {'batch ' + config:>12} {r['qps']:>8.1f} {r['qps'] / direct['qps']:>7.2f}x "
+                  f"{r['p50']:>8.2f} {r['p95']:>8.2f} {avg_batch:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmark_payload_projection.py
+#
+# Response size and serialization time of a /user/handle_user_question response with the full
+# hit payloads vs the PayloadProjection variants (libraries/payload_projection.py), gzipped or not.
+# Hits come from an in-memory Qdrant seeded with the match in documents/ (one point per summary
+# section, payload as pushed by QdrantMatchPusher, section texts padded to --text-chars like the
+# LLM summaries) and random vectors, so no model, cluster or Mongo is needed.
+#
+#   python scripts/benchmark_payload_projection.py --text-chars 3000 --repeat 500
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import orjson
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, FieldCondition, Filter, MatchValue, PointStruct, VectorParams
+
+from config.settings import RESPONSE_GZIP_LEVEL, SEARCH_SNIPPET_CHARS
+from libraries.payload_projection import PayloadProjection
+from libraries.section_summaries import SECTIONS
+from models.match_types import PAYLOAD_FIELDS
+
+DOCUMENTS = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "documents"))
+COLLECTIONS = ("match_details", "match_stats")
+DIM = 384
+QUESTION = "Which bowlers suit the pitch and the weather at the venue?"
+
+
+def seed(client: QdrantClient, n_matches: int, text_chars: int) -> str:
+    with open(os.path.join(DOCUMENTS, "match_details_json.json"), encoding="utf-8") as f:
+        details = json.load(f)
+    base = {field: details.get(field) for field in PAYLOAD_FIELDS}
+    rng = random.Random(7)
+    # varied sentences from the match's own vocabulary, so gzip sees text rather than one repeated line
+    words = sorted(set(json.dumps(details).replace('"', " ").replace(",", " ").split())) + QUESTION.lower().split()
+    for collection in COLLECTIONS:
+        client.create_collection(collection, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+        points = []
+        for m in range(n_matches):
+            for s, section in enumerate(SECTIONS):
+                text = f"{section.title}."
+                while len(text) < text_chars:
+                    text += " " + " ".join(rng.choice(words) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                text = text[:text_chars]
+                points.append(PointStruct(
+                    id=m * len(SECTIONS) + s,
+                    vector=[rng.random() for _ in range(DIM)],
+                    payload={**base, "match_id": str(int(base["match_id"]) + m), "section": section.name, "text": text},
+                ))
+        client.upsert(collection, points)
+    return str(base["match_id"])
+
+
+def measure(client: QdrantClient, match_id: str, projection, repeat: int) -> dict:
+    qfilter = Filter(must=[FieldCondition(key="match_id", match=MatchValue(value=match_id))])
+    vector = [0.5] * DIM
+    search_s = shape_s = encode_s = gzip_s = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        results = {
+            c: [{"id": r.id, "payload": r.payload, "score": r.score} for r in client.search(
+                c, query_vector=vector, query_filter=qfilter, limit=5,
+                with_payload=projection.selector() if projection else True)]
+            for c in COLLECTIONS
+        }
+        t1 = time.perf_counter()
+        if projection:
+            results = projection.apply_results(results, QUESTION)
+        t2 = time.perf_counter()
+        body = orjson.dumps({"match_id": match_id, "results": results})
+        t3 = time.perf_counter()
+        compressed = gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL)
+        t4 = time.perf_counter()
+        search_s += t1 - t0
+        shape_s += t2 - t1
+        encode_s += t3 - t2
+        gzip_s += t4 - t3
+    return {
+        "bytes": len(body), "gzip_bytes": len(compressed),
+        "search_ms": search_s / repeat * 1000, "project_ms": shape_s / repeat * 1000,
+        "encode_ms": encode_s / repeat * 1000, "gzip_ms": gzip_s / repeat * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload projection: response size and serialization time")
+    parser.add_argument("--matches", type=int, default=20)
+    parser.add_argument("--text-chars", type=int, default=3000, help="length of each section text")
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--snippet-chars", type=int, default=SEARCH_SNIPPET_CHARS or 400, help="snippet length of the cut variants")
+    args = parser.parse_args()
+
+    client = QdrantClient(location=":memory:")
+    match_id = seed(client, args.matches, args.text_chars)
+
+    variants = {
+        "full payload": None,
+        f"snippet {args.snippet_chars}": PayloadProjection(snippet_chars=args.snippet_chars),
+        "exclude text": PayloadProjection(exclude=["text"]),
+        "include 3 fields": PayloadProjection(include=["match_id", "section", "text"], snippet_chars=args.snippet_chars),
+    }
+    print(f"\n{'variant':>18} {'bytes':>8} {'gzip':>7} {'search ms':>10} {'project ms':>11} {'encode ms':>10} {'gzip ms':>8}")
+    for name, projection in variants.items():
+        r = measure(client, match_id, projection, args.repeat)
+        print(f"{name:>18} {r['bytes']:>8} {r['gzip_bytes']:>7} {r['search_ms']:>10.3f} {r['project_ms']:>11.3f} "
+              f"{r['encode_ms']:>10.3f} {r['gzip_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
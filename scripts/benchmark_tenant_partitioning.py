@@ -0,0 +1,155 @@
+# benchmark_tenant_partitioning.py
+#
+# Filtered search latency as the number of stored matches grows, for the default layout (one
+# global HNSW graph + plain keyword index) vs tenant partitioning (QDRANT_TENANT_FIELD keyword
+# index with is_tenant, HNSW m=0 + payload_m: one graph per tenant), and optionally custom
+# sharding by league (--sharded). Scratch collections are filled with one point per summary
+# section of synthetic matches (random unit vectors, payload as pushed by QdrantMatchPusher) in
+# steps of --sizes; after each step the optimizer is awaited and --repeat searches filtered on
+# one match_id (the question path) and on one league_id are timed per layout.
+#
+# An in-memory Qdrant ignores HNSW and payload index config (every search is a scan), so point
+# --qdrant-url at a server for real numbers:
+#
+#   python scripts/benchmark_tenant_partitioning.py --qdrant-url http://localhost:6333 --sizes 1000,10000,50000
+#   python scripts/benchmark_tenant_partitioning.py --qdrant-url http://localhost:6333 --tenant-field league_id --sharded
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (
+    CollectionStatus,
+    Distance,
+    FieldCondition,
+    Filter as QFilter,
+    MatchValue,
+    PointStruct,
+    VectorParams,
+)
+
+from config.settings import EMBEDDING_DIM
+from libraries.collection_layout import ensure_shard_key, partition_config, shard_key
+from libraries.payload_schema import create_payload_index
+from libraries.section_summaries import SECTIONS
+
+PREFIX = "bench_tenant_"
+
+
+def random_vector(rng: random.Random) -> List[float]:
+    return [rng.gauss(0, 1) for _ in range(EMBEDDING_DIM)]
+
+
+def create(client: QdrantClient, name: str, tenant_field: str, tenant: bool, sharded: bool) -> None:
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE),
+        **partition_config(tenant_graphs=tenant, shard_by_league=sharded),
+    )
+    for field in ("match_id", "league_id"):
+        schema = "KEYWORD_TENANT" if tenant and field == tenant_field else "KEYWORD"
+        create_payload_index(client, name, field, schema)
+
+
+def fill(client: QdrantClient, layouts: Dict[str, bool], start: int, stop: int, leagues: int, rng: random.Random) -> None:
+    """Matches [start, stop) into every collection (same vectors everywhere)."""
+    batch = []
+    for m in range(start, stop):
+        for s, section in enumerate(SECTIONS):
+            payload = {"match_id": str(100000 + m), "league_id": str(m % leagues), "section": section.name,
+                       "match_scheduled_date": "2026-10-20 18:00:00", "text": f"{section.title} of match {100000 + m}."}
+            batch.append(PointStruct(id=m * len(SECTIONS) + s, vector=random_vector(rng), payload=payload))
+        if len(batch) >= 512 or m == stop - 1:
+            for name, sharded in layouts.items():
+                groups = {None: batch}
+                if sharded:
+                    groups = {}
+                    for p in batch:
+                        groups.setdefault(shard_key(p.payload), []).append(p)
+                for key, group in groups.items():
+                    if key is not None:
+                        ensure_shard_key(client, name, key)
+                    client.upsert(collection_name=name, points=group, wait=True, shard_key_selector=key)
+            batch = []
+
+
+def wait_indexed(client: QdrantClient, names: List[str], timeout: float = 600) -> float:
+    started = time.time()
+    while time.time() - started < timeout:
+        if all(client.get_collection(n).status == CollectionStatus.GREEN for n in names):
+            break
+        time.sleep(0.5)
+    return time.time() - started
+
+
+def timed(client: QdrantClient, name: str, queries: List, limit: int) -> tuple:
+    samples = []
+    for vector, qfilter in queries:
+        t = time.perf_counter()
+        client.query_points(collection_name=name, query=vector, query_filter=qfilter, limit=limit, with_payload=True)
+        samples.append((time.perf_counter() - t) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def by(field: str, value: str) -> QFilter:
+    return QFilter(must=[FieldCondition(key=field, match=MatchValue(value=value))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtered search latency: global HNSW graph vs tenant partitioning")
+    parser.add_argument("--sizes", default="1000,5000,10000,20000", help="stored matches after each step")
+    parser.add_argument("--tenant-field", default="match_id", choices=("match_id", "league_id"))
+    parser.add_argument("--sharded", action="store_true", help="also a tenant layout with custom sharding by league")
+    parser.add_argument("--leagues", type=int, default=40)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--qdrant-url", default=None, help="default: in-memory Qdrant")
+    parser.add_argument("--api-key", default=None)
+    args = parser.parse_args()
+    if args.sharded and not args.qdrant_url:
+        parser.error("--sharded needs --qdrant-url (the in-memory Qdrant has no sharding)")
+
+    client = QdrantClient(url=args.qdrant_url, api_key=args.api_key) if args.qdrant_url else QdrantClient(location=":memory:")
+    layouts = {f"{PREFIX}global": (False, False), f"{PREFIX}tenant": (True, False)}
+    if args.sharded:
+        layouts[f"{PREFIX}sharded"] = (True, True)
+    rng = random.Random(5)
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    try:
+        for name, (tenant, sharded) in layouts.items():
+            create(client, name, args.tenant_field, tenant, sharded)
+        print(f"tenant field: {args.tenant_field}, {len(SECTIONS)} points per match, {args.leagues} leagues")
+        print(f"\n{'matches':>8} {'points':>9} {'layout':>8} {'filter':>7} {'mean ms':>9} {'p95 ms':>8} {'load s':>8}")
+
+        stored = 0
+        for size in sizes:
+            started = time.time()
+            fill(client, {name: sharded for name, (_, sharded) in layouts.items()}, stored, size, args.leagues, rng)
+            stored = size
+            loaded = time.time() - started + wait_indexed(client, list(layouts))
+            queries = {
+                "match": [(random_vector(rng), by("match_id", str(100000 + rng.randrange(size)))) for _ in range(args.repeat)],
+                "league": [(random_vector(rng), by("league_id", str(rng.randrange(args.leagues)))) for _ in range(args.repeat)],
+            }
+            for name in layouts:
+                for kind, qs in queries.items():
+                    mean, p95 = timed(client, name, qs, args.top_k)
+                    print(f"{size:>8} {size * len(SECTIONS):>9} {name[len(PREFIX):]:>8} {kind:>7} {mean:>9.3f} {p95:>8.3f} {loaded:>8.1f}")
+    finally:
+        for name in layouts:
+            if client.collection_exists(name):
+                client.delete_collection(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmark_vector_mirror.py
+#
+# Cross-match question search on the local vector mirror (libraries/vector_mirror.py) vs an
+# active-window Qdrant search (only the match_scheduled_date filter). A scratch collection is seeded with one point per
+# summary section of --matches fixtures (random unit vectors, payload as pushed by
+# QdrantMatchPusher, vector_stamp included), mirrored into a temporary directory and queried
+# both ways. Also reports the full / incremental / no-op sync times and the recall@k of the
+# float32 mirror against Qdrant's own ranking.
+#
+# Against an in-memory Qdrant (default) the network path is a local brute-force scan; point
+# --qdrant-url at a cluster to see the round trips the mirror saves:
+#
+#   python scripts/benchmark_vector_mirror.py --matches 200 --repeat 200
+#   python scripts/benchmark_vector_mirror.py --qdrant-url https://<cluster>:6333 --api-key <key>
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PayloadSchemaType, PointStruct, VectorParams
+
+from config.settings import EMBEDDING_DIM
+from libraries.section_summaries import SECTIONS
+from libraries.vector_mirror import STAMP_FIELD, VectorMirror, active_filter
+
+COLLECTION = "bench_vector_mirror"
+
+
+def random_vector(rng: random.Random) -> list:
+    return [rng.gauss(0, 1) for _ in range(EMBEDDING_DIM)]
+
+
+def point(rng: random.Random, m: int, s: int, generation: int = 0) -> PointStruct:
+    scheduled = datetime.now() + timedelta(hours=m % 72)
+    return PointStruct(
+        id=m * len(SECTIONS) + s,
+        vector=random_vector(rng),
+        payload={
+            "match_id": str(90000 + m),
+            "section": SECTIONS[s].name,
+            "match_scheduled_date": scheduled.strftime("%Y-%m-%d %H:%M:%S"),
+            "text": f"{SECTIONS[s].title} of match {90000 + m}.",
+            STAMP_FIELD: f"{m:04x}{s:02x}{generation:02x}",
+        },
+    )
+
+
+def timed(fn, repeat: int):
+    samples, result = [], None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    samples.sort()
+    return result, statistics.mean(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local vector mirror vs Qdrant for cross-match search")
+    parser.add_argument("--matches", type=int, default=200)
+    parser.add_argument("--changed", type=int, default=20, help="points re-embedded before the incremental sync")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--qdrant-url", default=None, help="default: in-memory Qdrant")
+    parser.add_argument("--api-key", default=None)
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.qdrant_url, api_key=args.api_key) if args.qdrant_url else QdrantClient(location=":memory:")
+    rng = random.Random(7)
+    directory = tempfile.mkdtemp(prefix="vector_mirror_")
+    mirror = VectorMirror(directory=directory)
+    try:
+        if client.collection_exists(COLLECTION):
+            client.delete_collection(COLLECTION)
+        client.create_collection(COLLECTION, vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE))
+        if args.qdrant_url:
+            client.create_payload_index(COLLECTION, "match_scheduled_date", PayloadSchemaType.DATETIME)
+        points = [point(rng, m, s) for m in range(args.matches) for s in range(len(SECTIONS))]
+        for start in range(0, len(points), 256):
+            client.upsert(COLLECTION, points[start:start + 256])
+
+        full = mirror.sync(client, COLLECTION)
+        changed = rng.sample(range(len(points)), min(args.changed, len(points)))
+        client.upsert(COLLECTION, [point(rng, i // len(SECTIONS), i % len(SECTIONS), generation=1) for i in changed])
+        incremental = mirror.sync(client, COLLECTION)
+        noop = mirror.sync(client, COLLECTION)
+        print(f"\n{len(points)} points, {full['rows']} mirrored ({mirror.stats([COLLECTION])[COLLECTION]['bytes']} bytes float32)")
+        for name, r in (("full", full), ("incremental", incremental), ("no-op", noop)):
+            print(f"  {name:>11} sync: {r['sync_ms']:>8.1f} ms  v{r['version']}  fetched {r['fetched']}, removed {r['removed']}")
+
+        queries = [random_vector(rng) for _ in range(args.repeat)]
+        qfilter = active_filter()
+        it = iter(queries * 3)
+        _, local_ms, local_p95 = timed(lambda: mirror.search(COLLECTION, next(it), args.top_k), args.repeat)
+        _, hits_ms, hits_p95 = timed(lambda: mirror.hits(client, COLLECTION, next(it), args.top_k), args.repeat)
+        _, qdrant_ms, qdrant_p95 = timed(lambda: client.search(COLLECTION, query_vector=next(it), query_filter=qfilter,
+                                                               limit=args.top_k, with_payload=True), args.repeat)
+
+        overlap = 0
+        for q in queries[:50]:
+            ours = {h["id"] for h in mirror.search(COLLECTION, q, args.top_k)}
+            theirs = {r.id for r in client.search(COLLECTION, query_vector=q, query_filter=qfilter, limit=args.top_k)}
+            overlap += len(ours & theirs) / max(1, len(theirs))
+
+        print(f"\n{'path':>28} {'mean ms':>9} {'p95 ms':>8}")
+        print(f"{'mirror (scores only)':>28} {local_ms:>9.3f} {local_p95:>8.3f}")
+        print(f"{'mirror + payload lookup':>28} {hits_ms:>9.3f} {hits_p95:>8.3f}")
+        print(f"{'qdrant active-window search':>28} {qdrant_ms:>9.3f} {qdrant_p95:>8.3f}")
+        print(f"\nrecall@{args.top_k} of the mirror vs Qdrant: {overlap / min(50, len(queries)):.4f}")
+    finally:
+        if args.qdrant_url:
+            client.delete_collection(COLLECTION)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
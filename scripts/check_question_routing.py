@@ -0,0 +1,76 @@
+# check_question_routing.py
+#
+# Regression cases for the question fast paths (controllers/user_controller._answer_fast_path):
+# which questions the intent classifier answers from match_stats fields, which ones the entity
+# index answers from the squad lists, and which ones must go to retrieval. Runs against a
+# synthetic match, no Mongo/Qdrant needed; exits 1 when a case is routed differently.
+#
+#   python scripts/check_question_routing.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from libraries import intent_classifier
+from libraries.entity_index import MatchEntityIndex
+
+MATCH = {
+    "match_id": "90001",
+    "match_title": "Royal Challengers vs Gujarat Titans",
+    "home_team_id": "1", "home_team_name": "Royal Challengers",
+    "away_team_id": "2", "away_team_name": "Gujarat Titans",
+    "ground_name": "Chinnaswamy Stadium",
+    "lineup_announce": "1",
+    "home_team_squad": [
+        {"player_id": "11", "full_name": "Virat Kohli", "nick_name": "Kohli", "position": "Batter"},
+        {"player_id": "12", "full_name": "KS Bharat", "nick_name": "Bharat", "position": "Wicketkeeper"},
+    ],
+    "away_team_squad": [
+        {"player_id": "21", "full_name": "Rashid Khan", "nick_name": "Rashid", "position": "Bowler"},
+    ],
+}
+
+# (question, expected intent, answered by the entity index)
+CASES = [
+    ("Who will win the match?", "win_prediction", False),
+    ("What is the predicted score?", "score_prediction", False),
+    ("How many runs will they score?", "score_prediction", False),
+    ("What is the weather forecast?", "weather", False),
+    # player questions never take a team-level intent
+    ("How many runs will KS Bharat score?", None, False),
+    ("Who is the favourite player to win it for them?", None, False),
+    ("Which bowler is favourite to take wickets?", None, False),
+    # the squad lists only answer membership questions
+    ("Is Kohli playing today?", None, True),
+    ("Is Rashid in the XI?", None, True),
+    ("Has KS Bharat been selected for this match?", None, True),
+    ("How did Kohli play at this venue?", None, False),
+    ("What role will the pitch play for Rashid?", None, False),
+    ("Is Kohli in form?", None, False),
+]
+
+
+def route(index: MatchEntityIndex, question: str, match_id: str):
+    entities = index.detect(question, match_id)
+    intent = intent_classifier.classify(question, entities)
+    direct = None if intent else MatchEntityIndex.direct_answer(question, entities, match_id)
+    return intent, direct is not None
+
+
+def main():
+    index = MatchEntityIndex()
+    index.load([MATCH])
+    failed = 0
+    for question, intent, direct in CASES:
+        got = route(index, question, MATCH["match_id"])
+        ok = got == (intent, direct)
+        failed += not ok
+        print(f"{'✅' if ok else '❌'} {question!r}: intent={got[0]} entity_answer={got[1]}"
+              + ("" if ok else f" (expected intent={intent} entity_answer={direct})"))
+    print(f"\n{len(CASES) - failed}/{len(CASES)} routed as expected")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# cron_worker.py
+#
+# Long-running cron worker. Start one per process/node; fixtures from SOURCE_URL are split
+# between all running workers through Mongo leases (see libraries/fixture_leases.py), so
+# adding workers adds throughput without duplicate upstream or LLM calls.
+#
+#   WORKER_ID=node-a python scripts/cron_worker.py --interval 300
+#   python scripts/cron_worker.py --once
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from controllers.cron_controller import run_cron_worker_cycle, get_lease_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run leased cron cycles in a loop")
+    parser.add_argument("--interval", type=float, default=300, help="seconds between passes over the fixture list")
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        while True:
+            result = run_cron_worker_cycle()
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {result['responseMessage']} {result['responseData']}")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        get_lease_manager().close()  # hand held fixtures back immediately
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# evaluate_hybrid_recall.py
+#
+# Offline recall@k comparison of dense-only vs dense+BM25 (RRF) retrieval.
+# Reads the summaries already stored in Mongo, builds exact-token probe questions
+# (player nicknames/full names, venue names, predicted numbers) whose answer is a
+# known match_id, and ranks all matches in-process — no Qdrant needed.
+#
+#   python scripts/evaluate_hybrid_recall.py --collection match_details --ks 1 3 5 10
+
+import argparse
+import os
+import sys
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pymongo import MongoClient
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from config.settings import MONGO_URL, MONGO_DB, EMBEDDING_MODEL, HYBRID_PREFETCH_LIMIT
+from libraries.sparse_encoder import BM25SparseEncoder
+
+SUMMARY_FIELDS = {
+    "match_details": "match_details_summary",
+    "match_stats": "match_stats_summary",
+}
+RRF_K = 60  # same constant Qdrant uses for Fusion.RRF
+
+
+def load_corpus(collection: str) -> Tuple[List[str], List[str], List[dict]]:
+    db = MongoClient(MONGO_URL)[MONGO_DB]
+    summary_field = SUMMARY_FIELDS[collection]
+    ids, texts, records = [], [], []
+    for doc in db[collection].find({summary_field: {"$nin": [None, ""]}}, {"_id": 0}):
+        ids.append(str(doc["match_id"]))
+        texts.append(doc[summary_field])
+        records.append(doc)
+    return ids, texts, records
+
+
+def build_probes(collection: str, records: List[dict]) -> List[Tuple[str, str]]:
+    """(question, expected match_id) pairs built from exact tokens in the source fields."""
+    probes = []
+    for r in records:
+        mid = str(r["match_id"])
+        for player in (r.get("home_team_squad") or []) + (r.get("away_team_squad") or []):
+            if player.get("nick_name"):
+                probes.append((f"Is {player['nick_name']} playing?", mid))
+            if player.get("full_name"):
+                probes.append((f"What role does {player['full_name']} have?", mid))
+        if r.get("ground_name"):
+            probes.append((f"How does the pitch at {r['ground_name']} play?", mid))
+        if collection == "match_stats":
+            for field in ("home_team_score_prediction", "away_team_score_prediction"):
+                if r.get(field) not in (None, ""):
+                    probes.append((f"Which match has a predicted score of {r[field]}?", mid))
+    return probes
+
+
+class SparseIndex:
+    """In-memory BM25 scorer with the same weights as the Qdrant IDF-modified sparse vectors."""
+
+    def __init__(self, encoder: BM25SparseEncoder, texts: List[str]):
+        self.encoder = encoder
+        self.docs = [dict(zip(*encoder.encode_document(t))) for t in texts]
+        df = Counter(tid for d in self.docs for tid in d)
+        self.idf = {tid: encoder.idf(n, len(self.docs)) for tid, n in df.items()}
+
+    def scores(self, question: str) -> np.ndarray:
+        q_ids, _ = self.encoder.encode_query(question)
+        out = np.zeros(len(self.docs), dtype=np.float32)
+        for i, d in enumerate(self.docs):
+            out[i] = sum(d[t] * self.idf[t] for t in q_ids if t in d)
+        return out
+
+
+def rrf(rankings: List[np.ndarray], limit: int) -> List[int]:
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, idx in enumerate(ranking[:limit]):
+            fused[int(idx)] = fused.get(int(idx), 0.0) + 1.0 / (RRF_K + rank + 1)
+    return [i for i, _ in sorted(fused.items(), key=lambda kv: -kv[1])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline dense vs hybrid recall@k")
+    parser.add_argument("--collection", choices=sorted(SUMMARY_FIELDS), default="match_details")
+    parser.add_argument("--ks", type=int, nargs="+", default=[1, 3, 5, 10])
+    args = parser.parse_args()
+
+    ids, texts, records = load_corpus(args.collection)
+    probes = build_probes(args.collection, records)
+    if not texts or not probes:
+        print("❌ No summaries/probes found in Mongo.")
+        return
+    print(f"🔹 {len(texts)} summaries, {len(probes)} probe questions ({args.collection})")
+
+    embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    doc_matrix = np.asarray(embedder.embed_documents(texts), dtype=np.float32)
+    doc_matrix /= np.linalg.norm(doc_matrix, axis=1, keepdims=True) + 1e-12
+    q_matrix = np.asarray(embedder.embed_documents([q for q, _ in probes]), dtype=np.float32)
+    q_matrix /= np.linalg.norm(q_matrix, axis=1, keepdims=True) + 1e-12
+
+    sparse_index = SparseIndex(BM25SparseEncoder(), texts)
+    max_k = max(args.ks)
+    hits = {"dense": Counter(), "hybrid": Counter()}
+
+    for (question, expected), q_vec in zip(probes, q_matrix):
+        dense_rank = np.argsort(-(doc_matrix @ q_vec))
+        sparse_scores = sparse_index.scores(question)
+        sparse_rank = np.argsort(-sparse_scores)[: int((sparse_scores > 0).sum())]
+        hybrid_rank = rrf([dense_rank, sparse_rank], max(HYBRID_PREFETCH_LIMIT, max_k))
+
+        for name, ranking in (("dense", dense_rank), ("hybrid", hybrid_rank)):
+            top_ids = [ids[i] for i in ranking[:max_k]]
+            for k in args.ks:
+                if expected in top_ids[:k]:
+                    hits[name][k] += 1
+
+    print(f"\n{'k':>4} {'dense':>10} {'hybrid':>10} {'gain':>10}")
+    for k in args.ks:
+        d = hits["dense"][k] / len(probes)
+        h = hits["hybrid"][k] / len(probes)
+        print(f"{k:>4} {d:>10.3f} {h:>10.3f} {h - d:>+10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+# load_test_questions.py
+#
+# Load generator for the question API. Drives /user/handle_user_question (and a share of
+# /cron/get_upcoming_matches_list) at a fixed arrival rate with bounded concurrency, using a
+# question mix spread over N match_ids, and reports p50/p95/p99 latency, error rate,
+# throughput and server RSS per second and overall.
+#
+# By default the app runs in-process (httpx ASGITransport) against offline stand-ins:
+#   - Qdrant: a local in-memory collection per MATCH_*_COLLECTION, seeded with N synthetic
+#     matches cloned from documents/*.json (one point per summary section, real embeddings);
+#   - Mongo: the match_stats cache and the entity index are preloaded with the same matches;
+#   - SOURCE_URL: a generated cassette (libraries/cassette.py) serves the fixture list, with
+#     --upstream-ms of latency, unless --cassette names a recorded one.
+# The embedding model and the request handling are the real ones, so the numbers move with
+# the question path. --url runs the same load against a deployed node instead (give
+# --server-pid to sample its RSS when it runs on this host).
+#
+# Arrivals are open-loop: latency is measured from the scheduled send time, so queueing
+# behind --concurrency shows up in the percentiles instead of silently lowering the rate.
+# --max-p95-ms / --max-error-rate turn the run into a gate (exit code 1) for CI or pre-deploy.
+#
+#   python scripts/load_test_questions.py --rps 50 --concurrency 16 --duration 30 --matches 40
+#   python scripts/load_test_questions.py --url http://10.0.0.5:8000 --rps 100 --max-p95-ms 250
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# (kind, share, templates); {home}/{away}/{player}/{venue} are filled per request
+QUESTION_MIX = [
+    ("intent", 0.35, [
+        "Who will win {home} vs {away}?",
+        "What is the weather like for the match?",
+        "How is the pitch at {venue}?",
+        "What is the predicted score for {home}?",
+        "Is it better to bat first here?",
+        "What is the average first innings score at this venue?",
+    ]),
+    ("entity", 0.20, [
+        "Is {player} playing today?",
+        "Is {player} in the squad?",
+        "What role does {player} play?",
+    ]),
+    ("vector", 0.35, [
+        "Give me a summary of the match",
+        "Which players should I captain for fantasy?",
+        "Explain the bowling conditions and who benefits",
+        "Compare the two teams' recent form",
+        "What are the key fantasy tips for {home} vs {away}?",
+    ]),
+    ("cross_match", 0.10, [
+        "When does {home} play {away}?",
+        "Tell me about matches at {venue}",
+        "{home} match preview",
+    ]),
+]
+
+
+# ---------- offline stand-ins ----------
+
+def synthetic_matches(n: int):
+    """N match_details/match_stats dict pairs cloned from documents/*.json with distinct ids and dates."""
+    with open(os.path.join(REPO_ROOT, "documents", "match_details_json.json")) as f:
+        details = json.load(f)
+    with open(os.path.join(REPO_ROOT, "documents", "match_stats_json.json")) as f:
+        stats = json.load(f)
+    squad = details.pop("matche_squad", None) or []
+    details.pop("_id", None)
+    stats.pop("_id", None)
+    start = datetime.now() + timedelta(hours=2)
+    matches = []
+    for i in range(n):
+        overrides = {
+            "match_id": str(int(details["match_id"]) + i),
+            "match_title": f"Match {i + 1}",
+            "match_scheduled_date": (start + timedelta(hours=4 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        match_details = {
+            **details, **overrides,
+            "home_team_squad": [p for p in squad if p.get("team_id") == details["home_team_id"]],
+            "away_team_squad": [p for p in squad if p.get("team_id") == details["away_team_id"]],
+        }
+        matches.append((match_details, {**stats, **overrides}))
+    return matches
+
+
+def stand_in_summary(record, sections_field: str):
+    """Section texts written from the fields themselves (no LLM offline), as SummarySection dicts."""
+    from libraries.section_summaries import SECTIONS, fingerprint, section_inputs
+    from models.match_types import SummarySection
+
+    data = record.to_dict()
+    sections = {}
+    for section in SECTIONS:
+        inputs = section_inputs(data, section)
+        if inputs is None:
+            continue
+        facts = "; ".join(f"{k.replace('_', ' ')}: {v}" for k, v in inputs.items() if not isinstance(v, list))
+        players = [p.get("full_name") for k in ("home_team_squad", "away_team_squad") for p in inputs.get(k) or []]
+        text = f"{section.title}. {facts}." + (f" Players: {', '.join(players)}." if players else "")
+        sections[section.name] = SummarySection(text=text, fingerprint=fingerprint(section, inputs))
+    setattr(record, sections_field, sections)
+    return record
+
+
+def write_fixture_cassette(directory: str, name: str, source_url, matches, upstream_ms: float) -> None:
+    """A one-entry cassette answering GET SOURCE_URL with the synthetic fixture list."""
+    import gzip
+    from libraries.cassette import interaction_key
+
+    fixtures = [{
+        "season_game_uid": d["match_id"], "league_id": d["league_id"], "league_name": d["league_name"],
+        "home": d["home_team"], "away": d["away_team"], "format": d["match_format"],
+        "season_scheduled_date": d["match_scheduled_date"], "playing_announce": d["lineup_announce"],
+    } for d, _ in matches]
+    request = {"method": "GET", "url": source_url, "json": None}
+    entry = {
+        "key": interaction_key("http", request), "kind": "http", "recorded_at": time.time(),
+        "elapsed_ms": upstream_ms, "request": request,
+        "response": {"status": 200, "body": json.dumps(fixtures), "content_type": "application/json"},
+    }
+    with gzip.open(os.path.join(directory, f"{name}.0.jsonl.gz"), "wt", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def install_offline_stand_ins(n_matches: int, upstream_ms: float, cassette_name):
+    """Point the in-process app at local stand-ins; returns the synthetic (details, stats) dicts."""
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")  # the question route never calls the LLM
+    os.environ["CASSETTE_MODE"] = "replay"
+    if not cassette_name:
+        os.environ["CASSETTE_DIR"] = tempfile.mkdtemp(prefix="load-test-cassette-")
+        os.environ["CASSETTE_NAME"] = "load-test"
+    else:
+        os.environ["CASSETTE_NAME"] = cassette_name
+
+    from qdrant_client import QdrantClient
+    from qdrant_client.http.models import Distance, Modifier, SparseVectorParams, VectorParams
+    from config import settings
+    from controllers import user_controller
+    from libraries.entity_index import match_entity_index
+    from libraries.qdrant_client import QdrantMatchPusher
+    from libraries.qdrant_searcher import QdrantMultiCollectionSearcher
+    from models.cron_model import match_stats_cache, points_version_cache
+    from models.match_types import MatchDetails, MatchStats, decode
+
+    matches = synthetic_matches(n_matches)
+    if not cassette_name:
+        write_fixture_cassette(os.environ["CASSETTE_DIR"], "load-test", settings.SOURCE_URL, matches, upstream_ms)
+
+    local = QdrantClient(location=":memory:")
+    embedder = QdrantMatchPusher.get_embedder()
+    for collection, record_type, sections_field in (
+        (settings.MATCH_DETAILS_COLLECTION, MatchDetails, "match_details_sections"),
+        (settings.MATCH_STATS_COLLECTION, MatchStats, "match_stats_sections"),
+    ):
+        local.create_collection(
+            collection_name=collection,
+            vectors_config=VectorParams(size=settings.EMBEDDING_DIM, distance=Distance.COSINE),
+            sparse_vectors_config={settings.SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+            if settings.HYBRID_SEARCH_ENABLED else None,
+        )
+        pusher = QdrantMatchPusher(collection, embedder=embedder, qdrant=local)
+        docs = []
+        for pair in matches:
+            record = decode(pair[0] if record_type is MatchDetails else pair[1], record_type)
+            docs += QdrantMatchPusher.build_section_documents(stand_in_summary(record, sections_field), sections_field)
+        print(f"seeding {len(docs)} points into in-memory '{collection}'...")
+        pusher.push_matches(docs)
+
+    user_controller._searcher = QdrantMultiCollectionSearcher(
+        collections=[settings.MATCH_DETAILS_COLLECTION, settings.MATCH_STATS_COLLECTION],
+        embedder_model=settings.EMBEDDING_MODEL,
+        qdrant_url=None,
+        run_self_test=False,
+        hybrid=settings.HYBRID_SEARCH_ENABLED,
+        sparse_vector_name=settings.SPARSE_VECTOR_NAME,
+        prefetch_limit=settings.HYBRID_PREFETCH_LIMIT,
+        qdrant=local,
+        embedder=embedder,
+    )
+    match_entity_index.load([d for d, _ in matches])
+    user_controller.ENTITY_INDEX_TTL = float("inf")  # no reload from Mongo during the run
+    match_stats_cache.ttl = None  # never fall through to Mongo during the run
+    points_version_cache.ttl = None
+    for _, stats in matches:
+        match_stats_cache.set(stats["match_id"], stats)
+        points_version_cache.set(stats["match_id"], "")
+    return matches
+
+
+# ---------- load ----------
+
+def percentile(ordered, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def read_rss_mb(pid: int):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def build_request_plan(matches, list_share: float, skew: float, seed: int):
+    """Returns next_request() -> (kind, method, path, params, body) drawing from QUESTION_MIX."""
+    rng = random.Random(seed)
+    match_weights = [1.0 / (rank + 1) ** skew for rank in range(len(matches))]  # a few hot matches, a long tail
+    kinds = [(kind, share, templates) for kind, share, templates in QUESTION_MIX
+             if kind != "entity" or any(m["players"] for m in matches)]
+
+    def next_request():
+        if rng.random() < list_share:
+            return "fixture_list", "GET", "/cron/get_upcoming_matches_list", None, None
+        kind, _, templates = rng.choices(kinds, weights=[share for _, share, _ in kinds])[0]
+        match = rng.choices(matches, weights=match_weights)[0]
+        question = rng.choice(templates).format(
+            home=match["home"], away=match["away"], venue=match["venue"],
+            player=rng.choice(match["players"]) if match["players"] else match["home"],
+        )
+        params = None if kind == "cross_match" else {"match_id": match["match_id"]}
+        return kind, "POST", "/user/handle_user_question", params, {"question": question}
+
+    return next_request
+
+
+def is_error(path: str, status: int, body) -> bool:
+    if status >= 400:
+        return True
+    if path.startswith("/cron/"):
+        return not isinstance(body, dict) or body.get("responseCode") != "200"
+    # the question handler answers [] on an unexpected exception and a status dict on 403/open breaker
+    return isinstance(body, list) or (isinstance(body, dict) and body.get("status") in ("forbidden", "unavailable"))
+
+
+async def run_load(client, next_request, rps: float, concurrency: int, duration: float, rss_pid):
+    samples = []  # (second, kind, latency_ms, error)
+    rss = []  # (second, MB)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def one(scheduled: float, request):
+        kind, method, path, params, body = request
+        async with semaphore:
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                try:
+                    payload = response.json()
+                except ValueError:
+                    payload = None
+                error = is_error(path, response.status_code, payload)
+            except Exception:
+                error = True
+        samples.append((int(scheduled - started), kind, (loop.time() - scheduled) * 1000, error))
+
+    async def sample_rss():
+        while True:
+            if rss_pid:
+                value = read_rss_mb(rss_pid)
+                if value is not None:
+                    rss.append((int(loop.time() - started), value))
+            await asyncio.sleep(1)
+
+    sampler = asyncio.create_task(sample_rss())
+    tasks = []
+    total = int(rps * duration)
+    for i in range(total):
+        scheduled = started + i / rps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(scheduled, next_request())))
+    await asyncio.gather(*tasks)
+    sampler.cancel()
+    return samples, rss, loop.time() - started
+
+
+def report(samples, rss, elapsed: float, args) -> dict:
+    by_kind = defaultdict(list)
+    errors = defaultdict(int)
+    for _, kind, latency, error in samples:
+        by_kind[kind].append(latency)
+        by_kind["all"].append(latency)
+        errors[kind] += error
+        errors["all"] += error
+
+    summary = {}
+    print(f"\n{'kind':<14} {'count':>6} {'err %':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for kind in sorted(by_kind, key=lambda k: (k == "all", k)):
+        ordered = sorted(by_kind[kind])
+        row = {
+            "count": len(ordered),
+            "error_rate": errors[kind] / len(ordered),
+            "p50": percentile(ordered, 50), "p95": percentile(ordered, 95),
+            "p99": percentile(ordered, 99), "max": ordered[-1],
+        }
+        summary[kind] = row
+        print(f"{kind:<14} {row['count']:>6} {row['error_rate'] * 100:>6.2f} {row['p50']:>9.1f} "
+              f"{row['p95']:>9.1f} {row['p99']:>9.1f} {row['max']:>9.1f}")
+
+    per_second = defaultdict(list)
+    for second, _, latency, error in samples:
+        per_second[second].append((latency, error))
+    rss_by_second = dict(rss)
+    print(f"\n{'second':>6} {'req':>5} {'err':>4} {'p95 ms':>9} {'rss MB':>8}")
+    timeline = []
+    for second in sorted(per_second):
+        latencies = sorted(l for l, _ in per_second[second])
+        point = {"second": second, "requests": len(latencies), "errors": sum(e for _, e in per_second[second]),
+                 "p95": percentile(latencies, 95), "rss_mb": rss_by_second.get(second)}
+        timeline.append(point)
+        rss_text = f"{point['rss_mb']:.0f}" if point["rss_mb"] is not None else "-"
+        print(f"{second:>6} {point['requests']:>5} {point['errors']:>4} {point['p95']:>9.1f} {rss_text:>8}")
+
+    throughput = len(samples) / elapsed if elapsed else 0
+    rss_values = [v for _, v in rss]
+    print(f"\n{len(samples)} requests in {elapsed:.1f}s → {throughput:.1f} req/s (target {args.rps:g}), "
+          f"error rate {summary['all']['error_rate'] * 100:.2f}%"
+          + (f", RSS {rss_values[0]:.0f} → {rss_values[-1]:.0f} MB (max {max(rss_values):.0f})" if rss_values else ""))
+    return {"summary": summary, "timeline": timeline, "throughput_rps": throughput, "elapsed_s": elapsed}
+
+
+async def main_async(args):
+    import httpx
+
+    if args.url:
+        match_meta = [{"match_id": m, "home": "home team", "away": "away team", "venue": "the venue", "players": []}
+                      for m in args.match_ids]
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        rss_pid = args.server_pid
+        if not match_meta:
+            response = await client.get("/cron/get_upcoming_matches_list")
+            match_meta = [{"match_id": m["match_id"], "home": m["home_team"], "away": m["away_team"],
+                           "venue": "the venue", "players": []}
+                          for m in (response.json().get("responseData") or [])[:args.matches]]
+    else:
+        matches = install_offline_stand_ins(args.matches, args.upstream_ms, args.cassette)
+        from main import app
+        match_meta = [{
+            "match_id": d["match_id"], "home": d["home_team_name"], "away": d["away_team_name"],
+            "venue": d["ground_name"],
+            "players": [p["full_name"] for k in ("home_team_squad", "away_team_squad") for p in d[k]],
+        } for d, _ in matches]
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=args.timeout)
+        rss_pid = os.getpid()
+
+    if not match_meta:
+        sys.exit("No match_ids to query (pass --match-ids with --url)")
+
+    next_request = build_request_plan(match_meta, args.list_share, args.skew, args.seed)
+    async with client:
+        if args.warmup:
+            print(f"warming up with {args.warmup} requests...")
+            await run_load(client, next_request, min(args.rps, args.warmup), args.concurrency, 1, None)
+        print(f"load: {args.rps:g} req/s for {args.duration:g}s, concurrency {args.concurrency}, {len(match_meta)} matches")
+        samples, rss, elapsed = await run_load(client, next_request, args.rps, args.concurrency, args.duration, rss_pid)
+    return report(samples, rss, elapsed, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for /user/handle_user_question")
+    parser.add_argument("--url", default=None, help="target a running server instead of the in-process app")
+    parser.add_argument("--server-pid", type=int, default=None, help="with --url: pid whose RSS to sample")
+    parser.add_argument("--match-ids", nargs="*", default=[], help="with --url: match_ids to ask about")
+    parser.add_argument("--rps", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--matches", type=int, default=20, help="number of match_ids to spread questions over")
+    parser.add_argument("--skew", type=float, default=1.0, help="0 = uniform over matches, higher = hotter top matches")
+    parser.add_argument("--list-share", type=float, default=0.05, help="share of requests to get_upcoming_matches_list")
+    parser.add_argument("--upstream-ms", type=float, default=150, help="offline: SOURCE_URL latency of the fixture list")
+    parser.add_argument("--cassette", default=None, help="offline: serve the fixture list from this recorded cassette")
+    parser.add_argument("--warmup", type=int, default=20, help="requests sent before measuring (model load, caches)")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", default=None, help="write the summary and timeline to this file")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="fail (exit 1) above this overall p95")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="fail (exit 1) above this error rate (0-1)")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    overall = result["summary"]["all"]
+    failures = []
+    if args.max_p95_ms is not None and overall["p95"] > args.max_p95_ms:
+        failures.append(f"p95 {overall['p95']:.1f}ms > {args.max_p95_ms:g}ms")
+    if args.max_error_rate is not None and overall["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {overall['error_rate']:.3f} > {args.max_error_rate:g}")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# measure_worker_scaling.py
+#
+# Question-path QPS and memory per worker for 1..N gunicorn workers (gunicorn.conf.py).
+# For each worker count it starts the production server, saturates it with
+# scripts/load_test_questions.py (--url mode, the target rate is set above what the node can
+# serve so the achieved rate is its capacity), and reads /proc/<pid>/smaps_rollup of every
+# worker: RSS counts the shared embedding pages in every worker, PSS splits them between the
+# workers that share them, so the sum of PSS is the real memory of the node.
+# Needs the production .env (Mongo, Qdrant with data); match_ids come from the fixture list.
+# The output starts with the instance, date and commit line docs.txt records with each table.
+#
+#   python scripts/measure_worker_scaling.py --workers 1 2 4 8 --duration 30 --instance-type c6i.2xlarge
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def smaps_rollup_mb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def describe_node(instance_type: str) -> str:
+    """"<instance type>, <cpu model>, <n> vCPU, <mem> GB RAM, <date>, commit <sha>" for the docs.txt record."""
+    cpu, mem_gb = "unknown CPU", 0.0
+    with open("/proc/cpuinfo") as f:
+        for line in f:
+            if line.startswith("model name"):
+                cpu = line.split(":", 1)[1].strip()
+                break
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                mem_gb = int(line.split()[1]) / 1024 / 1024
+                break
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return (f"{instance_type or 'instance type n/a'}, {cpu}, {os.cpu_count()} vCPU, {mem_gb:.0f} GB RAM, "
+            f"{time.strftime('%Y-%m-%d')}, commit {commit}")
+
+
+def children(pid: int):
+    found = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        found.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    return found
+
+
+def wait_ready(url: str, n_workers: int, master_pid: int, timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2)
+            if len(children(master_pid)) >= n_workers:
+                return
+        except OSError:
+            pass
+        time.sleep(1)
+    raise RuntimeError(f"server not ready after {timeout:.0f}s")
+
+
+def measure(n_workers: int, args) -> dict:
+    env = {**os.environ, "WEB_CONCURRENCY": str(n_workers), "PORT": str(args.port)}
+    server = subprocess.Popen(["gunicorn", "-c", "gunicorn.conf.py", "main:app"], cwd=REPO_ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_ready(url + "/", n_workers, server.pid, args.startup_timeout)
+        with tempfile.NamedTemporaryFile(suffix=".json") as out:
+            subprocess.run([
+                sys.executable, os.path.join(REPO_ROOT, "scripts", "load_test_questions.py"),
+                "--url", url, "--rps", str(args.rps), "--concurrency", str(args.concurrency * n_workers),
+                "--duration", str(args.duration), "--list-share", "0", "--json", out.name,
+            ], check=True, stdout=subprocess.DEVNULL)
+            result = json.load(open(out.name))
+        workers = [smaps_rollup_mb(pid) for pid in children(server.pid)]
+        master = smaps_rollup_mb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    mean = lambda key: sum(w[key] for w in workers) / len(workers)
+    return {
+        "workers": n_workers,
+        "qps": result["throughput_rps"],
+        "p50": result["summary"]["all"]["p50"],
+        "error_rate": result["summary"]["all"]["error_rate"],
+        "worker_rss": mean("rss"), "worker_pss": mean("pss"), "worker_shared": mean("shared"),
+        "total_pss": master["pss"] + sum(w["pss"] for w in workers),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QPS and per-worker memory for 1..N gunicorn workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--rps", type=float, default=2000, help="target rate, above capacity")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests per worker")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=180)
+    parser.add_argument("--instance-type", default=os.getenv("INSTANCE_TYPE", ""), help="e.g. c6i.2xlarge, for the record")
+    args = parser.parse_args()
+
+    print(describe_node(args.instance_type))
+
+    print(f"{'workers':>7} {'QPS':>8} {'speedup':>8} {'p50 ms':>8} {'err %':>6} "
+          f"{'RSS/worker':>11} {'PSS/worker':>11} {'shared/worker':>14} {'total PSS':>10}")
+    base = None
+    for n in sorted(set(args.workers)):
+        r = measure(n, args)
+        base = base or r["qps"]
+        print(f"{n:>7} {r['qps']:>8.1f} {r['qps'] / base:>7.2f}x {r['p50']:>8.1f} {r['error_rate'] * 100:>6.2f} "
+              f"{r['worker_rss']:>9.0f}MB {r['worker_pss']:>9.0f}MB {r['worker_shared']:>12.0f}MB {r['total_pss']:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
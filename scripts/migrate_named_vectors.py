@@ -0,0 +1,257 @@
+# migrate_named_vectors.py
+#
+# Copies the split layout (MATCH_DETAILS_COLLECTION + MATCH_STATS_COLLECTION) into the named
+# layout: one MATCHES_COLLECTION whose points carry a "details" and a "stats" named vector (plus
+# their BM25 sparse vectors when hybrid search is on), the shared payload once and one
+# {text, fingerprint, vector_stamp} object per source (libraries/collection_layout.py). Both
+# layouts use the same point ids (uuid5 of match_id#section), so points are merged by id. The
+# split collections are left untouched; switch with QDRANT_LAYOUT=named once the counts agree.
+#
+# --compare reports, for both layouts, the stored points, dense vector bytes, payload bytes and
+# payload indexes, and the latency of one question: two searches (one per collection) in the
+# split layout vs one prefetch/RRF query in the named layout, using stored vectors as queries.
+# --demo seeds an in-memory Qdrant with --matches fixtures (random vectors) first.
+#
+#   python scripts/migrate_named_vectors.py
+#   python scripts/migrate_named_vectors.py --compare --repeat 200
+#   python scripts/migrate_named_vectors.py --demo --compare --matches 200
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+from config.settings import (
+    QDRANT_URL,
+    QDRANT_API_KEY,
+    EMBEDDING_DIM,
+    EMBEDDING_MODEL,
+    HYBRID_SEARCH_ENABLED,
+    MATCH_DETAILS_COLLECTION,
+    MATCHES_COLLECTION,
+    NAMED_VECTORS,
+    PAYLOAD_INDEX_SCHEMA,
+    HYBRID_PREFETCH_LIMIT,
+    SPARSE_VECTOR_NAME,
+)
+from libraries.collection_layout import (
+    STAMP_FIELD,
+    CollectionTarget,
+    Modifier,
+    SparseVectorParams,
+    collection_targets,
+    create_named_collection,
+    ensure_shard_key,
+    is_custom_sharded,
+    partition_config,
+    shard_key,
+    vector_stamp,
+)
+from libraries.payload_schema import create_payload_index
+from libraries.qdrant_client import QdrantMatchPusher, SparseVector
+from libraries.qdrant_searcher import QdrantMultiCollectionSearcher
+from libraries.section_summaries import SECTIONS
+from libraries.sparse_encoder import BM25SparseEncoder
+
+
+def scroll_all(client: QdrantClient, collection: str, batch_size: int, with_vectors: Any = True):
+    offset = None
+    while True:
+        records, offset = client.scroll(collection_name=collection, limit=batch_size, offset=offset,
+                                        with_payload=True, with_vectors=with_vectors)
+        yield from records
+        if offset is None:
+            break
+
+
+def merge_points(client: QdrantClient, batch_size: int, sparse: bool) -> Dict[Any, Dict[str, Dict]]:
+    """id -> {"vector": named vectors, "payload": nested payload} of every point in the split collections."""
+    merged: Dict[Any, Dict[str, Dict]] = {}
+    for logical, name in NAMED_VECTORS.items():
+        split, named = CollectionTarget(logical), CollectionTarget(MATCHES_COLLECTION, name)
+        copied = 0
+        for record in scroll_all(client, logical, batch_size):
+            dense = split.dense(record.vector)
+            if dense is None:
+                continue
+            vectors = record.vector if isinstance(record.vector, dict) else {}
+            payload = dict(record.payload or {})
+            # points pushed before vector stamps: every named-layout source object carries one
+            if STAMP_FIELD not in payload and "text" in payload:
+                payload[STAMP_FIELD] = vector_stamp(payload["text"])
+            entry = merged.setdefault(record.id, {"vector": {}, "payload": {}})
+            entry["vector"].update(named.point_vector(dense, vectors.get(SPARSE_VECTOR_NAME) if sparse else None))
+            entry["payload"].update(named.nest(payload))
+            copied += 1
+        print(f"   📥 {logical}: {copied} points → {MATCHES_COLLECTION}.{name}")
+    return merged
+
+
+def migrate(client: QdrantClient, batch_size: int) -> Dict[str, int]:
+    print(f"\n🔹 Migrating {', '.join(NAMED_VECTORS)} into {MATCHES_COLLECTION}")
+    if client.collection_exists(MATCHES_COLLECTION):
+        info = client.get_collection(MATCHES_COLLECTION)
+        sparse = bool(getattr(info.config.params, "sparse_vectors", None))
+        sharded = is_custom_sharded(info)
+        print(f"   ✅ Collection exists: {MATCHES_COLLECTION} (points are upserted by id)")
+    else:
+        sparse = create_named_collection(client, MATCHES_COLLECTION)
+        sharded = "sharding_method" in partition_config()
+        print(f"   🆕 Created collection: {MATCHES_COLLECTION} (named vectors {list(NAMED_VECTORS.values())}, sparse={sparse})")
+    schema = PAYLOAD_INDEX_SCHEMA.get(MATCHES_COLLECTION) or PAYLOAD_INDEX_SCHEMA[MATCH_DETAILS_COLLECTION]
+    for field, field_schema in schema.items():
+        if not create_payload_index(client, MATCHES_COLLECTION, field, field_schema):
+            print(f"   ❌ Failed index for {MATCHES_COLLECTION}.{field}")
+
+    started = time.time()
+    merged = merge_points(client, batch_size, sparse)
+    points = [PointStruct(id=pid, vector=p["vector"], payload=p["payload"]) for pid, p in merged.items()]
+    # league-sharded collections (QDRANT_SHARD_BY_LEAGUE) take one write per shard key
+    groups = {None: points}
+    if sharded:
+        groups = {}
+        for p in points:
+            groups.setdefault(shard_key(p.payload), []).append(p)
+    for key, group in groups.items():
+        if key is not None:
+            ensure_shard_key(client, MATCHES_COLLECTION, key)
+        for start in range(0, len(group), batch_size):
+            client.upsert(collection_name=MATCHES_COLLECTION, points=group[start:start + batch_size], wait=True,
+                          shard_key_selector=key)
+    count = client.count(collection_name=MATCHES_COLLECTION, exact=True).count
+    print(f"   📤 Upserted {len(points)} points, {MATCHES_COLLECTION} holds {count} ({time.time() - started:.1f}s)")
+    if count < len(points):
+        raise SystemExit(f"❌ Point count mismatch for {MATCHES_COLLECTION}; keep QDRANT_LAYOUT=split.")
+    return {"points": len(points), "count": count}
+
+
+def footprint(client: QdrantClient, collection: str, batch_size: int) -> Dict[str, int]:
+    """Stored points, dense float32 vector bytes, payload JSON bytes and payload indexes of one collection."""
+    points = vector_bytes = payload_bytes = 0
+    for record in scroll_all(client, collection, batch_size):
+        dense = record.vector.values() if isinstance(record.vector, dict) else [record.vector]
+        vector_bytes += sum(len(v) * 4 for v in dense if isinstance(v, list))
+        payload_bytes += len(json.dumps(record.payload or {}, default=str))
+        points += 1
+    schema = getattr(client.get_collection(collection), "payload_schema", None) or {}
+    return {"points": points, "vector_bytes": vector_bytes, "payload_bytes": payload_bytes, "indexes": len(schema)}
+
+
+def timed(fn, queries: List[Any]) -> tuple:
+    samples = []
+    for q in queries:
+        t = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - t) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def compare(client: QdrantClient, args) -> None:
+    print(f"\n{'layout':>8} {'collection':>16} {'points':>8} {'vector B':>12} {'payload B':>12} {'indexes':>8}")
+    totals = {}
+    for layout in ("split", "named"):
+        physical = sorted({t.collection for t in collection_targets(layout).values()})
+        rows = {c: footprint(client, c, args.batch_size) for c in physical}
+        for c, r in rows.items():
+            print(f"{layout:>8} {c:>16} {r['points']:>8} {r['vector_bytes']:>12} {r['payload_bytes']:>12} {r['indexes']:>8}")
+        totals[layout] = {k: sum(r[k] for r in rows.values()) for k in ("points", "vector_bytes", "payload_bytes", "indexes")}
+    for k in ("points", "payload_bytes", "indexes"):
+        if totals["split"][k]:  # an in-memory Qdrant reports no payload indexes
+            print(f"   {k}: named/split = {totals['named'][k] / totals['split'][k]:.2f}")
+
+    embedder = QdrantMatchPusher.get_embedder()
+    searchers = {
+        layout: QdrantMultiCollectionSearcher(
+            collections=list(NAMED_VECTORS),
+            embedder_model=EMBEDDING_MODEL,
+            qdrant_url=QDRANT_URL,
+            run_self_test=False,
+            hybrid=HYBRID_SEARCH_ENABLED,
+            sparse_vector_name=SPARSE_VECTOR_NAME,
+            prefetch_limit=HYBRID_PREFETCH_LIMIT,
+            qdrant=client,
+            embedder=embedder,
+            targets=collection_targets(layout),
+        )
+        for layout in ("split", "named")
+    }
+    # stored details vectors + their text as the question (no model call inside the timed loop)
+    rng = random.Random(11)
+    stored = [r for r in scroll_all(client, MATCH_DETAILS_COLLECTION, args.batch_size) if isinstance(r.vector, (list, dict))]
+    sample = rng.sample(stored, min(args.repeat, len(stored)))
+    queries = [
+        (CollectionTarget(MATCH_DETAILS_COLLECTION).dense(r.vector),
+         searchers["split"]._sparse_query((r.payload or {}).get("text", "")) if searchers["split"].hybrid else None)
+        for r in sample
+    ]
+    print(f"\n{'layout':>8} {'requests':>9} {'mean ms':>9} {'p95 ms':>8}")
+    for layout, searcher in searchers.items():
+        requests = 1 if searcher._fusable() else len(NAMED_VECTORS)
+        mean, p95 = timed(lambda q: searcher.search_embedded(q[0], q[1], top_k=args.top_k), queries)
+        print(f"{layout:>8} {requests:>9} {mean:>9.3f} {p95:>8.3f}")
+
+
+def seed_demo(client: QdrantClient, matches: int) -> None:
+    """Split-layout fixtures with the payload QdrantMatchPusher writes and random dense vectors."""
+    rng = random.Random(7)
+    encoder = BM25SparseEncoder()
+    hybrid = HYBRID_SEARCH_ENABLED and SparseVectorParams is not None
+    for logical in NAMED_VECTORS:
+        client.create_collection(
+            collection_name=logical,
+            vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE),
+            sparse_vectors_config={SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)} if hybrid else None,
+        )
+        target, points = CollectionTarget(logical), []
+        for m in range(matches):
+            match_id = str(90000 + m)
+            for section in SECTIONS:
+                text = f"{section.title} ({logical}) of match {match_id}."
+                payload = {"match_id": match_id, "section": section.name, "league_id": str(m % 5),
+                           "match_scheduled_date": "2026-10-20 18:00:00", "text": text, STAMP_FIELD: vector_stamp(text)}
+                dense = [rng.gauss(0, 1) for _ in range(EMBEDDING_DIM)]
+                if hybrid:
+                    indices, values = encoder.encode_document(text)
+                    sparse = SparseVector(indices=indices, values=values)
+                else:
+                    sparse = None
+                points.append(PointStruct(id=QdrantMatchPusher.point_id(match_id, section.name),
+                                          vector=target.point_vector(dense, sparse), payload=payload))
+        for start in range(0, len(points), 256):
+            client.upsert(collection_name=logical, points=points[start:start + 256])
+        print(f"   🌱 {logical}: {len(points)} demo points")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the split Qdrant collections into one named-vector collection")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--compare", action="store_true", help="memory and latency of both layouts after migrating")
+    parser.add_argument("--skip-migrate", action="store_true", help="only --compare an already migrated collection")
+    parser.add_argument("--demo", action="store_true", help="in-memory Qdrant seeded with --matches fixtures")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    client = QdrantClient(location=":memory:") if args.demo else QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+    if args.demo:
+        seed_demo(client, args.matches)
+    if not args.skip_migrate:
+        migrate(client, args.batch_size)
+    if args.compare:
+        compare(client, args)
+    print("\n🎉 Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# reindex_collections.py
+#
+# Blue/green rebuild of the Qdrant collections from Mongo.
+#
+# MATCH_DETAILS_COLLECTION / MATCH_STATS_COLLECTION are served through Qdrant aliases.
+# Each run builds a fresh versioned collection ("match_details_v20250819120000") with the
+# current embedding model, chunking and collection config, embeds with a multi-process
+# pool, uploads points in parallel, verifies the point count and then switches the alias
+# in one atomic update. Search keeps hitting the old version until the switch.
+#
+#   python scripts/reindex_collections.py --workers 4 --upload-parallel 4
+#   python scripts/reindex_collections.py --rollback            # alias back to the previous version
+#   python scripts/reindex_collections.py --replace-physical    # first run: replace a plain collection with an alias
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+)
+from langchain_huggingface import HuggingFaceEmbeddings
+from sentence_transformers import SentenceTransformer
+
+from config.settings import (
+    QDRANT_URL,
+    QDRANT_API_KEY,
+    EMBEDDING_MODEL,
+    MATCH_DETAILS_COLLECTION,
+    MATCH_STATS_COLLECTION,
+    REINDEX_KEEP_VERSIONS,
+)
+from libraries.qdrant_client import QdrantMatchPusher
+from libraries.collection_layout import ensure_shard_key, shard_key
+from models.cron_model import CronModel
+from models.match_types import MatchDetails, MatchStats, decode
+
+SUMMARY_FIELDS = {
+    MATCH_DETAILS_COLLECTION: "match_details_summary",
+    MATCH_STATS_COLLECTION: "match_stats_summary",
+}
+RECORD_TYPES = {MATCH_DETAILS_COLLECTION: MatchDetails, MATCH_STATS_COLLECTION: MatchStats}
+
+
+def get_alias_target(client: QdrantClient, alias: str) -> Optional[str]:
+    for a in client.get_aliases().aliases:
+        if a.alias_name == alias:
+            return a.collection_name
+    return None
+
+
+def list_versions(client: QdrantClient, alias: str) -> List[str]:
+    prefix = f"{alias}_v"
+    return sorted(c.name for c in client.get_collections().collections if c.name.startswith(prefix))
+
+
+def switch_alias(client: QdrantClient, alias: str, collection: str) -> None:
+    """Point `alias` at `collection` in a single atomic alias update."""
+    operations = []
+    if get_alias_target(client, alias):
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=collection, alias_name=alias)))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    print(f"   🔀 Alias {alias} → {collection}")
+
+
+def embed_parallel(model: SentenceTransformer, texts: List[str], workers: int, batch_size: int) -> List[List[float]]:
+    if workers <= 1:
+        return model.encode(texts, batch_size=batch_size, show_progress_bar=False).tolist()
+    pool = model.start_multi_process_pool(target_devices=["cpu"] * workers)
+    try:
+        return model.encode_multi_process(texts, pool, batch_size=batch_size).tolist()
+    finally:
+        model.stop_multi_process_pool(pool)
+
+
+def rebuild(client: QdrantClient, cron_model: CronModel, embedder: HuggingFaceEmbeddings, alias: str, args) -> Dict:
+    version = f"{alias}_v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    print(f"\n🔹 Rebuilding {alias} into {version}")
+
+    physical = alias in {c.name for c in client.get_collections().collections}
+    if physical and not args.replace_physical:
+        raise SystemExit(
+            f"❌ '{alias}' is a plain collection, not an alias. Re-run with --replace-physical to "
+            f"swap it for an alias after the new version is built (brief gap while it is dropped)."
+        )
+
+    started = time.time()
+    summary_field = SUMMARY_FIELDS[alias]
+    sections_field = summary_field.replace("_summary", "_sections")
+    docs = []
+    for raw in cron_model.iter_match_documents(alias, summary_field):
+        record = decode(raw, RECORD_TYPES[alias])
+        if getattr(record, sections_field):
+            # one point per summary section, same ids as the incremental embedding job
+            docs.extend(QdrantMatchPusher.build_section_documents(record, sections_field))
+        else:
+            doc = QdrantMatchPusher.build_document(record, summary_field)
+            if doc is not None:
+                docs.append(doc)
+    print(f"   📥 {len(docs)} documents from Mongo ({time.time() - started:.1f}s)")
+
+    # Creates the versioned collection with the current vector/sparse/payload index config
+    pusher = QdrantMatchPusher(collection_name=version, qdrant=client, embedder=embedder)
+
+    started = time.time()
+    # HuggingFaceEmbeddings.client is the underlying SentenceTransformer
+    vectors = embed_parallel(embedder.client, [d.page_content for d in docs], args.workers, args.batch_size)
+    print(f"   🧠 Embedded with {args.workers} worker(s) ({time.time() - started:.1f}s)")
+
+    started = time.time()
+    points = [pusher.build_point(doc, vector) for doc, vector in zip(docs, vectors)]
+    # league-sharded collections (QDRANT_SHARD_BY_LEAGUE) take one upload per shard key
+    groups = {None: points}
+    if pusher.sharded:
+        groups = {}
+        for p in points:
+            groups.setdefault(shard_key(p.payload), []).append(p)
+    for key, group in groups.items():
+        if key is not None:
+            ensure_shard_key(client, version, key)
+        client.upload_points(
+            collection_name=version,
+            points=group,
+            batch_size=args.upload_batch_size,
+            parallel=args.upload_parallel,
+            wait=True,
+            shard_key_selector=key,
+        )
+    count = client.count(collection_name=version, exact=True).count
+    print(f"   📤 Uploaded {count}/{len(points)} points with {args.upload_parallel} stream(s) ({time.time() - started:.1f}s)")
+    if count != len(points):
+        raise SystemExit(f"❌ Point count mismatch for {version}; alias left unchanged.")
+
+    if physical:
+        client.delete_collection(alias)
+        print(f"   🗑️ Dropped plain collection {alias}")
+    switch_alias(client, alias, version)
+
+    # Keep the newest REINDEX_KEEP_VERSIONS previous versions for rollback
+    for old in list_versions(client, alias)[:-(args.keep + 1)]:
+        client.delete_collection(old)
+        print(f"   🧹 Deleted old version {old}")
+    return {"alias": alias, "version": version, "points": count}
+
+
+def rollback(client: QdrantClient, alias: str) -> None:
+    current = get_alias_target(client, alias)
+    versions = list_versions(client, alias)
+    if current not in versions or versions.index(current) == 0:
+        print(f"❌ No previous version to roll back to for {alias} (current: {current})")
+        return
+    switch_alias(client, alias, versions[versions.index(current) - 1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blue/green reindex of the match collections behind aliases")
+    parser.add_argument("--collections", nargs="+", default=list(SUMMARY_FIELDS), choices=list(SUMMARY_FIELDS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="embedding processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="embedding batch size")
+    parser.add_argument("--upload-parallel", type=int, default=4, help="parallel upload streams")
+    parser.add_argument("--upload-batch-size", type=int, default=128)
+    parser.add_argument("--keep", type=int, default=REINDEX_KEEP_VERSIONS, help="previous versions kept for rollback")
+    parser.add_argument("--rollback", action="store_true")
+    parser.add_argument("--replace-physical", action="store_true")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=120)
+
+    if args.rollback:
+        for alias in args.collections:
+            rollback(client, alias)
+        return
+
+    cron_model = CronModel()
+    embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    for alias in args.collections:
+        result = rebuild(client, cron_model, embedder, alias, args)
+        print(f"   ✅ {result['alias']} now serves {result['version']} ({result['points']} points)")
+
+    print("\n🎉 Done.")
+
+
+if __name__ == "__main__":
+    main()
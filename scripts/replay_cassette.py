@@ -0,0 +1,117 @@
+# replay_cassette.py
+#
+# Replays a recorded production day offline and profiles the enrichment pipeline.
+# Record first by running the app or the cron worker with CASSETTE_MODE=record: every
+# SOURCE_URL / SOURCE_URL_1..4 response and every OpenAI completion goes, with its latency,
+# to CASSETTE_DIR/<day>.<pid>.jsonl.gz. This script then takes every recorded fixture-list
+# fetch as one cron run, in recorded order, and pushes its fixtures through the fetch and
+# summary stages with nothing but the cassette behind them (no network, no Mongo, no Qdrant).
+# Summary sections are kept in memory between runs, so section reuse behaves as in production.
+#
+# --speed 1 keeps the recorded latencies and the gaps between runs; --speed 10 divides both
+# by ten. --no-gaps starts the next run right away. Run with the SOURCE_URL_1..4 settings of
+# the recording (requests are matched on URL + payload).
+#
+#   python scripts/replay_cassette.py --name 2026-10-18 --speed 10 --no-gaps --profile replay.prof
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a cassette day through fetch + summary stages")
+    parser.add_argument("--name", required=True, help="cassette name (the recording day, e.g. 2026-10-18)")
+    parser.add_argument("--dir", default=None, help="cassette directory (default: CASSETTE_DIR)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor for latencies and gaps")
+    parser.add_argument("--no-gaps", action="store_true", help="do not wait between recorded runs")
+    parser.add_argument("--runs", type=int, default=0, help="replay only the first N runs")
+    parser.add_argument("--profile", default=None, help="write cProfile stats to this file and print the top 25")
+    args = parser.parse_args()
+
+    # must be set before config.settings is imported
+    os.environ["CASSETTE_MODE"] = "replay"
+    os.environ["CASSETTE_NAME"] = args.name
+    os.environ["CASSETTE_LATENCY_SCALE"] = str(1.0 / args.speed)
+    if args.dir:
+        os.environ["CASSETTE_DIR"] = args.dir
+    os.environ.setdefault("OPENAI_API_KEY", "replay")  # never used: completions come from the cassette
+
+    from config.settings import SOURCE_URL_1, SOURCE_URL_2, SOURCE_URL_3, SOURCE_URL_4
+    from libraries.cassette import cassette
+    from controllers.cron_controller import api_client, fetch_fixture, section_summarizer
+    from utils.metrics import metrics
+
+    if not all((SOURCE_URL_1, SOURCE_URL_2, SOURCE_URL_3, SOURCE_URL_4)):
+        sys.exit("SOURCE_URL_1..4 must be set to the URLs of the recording")
+
+    runs = [e for e in cassette.entries("http") if e["request"]["method"] == "GET"]
+    if args.runs:
+        runs = runs[:args.runs]
+    if not runs:
+        sys.exit(f"No fixture-list fetches in cassette '{args.name}'")
+
+    sections = {}  # (collection, match_id) -> sections, the in-memory stand-in for the stored documents
+    failed = 0
+
+    def replay_run(entry):
+        nonlocal failed
+        fixtures = api_client.get(entry["request"]["url"]) or []
+        for fixture in fixtures:
+            started = time.perf_counter()
+            try:
+                match_details, match_stats = fetch_fixture(fixture)
+                fetched = time.perf_counter()
+                for record, field in ((match_details, "match_details_sections"), (match_stats, "match_stats_sections")):
+                    key = (field, record.match_id)
+                    sections[key], _ = section_summarizer.summarize(record, sections.get(key), {})
+                metrics.observe("replay.fetch_ms", (fetched - started) * 1000)
+                metrics.observe("replay.summarize_ms", (time.perf_counter() - fetched) * 1000)
+                metrics.observe("replay.fixture_ms", (time.perf_counter() - started) * 1000)
+            except Exception as e:
+                failed += 1
+                print(f"  fixture {fixture.get('season_game_uid')} failed: {e}")
+
+    profiler = cProfile.Profile() if args.profile else None
+    started = time.perf_counter()
+    previous_at = None
+    for i, entry in enumerate(runs, start=1):
+        if previous_at is not None and not args.no_gaps:
+            time.sleep(max(entry["recorded_at"] - previous_at, 0) / args.speed)
+        previous_at = entry["recorded_at"]
+        run_started = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            replay_run(entry)
+        except Exception as e:
+            print(f"run {i} failed: {e}")
+        finally:
+            if profiler:
+                profiler.disable()
+        metrics.observe("replay.run_ms", (time.perf_counter() - run_started) * 1000)
+        print(f"run {i}/{len(runs)} done in {time.perf_counter() - run_started:.2f}s")
+
+    snapshot = metrics.snapshot()
+    print(f"\nReplayed {len(runs)} runs at {args.speed:g}x in {time.perf_counter() - started:.1f}s, {failed} fixtures failed")
+    print(f"\n{'timing':<22} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, t in sorted(snapshot["timings_ms"].items()):
+        if name.startswith("replay."):
+            print(f"{name:<22} {t['count']:>6} {t['p50']:>9.1f} {t['p95']:>9.1f} {t['max']:>9.1f}")
+    print()
+    for name, value in sorted(snapshot["counters"].items()):
+        if name.startswith(("cassette.", "summary.sections.", "breaker.")):
+            print(f"{name:<32} {value:>8}")
+
+    if profiler:
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import threading
+from collections import defaultdict, deque
+from typing import Any, Dict
+
+
+class Metrics:
+    """In-process counters and latency samples, exposed through /admin/metrics."""
+
+    def __init__(self, max_samples: int = 2000):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._timings: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_samples))
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            self._timings[name].append(value_ms)
+
+    def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    @staticmethod
+    def _percentile(ordered: list, pct: float) -> float:
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: sorted(samples) for name, samples in self._timings.items() if samples}
+        return {
+            "counters": counters,
+            "timings_ms": {
+                name: {
+                    "count": len(s),
+                    "p50": round(self._percentile(s, 50), 3),
+                    "p95": round(self._percentile(s, 95), 3),
+                    "p99": round(self._percentile(s, 99), 3),
+                    "max": round(s[-1], 3),
+                }
+                for name, s in timings.items()
+            },
+        }
+
+
+metrics = Metrics()